@@ -0,0 +1,129 @@
+"""Import-time benchmark for flet_android_notifications.
+
+Runs each import scenario in fresh interpreters under `python -X importtime`,
+reports the median time spent importing what the scenario pulled in, and
+fails (exit 1) when a scenario loads a module it must not (e.g. the bare
+package import loading flet) or goes over its time budget.
+
+Usage:
+  python bench_import.py
+  python bench_import.py --runs 15 --budget package=3 --budget styles=10
+  python bench_import.py --json   # machine-readable output for CI
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+PACKAGE_SRC = ROOT / "flet_android_notifications" / "src"
+PACKAGE = "flet_android_notifications"
+# holds an empty module imported right before each scenario's statement
+MARKER_DIR = ROOT / "build" / "bench"
+
+# name -> (statement, modules it must not import, default budget in ms)
+SCENARIOS = {
+    "package": (f"import {PACKAGE}", {"flet", "json", "sqlite3", "asyncio"}, 5.0),
+    "styles": (f"from {PACKAGE} import BigTextStyle, InboxStyle, MessagingStyle", {"flet", "sqlite3"}, 15.0),
+    "recurrence": (f"from {PACKAGE} import CronRule, RRule", {"flet", "sqlite3"}, 25.0),
+    "service": (f"from {PACKAGE} import FletAndroidNotifications", set(), None),
+}
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    """Return (level, cumulative_us, module) for each -X importtime line."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # nesting is shown by two extra spaces per level after the one separator space
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((level, int(cumulative), name.strip()))
+    return rows
+
+
+def measure(statement: str) -> tuple[float, set[str]]:
+    """Import time of statement in ms, and the modules it imported."""
+    # interpreter startup imports come first; everything after the marker
+    # module is caused by the statement
+    marker = "_bench_import_marker"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(PACKAGE_SRC), str(MARKER_DIR)])}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {marker}\n{statement}"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{result.stderr[-2000:]}")
+    rows = parse_importtime(result.stderr)
+    start = next(i for i, (_, _, name) in enumerate(rows) if name == marker) + 1
+    ours = rows[start:]
+    total_us = sum(cumulative for level, cumulative, _ in ours if level == 0)
+    return total_us / 1000, {name for _, _, name in ours}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure and guard the package's import time")
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per scenario (default 7)")
+    parser.add_argument("--budget", action="append", default=[], metavar="SCENARIO=MS",
+                        help="override a scenario's time budget; repeatable")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    budgets = {name: budget for name, (_, _, budget) in SCENARIOS.items()}
+    for item in args.budget:
+        name, _, ms = item.partition("=")
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}; expected one of {list(SCENARIOS)}")
+        budgets[name] = float(ms)
+
+    MARKER_DIR.mkdir(parents=True, exist_ok=True)
+    (MARKER_DIR / "_bench_import_marker.py").write_text("")
+
+    results = {}
+    failed = False
+    for name, (statement, forbidden, _) in SCENARIOS.items():
+        times, modules = [], set()
+        for _ in range(args.runs):
+            ms, modules = measure(statement)
+            times.append(ms)
+        median = statistics.median(times)
+        leaked = sorted(forbidden & modules)
+        budget = budgets[name]
+        over = budget is not None and median > budget
+        failed |= bool(leaked) or over
+        results[name] = {
+            "statement": statement,
+            "median_ms": round(median, 2),
+            "min_ms": round(min(times), 2),
+            "modules": len(modules),
+            "budget_ms": budget,
+            "forbidden_imported": leaked,
+            "ok": not leaked and not over,
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'scenario':<12} {'median':>9} {'min':>9} {'budget':>8} {'modules':>8}  status")
+        for name, r in results.items():
+            budget = f"{r['budget_ms']:.1f}" if r["budget_ms"] is not None else "-"
+            status = "ok" if r["ok"] else "FAIL"
+            if r["forbidden_imported"]:
+                status += f" (imported {', '.join(r['forbidden_imported'])})"
+            elif not r["ok"]:
+                status += " (over budget)"
+            print(f"{name:<12} {r['median_ms']:>7.2f}ms {r['min_ms']:>7.2f}ms {budget:>8} "
+                  f"{r['modules']:>8}  {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,80 @@
 """Automated build+deploy script for flet-android-notifications demo.
 
-Pipeline:
+Pipeline (each step is skipped when its inputs haven't changed since it last ran):
   flet build apk
-    -> patch app.zip (replace .pth editable with real .py files)
-    -> copy test resources into res/raw/
-    -> regenerate app.zip.hash
-    -> flutter build apk --release
-    -> adb uninstall + install + launch
+    -> patch app.zip (replace .pth editable with real .py files, or .pyc with --bytecode;
+       only entries changed since the last patch are rewritten)
+    -> regenerate app.zip.hash     } in parallel
+    -> copy test resources into res/raw/  }
+    -> flutter build apk --release (or --profile/--debug with --build-type)
+       (or, with --python-only, swap the new app.zip into the last APK and re-sign it)
+    -> adb uninstall + install + launch (or, with --push, copy only the changed Python files
+       into the installed app and restart it; needs a --build-type debug install)
+
+adb, flutter and flet are taken from $ADB, $FLUTTER_BIN and $FLET when set, so the
+pipeline can be run against stubs.
 """
 
 import hashlib
+import io
+import json
 import os
+import py_compile
 import shutil
+import statistics
+import struct
 import subprocess
 import sys
+import shlex
+import tempfile
+import threading
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
 ROOT = Path(__file__).parent
 BUILD_FLUTTER = ROOT / "build" / "flutter"
 APP_ZIP = BUILD_FLUTTER / "app" / "app.zip"
 APP_ZIP_HASH = BUILD_FLUTTER / "app" / "app.zip.hash"
+# what the last patch put into app.zip; kept outside build/flutter so it isn't bundled
+APP_ZIP_MANIFEST = ROOT / "build" / "app.zip.manifest.json"
 RES_DIR = BUILD_FLUTTER / "android" / "app" / "src" / "main" / "res"
-FLUTTER_BIN = Path(r"C:\Users\alexs\flutter\3.41.2\bin\flutter.bat")
+APK_DIR = BUILD_FLUTTER / "build" / "app" / "outputs" / "flutter-apk"
+# flutter build apk modes; only debug builds are debuggable, which --push needs for run-as
+BUILD_TYPES = ("release", "profile", "debug")
+# where flutter puts the app/app.zip asset inside the APK
+APK_APP_ZIP = "assets/flutter_assets/app/app.zip"
+# fingerprints of each step's inputs as of its last successful run
+BUILD_CACHE = ROOT / "build" / ".build_cache.json"
+# cache keys that describe what is on the device rather than a build step
+DEVICE_CACHE_KEYS = ("install", "install_type", "pushed")
+FLUTTER_BIN = Path(os.environ.get("FLUTTER_BIN", r"C:\Users\alexs\flutter\3.41.2\bin\flutter.bat"))
+ADB = os.environ.get("ADB", "adb")
+FLET = os.environ.get("FLET", "flet")
 PACKAGE_SRC = ROOT / "flet_android_notifications" / "src" / "flet_android_notifications"
 TEST_RESOURCES = ROOT / "test_resources"
+DART_SRC = ROOT / "flet_android_notifications" / "src" / "flutter"
+FLET_INPUTS = [ROOT / "pyproject.toml", ROOT / "flet_android_notifications" / "pyproject.toml"]
+# local tool/cache dirs that never affect a build
+IGNORED_DIRS = {".dart_tool", "build", "__pycache__"}
+
+# key used to re-sign a repacked APK; flet signs release builds with the debug key by default
+KEYSTORE = Path(os.environ.get("APK_KEYSTORE", Path.home() / ".android" / "debug.keystore"))
+KEYSTORE_PASS = os.environ.get("APK_KEYSTORE_PASS", "android")
+KEY_ALIAS = os.environ.get("APK_KEY_ALIAS", "androiddebugkey")
 PACKAGE_ID = "com.flet.flet_android_notifications_demo"
+# where the app extracts app.zip, relative to its data dir (what `adb shell run-as` starts in)
+DEVICE_APP_DIR = os.environ.get("DEVICE_APP_DIR", "files/flet/app")
 
 SITE_PKG_PREFIX = ".venv/Lib/site-packages/flet_android_notifications/"
 
+# module imported to find the package's hot (startup) modules
+HOT_ENTRY_MODULE = "flet_android_notifications.flet_android_notifications"
+
+HASH_CHUNK = 1024 * 1024
+
 
 def run(cmd, cwd=None, env=None):
     """Run a command, stream output, and raise on failure."""
@@ -39,78 +85,486 @@ def run(cmd, cwd=None, env=None):
         sys.exit(1)
 
 
+def fingerprint(*paths, extra=()):
+    """SHA-256 over the contents of files (directories recursively) and extra values."""
+    sha256 = hashlib.sha256()
+    for path in paths:
+        if path.is_dir():
+            files = sorted(
+                f for f in path.rglob("*")
+                if f.is_file() and not IGNORED_DIRS.intersection(f.relative_to(path).parts)
+            )
+        else:
+            files = [path] if path.exists() else []
+        for f in files:
+            sha256.update(f"{f.relative_to(ROOT).as_posix()}\0".encode())
+            sha256.update(hashlib.sha256(f.read_bytes()).digest())
+    for value in extra:
+        sha256.update(f"{value}\0".encode())
+    return sha256.hexdigest()
+
+
+def load_cache():
+    try:
+        return json.loads(BUILD_CACHE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    BUILD_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    BUILD_CACHE.write_text(json.dumps(cache, indent=1))
+
+
+def skipped(title, reason="inputs unchanged"):
+    print(f"\n=== {title} === skipped ({reason})")
+
+
+# (step, seconds) of every step run so far
+step_times = []
+_step_times_lock = threading.Lock()
+
+
+@contextmanager
+def timed(step):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _step_times_lock:
+            step_times.append((step, elapsed))
+        print(f"  [{step}: {elapsed:.2f}s]")
+
+
+def print_step_times(total):
+    print("\n=== Timing ===")
+    for step, elapsed in step_times:
+        print(f"  {step:<24} {elapsed:8.2f}s")
+    # steps overlap when run in parallel, so the wall time can be less than their sum
+    print(f"  {'total (wall)':<24} {total:8.2f}s")
+
+
+def build_tool(name):
+    """Path of an Android SDK build-tools binary: $NAME, the newest build-tools version, or PATH."""
+    if os.environ.get(name.upper()):
+        return os.environ[name.upper()]
+    sdk = os.environ.get("ANDROID_HOME") or os.environ.get("ANDROID_SDK_ROOT")
+    if sdk:
+        for version in sorted((Path(sdk) / "build-tools").glob("*"), reverse=True):
+            for candidate in (name, name + ".bat", name + ".exe"):
+                if (version / candidate).exists():
+                    return str(version / candidate)
+    return shutil.which(name) or name
+
+
 def step_flet_build():
     """Step 1: run flet build apk."""
     print("\n=== Step 1: flet build apk ===")
     env = {**os.environ, "PYTHONIOENCODING": "utf-8"}
-    run("flet build apk -v", cwd=str(ROOT), env=env)
+    run(f"{FLET} build apk -v", cwd=str(ROOT), env=env)
 
 
-def step_patch_app_zip():
-    """Step 2: patch app.zip — remove .pth editable, add real .py files."""
-    print("\n=== Step 2: patch app.zip ===")
-    if not APP_ZIP.exists():
-        print(f"ERROR: {APP_ZIP} not found. Run flet build first.")
-        sys.exit(1)
+def zip_info(arcname):
+    """ZipInfo with a fixed timestamp, so identical content gives identical entries."""
+    info = zipfile.ZipInfo(arcname, date_time=(1980, 1, 1, 0, 0, 0))
+    info.external_attr = 0o644 << 16
+    return info
 
-    tmp_zip = APP_ZIP.with_suffix(".tmp")
 
-    # files to inject
-    py_files = list(PACKAGE_SRC.glob("*.py"))
-    print(f"  injecting {len(py_files)} .py files from {PACKAGE_SRC}")
-
-    with zipfile.ZipFile(APP_ZIP, "r") as zin, zipfile.ZipFile(tmp_zip, "w", zipfile.ZIP_DEFLATED) as zout:
-        for item in zin.infolist():
-            # skip .pth redirects and editable finders for our package
-            if "__editable__" in item.filename and "flet_android_notifications" in item.filename:
-                print(f"  removing: {item.filename}")
-                continue
-            # skip old dist-info for flet-android-notifications (not the demo)
-            if "flet_android_notifications-" in item.filename and "dist-info" in item.filename:
-                # keep the demo dist-info, skip the library one
-                if "demo" not in item.filename:
+def find_hot_modules():
+    """Return the package module names imported when the service is first used.
+
+    Falls back to every module when the import fails (e.g. flet missing).
+    """
+    code = (
+        f"import sys, {HOT_ENTRY_MODULE}\n"
+        "print('\\n'.join(m.rpartition('.')[2] for m in sys.modules "
+        "if m.startswith('flet_android_notifications.')))"
+    )
+    env = {**os.environ, "PYTHONPATH": str(PACKAGE_SRC.parent)}
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {p.stem for p in PACKAGE_SRC.glob("*.py")}
+    return set(result.stdout.split()) | {"__init__"}
+
+
+def compile_pyc(py_file):
+    """Compile py_file to optimized (-OO) bytecode that never checks its source."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cfile = Path(tmp) / (py_file.stem + ".pyc")
+        py_compile.compile(
+            str(py_file),
+            cfile=str(cfile),
+            dfile=SITE_PKG_PREFIX + py_file.name,
+            doraise=True,
+            optimize=2,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+        return cfile.read_bytes()
+
+
+def planned_entries(bytecode=False, keep_source=False):
+    """Return (arcname, source file, fingerprint) for every entry the patch owns.
+
+    Entries are in archive order: package modules, then main.py, which
+    changes most often, last. The fingerprint covers the source bytes and
+    how they are packaged, so it can be compared without compiling anything.
+    """
+    pyc_tag = f"pyc-{sys.version_info.major}.{sys.version_info.minor}-opt2"
+    planned = []
+    for py_file in sorted(PACKAGE_SRC.glob("*.py")):
+        digest = hashlib.sha256(py_file.read_bytes()).hexdigest()
+        if bytecode:
+            planned.append((SITE_PKG_PREFIX + py_file.stem + ".pyc", py_file, f"{pyc_tag}:{digest}"))
+        if not bytecode or keep_source:
+            planned.append((SITE_PKG_PREFIX + py_file.name, py_file, f"py:{digest}"))
+    main_py = ROOT / "main.py"
+    if main_py.exists():
+        planned.append(("main.py", main_py, "py:" + hashlib.sha256(main_py.read_bytes()).hexdigest()))
+    return planned
+
+
+def entry_data(arcname, source, hot):
+    """Return (data, compress_type) of a planned entry.
+
+    .pyc entries are compiled from source. Hot package modules are stored
+    uncompressed so they are not inflated on every extraction/import.
+    """
+    data = compile_pyc(source) if arcname.endswith(".pyc") else source.read_bytes()
+    if source.parent == PACKAGE_SRC and source.stem in hot:
+        return data, zipfile.ZIP_STORED
+    return data, zipfile.ZIP_DEFLATED
+
+
+def package_entries(bytecode=False, keep_source=False, hot=None):
+    """Return (arcname, data, compress_type) for every package file to inject.
+
+    With bytecode, modules are shipped as sourceless .pyc next to where the
+    .py would be, which both zipimport and the regular path finder load
+    without compiling.
+    """
+    hot = find_hot_modules() if hot is None else hot
+    return [
+        (arcname, *entry_data(arcname, source, hot))
+        for arcname, source, _ in planned_entries(bytecode, keep_source)
+        if arcname.startswith(SITE_PKG_PREFIX)
+    ]
+
+
+def estimate_cold_import(entries, runs=3):
+    """Median ms to import the package from a zip of entries in a fresh interpreter.
+
+    Only the package's own modules are counted (flet and the stdlib are
+    excluded), with bytecode caching off, as on a first launch.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = Path(tmp) / "package.zip"
+        with zipfile.ZipFile(zip_path, "w") as z:
+            for arcname, data, compress in entries:
+                z.writestr(arcname, data, compress_type=compress)
+        site = f"{zip_path}/{SITE_PKG_PREFIX.rsplit('/', 2)[0]}"
+        env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1", "PYTHONPATH": site}
+        times = []
+        for _ in range(runs):
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", f"import {HOT_ENTRY_MODULE}"],
+                env=env, capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                return None
+            own_us = 0
+            for line in result.stderr.splitlines():
+                if line.startswith("import time:") and "cumulative" not in line:
+                    self_us, _, name = line[len("import time:"):].split("|")
+                    if name.strip().startswith("flet_android_notifications"):
+                        own_us += int(self_us)
+            times.append(own_us / 1000)
+        return statistics.median(times)
+
+
+class HashingWriter:
+    """Write-only file wrapper that SHA-256 hashes everything written through it.
+
+    It is deliberately not seekable: zipfile then streams each entry with a
+    data descriptor instead of seeking back to fix up its header, so the
+    digest is exactly that of the finished file.
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self._pos = 0
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self.sha256.update(data)
+        self._pos += len(data)
+        return self._f.write(data)
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, *args):
+        raise OSError("HashingWriter is not seekable")
+
+    def seekable(self):
+        return False
+
+    def flush(self):
+        self._f.flush()
+
+
+def file_sha256(path):
+    """SHA-256 of a file, read in chunks."""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def load_manifest(options):
+    """Return the last patch's manifest if app.zip is still the file it describes."""
+    try:
+        manifest = json.loads(APP_ZIP_MANIFEST.read_text())
+    except (OSError, ValueError):
+        return None
+    stat = APP_ZIP.stat()
+    if (manifest.get("size"), manifest.get("mtime_ns")) != (stat.st_size, stat.st_mtime_ns):
+        return None  # rebuilt by flet build or changed by hand
+    if manifest.get("options") != options:
+        return None
+    return manifest
+
+
+def save_manifest(options, planned, sha256):
+    stat = APP_ZIP.stat()
+    APP_ZIP_MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    APP_ZIP_MANIFEST.write_text(json.dumps({
+        "options": options,
+        "entries": [[arcname, fingerprint] for arcname, _, fingerprint in planned],
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256,
+    }, indent=1))
+
+
+def write_entries(z, planned, hot):
+    """Add planned entries to z; return them as (arcname, data, compress_type)."""
+    written = []
+    for arcname, source, _ in planned:
+        data, compress = entry_data(arcname, source, hot)
+        print(f"  adding: {arcname}{' (stored)' if compress == zipfile.ZIP_STORED else ''}")
+        z.writestr(zip_info(arcname), data, compress_type=compress)
+        written.append((arcname, data, compress))
+    return written
+
+
+def patch_full(planned, hot):
+    """Rewrite app.zip with flet's entries first and ours at the end.
+
+    Returns (sha256, written entries). The hash is taken from the bytes as
+    they are written, so the archive is never read back.
+    """
+    tmp_zip = APP_ZIP.with_suffix(".tmp")
+    with open(tmp_zip, "wb") as f:
+        out = HashingWriter(f)
+        with zipfile.ZipFile(APP_ZIP, "r") as zin, zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zout:
+            for item in zin.infolist():
+                # skip .pth redirects and editable finders for our package
+                if "__editable__" in item.filename and "flet_android_notifications" in item.filename:
                     print(f"  removing: {item.filename}")
                     continue
-            # skip existing package .py files (we'll re-add fresh copies)
-            if item.filename.startswith(SITE_PKG_PREFIX) and item.filename.endswith(".py"):
-                print(f"  replacing: {item.filename}")
-                continue
-            # replace main.py with fresh copy from project root
-            if item.filename == "main.py":
-                print(f"  replacing: main.py")
-                continue
-            zout.writestr(item, zin.read(item.filename))
-
-        # add fresh main.py from project root
-        main_py = ROOT / "main.py"
-        if main_py.exists():
-            print(f"  adding: main.py (from project root)")
-            zout.write(main_py, "main.py")
-
-        # add fresh .py files
-        for py_file in py_files:
-            arcname = SITE_PKG_PREFIX + py_file.name
-            print(f"  adding: {arcname}")
-            zout.write(py_file, arcname)
+                # skip old dist-info for flet-android-notifications (not the demo)
+                if "flet_android_notifications-" in item.filename and "dist-info" in item.filename:
+                    # keep the demo dist-info, skip the library one
+                    if "demo" not in item.filename:
+                        print(f"  removing: {item.filename}")
+                        continue
+                # skip existing package .py/.pyc files (we'll re-add fresh copies)
+                if item.filename.startswith(SITE_PKG_PREFIX) and item.filename.endswith((".py", ".pyc")):
+                    print(f"  replacing: {item.filename}")
+                    continue
+                # replace main.py with fresh copy from project root
+                if item.filename == "main.py":
+                    print(f"  replacing: main.py")
+                    continue
+                zout.writestr(item, zin.read(item.filename))
 
+            # our entries go last, so later patches only rewrite the tail
+            written = write_entries(zout, planned, hot)
     tmp_zip.replace(APP_ZIP)
-    print("  app.zip patched successfully")
+    return out.sha256.hexdigest(), written
+
+
+def central_directory_offset(path):
+    """Offset of a zip's central directory, or None if the file has a comment or is zip64."""
+    with open(path, "rb") as f:
+        f.seek(-22, os.SEEK_END)
+        end_record = f.read(22)
+    signature, _, _, _, _, _, offset, comment_length = struct.unpack("<4s4H2LH", end_record)
+    if signature != b"PK\x05\x06" or comment_length or offset == 0xFFFFFFFF:
+        return None
+    return offset
+
+
+def write_central_directory(f, infos):
+    """Write the central directory and end record for infos at f's position.
+
+    Every field comes from the documented ZipInfo attributes, so the
+    entries' local headers and data (already in f) are used as they are.
+    """
+    start = f.tell()
+    for info in infos:
+        name = info.filename.encode("utf-8" if info.flag_bits & 0x800 else "cp437")
+        year, month, day, hour, minute, second = info.date_time
+        f.write(struct.pack(
+            "<4s4B4HL2L5H2L", b"PK\x01\x02",
+            info.create_version, info.create_system, info.extract_version, info.reserved,
+            info.flag_bits, info.compress_type,
+            hour << 11 | minute << 5 | second // 2, (year - 1980) << 9 | month << 5 | day,
+            info.CRC, info.compress_size, info.file_size,
+            len(name), len(info.extra), len(info.comment), 0,
+            info.internal_attr, info.external_attr, info.header_offset,
+        ))
+        f.write(name + info.extra + info.comment)
+    size = f.tell() - start
+    f.write(struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, len(infos), len(infos), size, start, 0))
+
+
+def patch_incremental(planned, manifest, hot):
+    """Rewrite app.zip from the first changed entry onwards.
+
+    The bytes before that entry (flet's files and our unchanged ones) are
+    copied as they are, without recompressing, into a temporary file that
+    replaces app.zip only once it's complete. Returns (sha256, written
+    entries), or None when the archive doesn't end with the manifest's
+    entries.
+    """
+    old = [tuple(entry) for entry in manifest["entries"]]
+    new = [(arcname, fingerprint) for arcname, _, fingerprint in planned]
+    first = next((i for i, (o, n) in enumerate(zip(old, new)) if o != n), min(len(old), len(new)))
+
+    with zipfile.ZipFile(APP_ZIP, "r") as z:
+        infos = z.infolist()
+    tail = infos[len(infos) - len(old):] if old else []
+    if [info.filename for info in tail] != [arcname for arcname, _ in old]:
+        return None
+    cut = len(infos) - len(old) + first
+    offset = infos[cut].header_offset if cut < len(infos) else central_directory_offset(APP_ZIP)
+    if offset is None:
+        return None
+    for info in infos[cut:]:
+        print(f"  replacing: {info.filename}")
+
+    tmp_zip = APP_ZIP.with_suffix(".tmp")
+    sha256 = hashlib.sha256()
+    try:
+        with open(APP_ZIP, "rb") as src, open(tmp_zip, "wb") as dst:
+            remaining = offset
+            while remaining:
+                chunk = src.read(min(HASH_CHUNK, remaining))
+                if not chunk:
+                    return None
+                sha256.update(chunk)
+                dst.write(chunk)
+                remaining -= len(chunk)
+            # makes the kept prefix a valid archive that append mode can extend
+            write_central_directory(dst, infos[:cut])
+        with zipfile.ZipFile(tmp_zip, "a") as z:
+            written = write_entries(z, planned[first:], hot)
+        with open(tmp_zip, "rb") as f:
+            f.seek(offset)
+            while chunk := f.read(HASH_CHUNK):
+                sha256.update(chunk)
+        tmp_zip.replace(APP_ZIP)
+    finally:
+        tmp_zip.unlink(missing_ok=True)
+    return sha256.hexdigest(), written
+
+
+def step_patch_app_zip(bytecode=False, keep_source=False, full=False):
+    """Step 2: patch app.zip — remove .pth editable, add real .py (or .pyc) files.
+
+    Only entries whose sources changed since the last patch are rewritten;
+    full forces a rewrite of the whole archive. Returns app.zip's SHA-256.
+    """
+    print("\n=== Step 2: patch app.zip ===")
+    if not APP_ZIP.exists():
+        print(f"ERROR: {APP_ZIP} not found. Run flet build first.")
+        sys.exit(1)
+
+    options = {"bytecode": bytecode, "keep_source": keep_source}
+    planned = planned_entries(bytecode, keep_source)
+    manifest = None if full else load_manifest(options)
+    if manifest is not None and manifest["entries"] == [[a, f] for a, _, f in planned]:
+        print("  app.zip is up to date, nothing to patch")
+        return manifest["sha256"]
+
+    size_before = APP_ZIP.stat().st_size
+    hot = find_hot_modules()
+    result = patch_incremental(planned, manifest, hot) if manifest is not None else None
+    incremental = result is not None
+    if incremental:
+        sha256, written = result
+        removed = {a for a, _ in manifest["entries"]} - {a for a, _, _ in planned}
+    else:
+        modules = len(list(PACKAGE_SRC.glob("*.py")))
+        stored = sum(1 for a, s, _ in planned if a.startswith(SITE_PKG_PREFIX) and s.stem in hot)
+        kind = ".pyc" + (" + .py" if keep_source else "") if bytecode else ".py"
+        print(f"  injecting {modules} modules ({kind}) from {PACKAGE_SRC}, {stored} hot entries stored")
+        if bytecode:
+            print(f"  bytecode is for Python {sys.version_info.major}.{sys.version_info.minor}; "
+                  f"it must match the app's Python{'' if keep_source else ' (add --keep-source to fall back)'}")
+        sha256, written = patch_full(planned, hot)
+        removed = set()
+    save_manifest(options, planned, sha256)
+
+    size_after = APP_ZIP.stat().st_size
+    print(f"  app.zip patched {'incrementally' if incremental else 'in full'}: "
+          f"{len(written)} of {len(planned)} entries written, {size_after / 1024:.1f} KiB "
+          f"({(size_after - size_before) / 1024:+.1f} KiB)")
+
+    entries = [e for e in written if e[0].startswith(SITE_PKG_PREFIX)]
+    if not incremental:
+        source_ms = estimate_cold_import(package_entries(hot=hot))
+        packed_ms = estimate_cold_import(entries) if bytecode else source_ms
+        if source_ms is not None and packed_ms is not None:
+            print(f"  cold import estimate (host CPU, package modules only): {packed_ms:.1f} ms"
+                  + (f" vs {source_ms:.1f} ms from source" if bytecode else ""))
 
     # also patch site-packages arch dirs so SERIOUS_PYTHON_SITE_PACKAGES doesn't override with stale copies
+    def patch_arch_dir(arch_pkg_dir):
+        if bytecode and not keep_source and not incremental:
+            # a .py next to a .pyc wins on a regular filesystem; drop stale sources
+            for stale in arch_pkg_dir.glob("*.py"):
+                stale.unlink()
+        for arcname in removed:
+            if arcname.startswith(SITE_PKG_PREFIX):
+                (arch_pkg_dir / arcname.rsplit("/", 1)[1]).unlink(missing_ok=True)
+        for arcname, data, _ in entries:
+            (arch_pkg_dir / arcname.rsplit("/", 1)[1]).write_bytes(data)
+        print(f"  patched site-packages: {arch_pkg_dir.parent.name}")
+
     site_packages = ROOT / "build" / "site-packages"
-    if site_packages.exists():
-        for arch_pkg_dir in site_packages.glob("*/flet_android_notifications"):
-            if arch_pkg_dir.is_dir():
-                for py_file in py_files:
-                    dest = arch_pkg_dir / py_file.name
-                    shutil.copy2(py_file, dest)
-                print(f"  patched site-packages: {arch_pkg_dir.parent.name}")
+    arch_pkg_dirs = [d for d in site_packages.glob("*/flet_android_notifications") if d.is_dir()]
+    with ThreadPoolExecutor() as pool:
+        # list() re-raises the first failure
+        list(pool.map(patch_arch_dir, arch_pkg_dirs))
+    return sha256
 
 
-def step_update_hash():
-    """Step 3: regenerate app.zip.hash."""
+def step_update_hash(sha256=None):
+    """Step 3: regenerate app.zip.hash.
+
+    Uses the hash computed while patching when given, else reads app.zip.
+    """
     print("\n=== Step 3: regenerate app.zip.hash ===")
-    sha256 = hashlib.sha256(APP_ZIP.read_bytes()).hexdigest()
+    if sha256 is None:
+        sha256 = file_sha256(APP_ZIP)
+    if APP_ZIP_HASH.exists() and APP_ZIP_HASH.read_text().strip() == sha256:
+        print(f"  hash: {sha256} (unchanged)")
+        return
     APP_ZIP_HASH.write_text(sha256)
     print(f"  hash: {sha256}")
 
@@ -123,19 +577,21 @@ def step_copy_test_resources():
     drawable_dir = RES_DIR / "drawable"
     drawable_dir.mkdir(parents=True, exist_ok=True)
 
-    # copy sound files to res/raw/
+    # sound files go to res/raw/, drawable XMLs to res/drawable/
+    copies = []
     for f in TEST_RESOURCES.iterdir():
         if f.is_file() and f.suffix in (".wav", ".mp3", ".ogg"):
-            dest = raw_dir / f.name
-            shutil.copy2(f, dest)
-            print(f"  copied: {f.name} -> {dest}")
+            copies.append((f, raw_dir / f.name))
+        elif f.is_file() and f.suffix == ".xml":
+            copies.append((f, drawable_dir / f.name))
 
-    # copy drawable XMLs to res/drawable/
-    for f in TEST_RESOURCES.iterdir():
-        if f.is_file() and f.suffix == ".xml":
-            dest = drawable_dir / f.name
-            shutil.copy2(f, dest)
-            print(f"  copied: {f.name} -> {dest}")
+    def copy(pair):
+        src, dest = pair
+        shutil.copy2(src, dest)
+        print(f"  copied: {src.name} -> {dest}")
+
+    with ThreadPoolExecutor() as pool:
+        list(pool.map(copy, copies))
 
     # add keep.xml to prevent aapt2 from stripping unreferenced resources
     keep_xml = raw_dir / "keep.xml"
@@ -147,9 +603,14 @@ def step_copy_test_resources():
     print(f"  created: {keep_xml}")
 
 
-def step_flutter_build():
-    """Step 5: flutter build apk --release."""
-    print("\n=== Step 5: flutter build apk --release ===")
+def apk_path(build_type):
+    """Where flutter build apk --<build_type> writes the APK."""
+    return APK_DIR / f"app-{build_type}.apk"
+
+
+def step_flutter_build(build_type):
+    """Step 5: flutter build apk --<build_type>."""
+    print(f"\n=== Step 5: flutter build apk --{build_type} ===")
     # SERIOUS_PYTHON_SITE_PACKAGES must point to the parent of arch dirs (arm64-v8a/, etc.)
     # flet build creates this at build/site-packages/
     site_packages = ROOT / "build" / "site-packages"
@@ -161,48 +622,285 @@ def step_flutter_build():
     env["SERIOUS_PYTHON_SITE_PACKAGES"] = str(site_packages)
     print(f"  SERIOUS_PYTHON_SITE_PACKAGES={site_packages}")
 
-    run([str(FLUTTER_BIN), "build", "apk", "--release"], cwd=str(BUILD_FLUTTER), env=env)
-
+    run([str(FLUTTER_BIN), "build", "apk", f"--{build_type}"], cwd=str(BUILD_FLUTTER), env=env)
+
+
+def repack_site_packages(data, arch_pkg_dir):
+    """Return a zipped site-packages library with our package replaced by arch_pkg_dir's files.
+
+    Returns data unchanged when it isn't a zip holding the package.
+    """
+    if not data.startswith(b"PK\x03\x04") or not arch_pkg_dir.is_dir():
+        return data
+    prefix = arch_pkg_dir.name + "/"
+    with zipfile.ZipFile(io.BytesIO(data)) as zin:
+        if not any(name.startswith(prefix) for name in zin.namelist()):
+            return data
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zout:
+            for item in zin.infolist():
+                if not item.filename.startswith(prefix):
+                    zout.writestr(item, zin.read(item.filename))
+            for f in sorted(arch_pkg_dir.iterdir()):
+                if f.is_file():
+                    zout.writestr(zip_info(prefix + f.name), f.read_bytes())
+    return out.getvalue()
+
+
+def step_repack_apk(apk):
+    """Step 5 (python-only): put the patched Python payload into the last built APK.
+
+    Replaces app.zip, its hash and any zipped site-packages holding the
+    package, then zipaligns and re-signs, which takes seconds instead of
+    a flutter build.
+    """
+    print("\n=== Step 5: repack APK with the Python payload (python-only) ===")
+    if not apk.exists():
+        print(f"ERROR: APK not found at {apk}. Run a full build first.")
+        sys.exit(1)
+    if not KEYSTORE.exists():
+        print(f"ERROR: keystore {KEYSTORE} not found; set APK_KEYSTORE (and APK_KEYSTORE_PASS, APK_KEY_ALIAS).")
+        sys.exit(1)
 
-def step_install():
+    replacements = {APK_APP_ZIP: APP_ZIP.read_bytes(), APK_APP_ZIP + ".hash": APP_ZIP_HASH.read_bytes()}
+    site_packages = ROOT / "build" / "site-packages"
+    unsigned = apk.with_suffix(".unsigned.apk")
+    aligned = apk.with_suffix(".aligned.apk")
+    with zipfile.ZipFile(apk, "r") as zin:
+        missing = set(replacements) - set(zin.namelist())
+        if missing:
+            print(f"ERROR: {apk.name} has no {', '.join(sorted(missing))}; run a full build.")
+            sys.exit(1)
+        with zipfile.ZipFile(unsigned, "w") as zout:
+            for item in zin.infolist():
+                name = item.filename
+                # the old v1 signature no longer matches; apksigner writes a new one
+                if name.startswith("META-INF/") and name.endswith((".SF", ".RSA", ".DSA", ".EC", "MANIFEST.MF")):
+                    continue
+                if name in replacements:
+                    print(f"  replacing: {name}")
+                    data = replacements[name]
+                elif name.startswith("lib/") and name.endswith(".so"):
+                    original = zin.read(name)
+                    abi = name.split("/")[1]
+                    data = repack_site_packages(original, site_packages / abi / "flet_android_notifications")
+                    if data is not original:
+                        print(f"  replacing: {name} (site-packages)")
+                else:
+                    data = zin.read(name)
+                zout.writestr(item, data)
+
+    run([build_tool("zipalign"), "-p", "-f", "4", str(unsigned), str(aligned)])
+    run([build_tool("apksigner"), "sign", "--ks", str(KEYSTORE), "--ks-pass", f"pass:{KEYSTORE_PASS}",
+         "--ks-key-alias", KEY_ALIAS, "--out", str(apk), str(aligned)])
+    unsigned.unlink()
+    aligned.unlink()
+    print(f"  repacked {apk.name}: {apk.stat().st_size / 1024 / 1024:.1f} MiB")
+
+
+def step_install(apk):
     """Step 6: adb uninstall + install + launch."""
     print("\n=== Step 6: install on device ===")
-    apk = BUILD_FLUTTER / "build" / "app" / "outputs" / "flutter-apk" / "app-release.apk"
     if not apk.exists():
         print(f"ERROR: APK not found at {apk}")
         sys.exit(1)
 
     # uninstall (ignore failure if not installed)
-    subprocess.run(["adb", "uninstall", PACKAGE_ID], capture_output=True)
+    subprocess.run([ADB, "uninstall", PACKAGE_ID], capture_output=True)
     print(f"  uninstalled {PACKAGE_ID} (if present)")
 
-    run(["adb", "install", str(apk)])
+    run([ADB, "install", str(apk)])
     print("  installed successfully")
 
     # launch
-    run(["adb", "shell", "monkey", "-p", PACKAGE_ID, "-c", "android.intent.category.LAUNCHER", "1"])
+    run([ADB, "shell", "monkey", "-p", PACKAGE_ID, "-c", "android.intent.category.LAUNCHER", "1"])
     print("  launched app")
 
 
+def payload_entries():
+    """{arcname: fingerprint} of what the last patch put into app.zip."""
+    return dict(json.loads(APP_ZIP_MANIFEST.read_text())["entries"])
+
+
+def step_push(pushed):
+    """Step 6 (push): copy the changed Python files into the installed app and restart it.
+
+    pushed is {arcname: fingerprint} of what the device already runs; only
+    entries that differ are sent. Needs a debuggable (--build-type debug)
+    install for run-as, and the app discards pushed files whenever it
+    re-extracts app.zip (e.g. after a reinstall). Returns the new
+    {arcname: fingerprint}.
+    """
+    print("\n=== Step 6: push Python payload to device ===")
+    probe = subprocess.run([ADB, "shell", "run-as", PACKAGE_ID, "true"], capture_output=True, text=True)
+    if probe.returncode != 0 or "not debuggable" in probe.stdout + probe.stderr:
+        print(f"ERROR: run-as {PACKAGE_ID} failed: {(probe.stdout + probe.stderr).strip()}")
+        print("  --push needs a debuggable install; run build.py --build-type debug first.")
+        sys.exit(1)
+    current = payload_entries()
+    changed = [arcname for arcname, fp in current.items() if pushed.get(arcname) != fp]
+    removed = [arcname for arcname in pushed if arcname not in current]
+    if not changed and not removed:
+        print("  device is up to date, nothing to push")
+        return current
+
+    staging = ROOT / "build" / "push"
+    shutil.rmtree(staging, ignore_errors=True)
+    with zipfile.ZipFile(APP_ZIP) as z:
+        for arcname in changed:
+            dest = staging / arcname
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(z.read(arcname))
+            print(f"  pushing: {arcname}")
+    for arcname in removed:
+        print(f"  removing: {arcname}")
+
+    remote_tmp = f"/data/local/tmp/{PACKAGE_ID}.payload"
+    run([ADB, "shell", "rm", "-rf", remote_tmp])
+    if changed:
+        run([ADB, "push", str(staging), remote_tmp])
+    script = " && ".join(
+        ([f"cp -r {remote_tmp}/. {DEVICE_APP_DIR}/"] if changed else [])
+        + [f"rm -f {shlex.quote(f'{DEVICE_APP_DIR}/{arcname}')}" for arcname in removed]
+    )
+    run([ADB, "shell", f"run-as {PACKAGE_ID} sh -c {shlex.quote(script)}"])
+    run([ADB, "shell", "rm", "-rf", remote_tmp])
+    shutil.rmtree(staging)
+
+    run([ADB, "shell", "am", "force-stop", PACKAGE_ID])
+    run([ADB, "shell", "monkey", "-p", PACKAGE_ID, "-c", "android.intent.category.LAUNCHER", "1"])
+    print(f"  pushed {len(changed)} files, removed {len(removed)}; restarted app")
+    return current
+
+
 def main():
     import argparse
 
     parser = argparse.ArgumentParser(description="Build and deploy flet-android-notifications demo")
     parser.add_argument("--skip-flet", action="store_true", help="skip flet build apk (reuse existing build dir)")
     parser.add_argument("--skip-install", action="store_true", help="skip adb install + launch")
+    parser.add_argument("--bytecode", action="store_true",
+                        help="inject optimized .pyc files instead of .py sources (host Python must match the app's)")
+    parser.add_argument("--keep-source", action="store_true",
+                        help="with --bytecode, also inject .py sources as a fallback")
+    parser.add_argument("--full-patch", action="store_true",
+                        help="rewrite all of app.zip instead of only the entries that changed")
+    parser.add_argument("--build-type", choices=BUILD_TYPES, default="release",
+                        help="flutter build mode (default: release); --push needs a debug install")
+    parser.add_argument("--python-only", action="store_true",
+                        help="only patch the Python payload into the last APK and reinstall it")
+    parser.add_argument("--push", action="store_true",
+                        help="copy only the changed Python files into the installed app (debug builds) "
+                             "instead of building and reinstalling an APK")
+    parser.add_argument("--force", action="store_true",
+                        help="ignore the build cache and run every step")
     args = parser.parse_args()
-
-    if not args.skip_flet:
-        step_flet_build()
-
-    step_patch_app_zip()
-    step_update_hash()
-    step_copy_test_resources()
-    step_flutter_build()
-
-    if not args.skip_install:
-        step_install()
-
+    started = time.perf_counter()
+    python_only = args.python_only or args.push
+    apk = apk_path(args.build_type)
+
+    cache = load_cache()
+    if args.force:
+        # the installed build type describes the device, not a build step, so it's kept
+        cache = {key: cache[key] for key in ("install_type",) if key in cache}
+    if args.push and cache.get("install_type", "debug") != "debug":
+        print(f"ERROR: the installed app is a {cache['install_type']} build, which run-as can't enter; "
+              "reinstall it with build.py --build-type debug before using --push.")
+        sys.exit(1)
+    inputs = {
+        "flet": fingerprint(*FLET_INPUTS),
+        "dart": fingerprint(DART_SRC),
+        "resources": fingerprint(TEST_RESOURCES),
+    }
+    if python_only:
+        built = (cache.get("flutter") or {}).get(args.build_type) or {}
+        last = {"flet": cache.get("flet"), "dart": built.get("dart"), "resources": built.get("resources")}
+        for name, fp in last.items():
+            if fp not in (None, inputs[name]):
+                print(f"note: {name} inputs changed; {'--push' if args.push else '--python-only'} "
+                      "leaves them out of the app")
+
+    if args.skip_flet or python_only:
+        pass
+    elif cache.get("flet") == inputs["flet"] and APP_ZIP.exists():
+        skipped("Step 1: flet build apk")
+    else:
+        with timed("flet build"):
+            step_flet_build()
+        # flet build regenerates build/flutter, so every later step is stale;
+        # the device still runs what was last installed or pushed
+        cache = {"flet": inputs["flet"], **{k: cache[k] for k in DEVICE_CACHE_KEYS if k in cache}}
+        save_cache(cache)
+
+    def patch():
+        with timed("patch app.zip"):
+            sha256 = step_patch_app_zip(args.bytecode, args.keep_source, args.full_patch)
+        with timed("app.zip.hash"):
+            step_update_hash(sha256)
+
+    def copy_resources():
+        with timed("copy test resources"):
+            step_copy_test_resources()
+
+    # patching and copying resources touch different files; only the cache is shared,
+    # and it's updated here once both are done
+    copy_needed = not python_only and (cache.get("resources") != inputs["resources"] or not RES_DIR.exists())
+    with ThreadPoolExecutor() as pool:
+        patched = pool.submit(patch)
+        copied = pool.submit(copy_resources) if copy_needed else None
+        patched.result()
+        if copied is not None:
+            copied.result()
+    if copied is not None:
+        cache["resources"] = inputs["resources"]
+        save_cache(cache)
+    else:
+        skipped("Step 4: copy test resources", "python-only" if python_only else "inputs unchanged")
+
+    # keyed on what app.zip holds rather than its bytes, which differ between
+    # a full and an incremental patch of the same sources
+    payload = fingerprint(extra=sorted(f"{a}={f}" for a, f in payload_entries().items()))
+    # one entry per build type, since each has its own APK
+    builds = cache.setdefault("flutter", {})
+    built = builds.get(args.build_type) or {}
+    wanted = {"dart": inputs["dart"], "resources": inputs["resources"], "payload": payload}
+    step5 = f"Step 5: flutter build apk --{args.build_type}"
+    if args.push:
+        skipped(step5, "push deploy")
+    elif built == wanted and apk.exists():
+        skipped(step5)
+    elif args.python_only:
+        # repacking re-signs the APK (debug key by default), so only on request
+        with timed("repack APK"):
+            step_repack_apk(apk)
+        builds[args.build_type] = {**built, "payload": payload}
+        save_cache(cache)
+    else:
+        if apk.exists() and {**built, "payload": payload} == wanted:
+            print("\nnote: only the Python payload changed; --python-only repacks the APK in seconds")
+        with timed("flutter build"):
+            step_flutter_build(args.build_type)
+        builds[args.build_type] = wanted
+        save_cache(cache)
+
+    if args.skip_install:
+        pass
+    elif args.push:
+        with timed("push"):
+            cache["pushed"] = step_push(cache.get("pushed", {}))
+        save_cache(cache)
+    elif cache.get("install") == fingerprint(apk):
+        skipped("Step 6: install on device", "this APK is already installed; --force to reinstall")
+    else:
+        with timed("install"):
+            step_install(apk)
+        cache["install"] = fingerprint(apk)
+        cache["install_type"] = args.build_type
+        # the APK carries this payload; later pushes only send what changes after it
+        cache["pushed"] = payload_entries()
+        save_cache(cache)
+
+    print_step_times(time.perf_counter() - started)
     print("\n=== DONE ===")
 
 
@@ -0,0 +1,45 @@
+"""Grouped chat notifications with an incrementally maintained summary."""
+
+import flet as ft
+from flet_android_notifications import FletAndroidNotifications, NotificationGroup
+
+
+def main(page: ft.Page):
+    page.vertical_alignment = ft.MainAxisAlignment.CENTER
+    page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
+
+    notifications = FletAndroidNotifications()
+    group = NotificationGroup(
+        notifications,
+        "chat",
+        summary_id=1000,
+        title="{count} new messages",
+        max_lines=4,
+        group_alert_behavior="summary",
+    )
+    count = 0
+
+    async def send(e):
+        nonlocal count
+        await notifications.request_permissions()
+        count += 1
+        # child + updated summary go out in a single native call
+        await group.add(1000 + count, f"Sender {count}", f"Message number {count}")
+
+    async def clear(e):
+        nonlocal count
+        await group.clear()
+        count = 0
+
+    page.add(
+        ft.Column(
+            controls=[
+                ft.Button(content="New message", on_click=send),
+                ft.Button(content="Clear group", on_click=clear),
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+        )
+    )
+
+
+ft.run(main)
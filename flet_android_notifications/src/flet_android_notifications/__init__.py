@@ -1,7 +1,83 @@
-from .flet_android_notifications import (
-    FletAndroidNotifications,
-    NotificationError,
-    BigTextStyle,
-    BigPictureStyle,
-    InboxStyle,
-)
+# Public names are loaded on first access (PEP 562), so importing the
+# package is cheap: styles don't pull in flet, and the service control is
+# only defined when FletAndroidNotifications is first used.
+from typing import TYPE_CHECKING
+
+_EXPORTS = {
+    "FletAndroidNotifications": "flet_android_notifications",
+    "NotificationError": "errors",
+    "CallTimeoutError": "errors",
+    "BigTextStyle": "styles",
+    "BigPictureStyle": "styles",
+    "InboxStyle": "styles",
+    "MessagingStyle": "styles",
+    "Message": "styles",
+    "MediaStyle": "styles",
+    "NotificationOutbox": "outbox",
+    "ScheduleStore": "store",
+    "CallPolicy": "policy",
+    "RetryPolicy": "policy",
+    "LatencyHistogram": "metrics",
+    "to_prometheus": "metrics",
+    "Span": "tracing",
+    "SpanProcessor": "tracing",
+    "SpanRecorder": "tracing",
+    "Tracer": "tracing",
+    "FakeBackend": "fake",
+    "CallRecorder": "replay",
+    "read_trace": "replay",
+    "replay_trace": "replay",
+    "LANES": "ratelimit",
+    "RateLimiter": "ratelimit",
+    "TokenBucket": "ratelimit",
+    "NotificationGroup": "groups",
+    "Conversation": "conversations",
+    "ImageCache": "images",
+    "CronRule": "recurrence",
+    "RRule": "recurrence",
+    "RecurrenceIndex": "recurrence",
+    "PeriodicScheduler": "scheduler",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .flet_android_notifications import FletAndroidNotifications
+    from .errors import NotificationError, CallTimeoutError
+    from .styles import (
+        BigTextStyle,
+        BigPictureStyle,
+        InboxStyle,
+        MessagingStyle,
+        Message,
+        MediaStyle,
+    )
+    from .outbox import NotificationOutbox
+    from .store import ScheduleStore
+    from .policy import CallPolicy, RetryPolicy
+    from .metrics import LatencyHistogram, to_prometheus
+    from .tracing import Span, SpanProcessor, SpanRecorder, Tracer
+    from .fake import FakeBackend
+    from .replay import CallRecorder, read_trace, replay_trace
+    from .ratelimit import LANES, RateLimiter, TokenBucket
+    from .groups import NotificationGroup
+    from .conversations import Conversation
+    from .images import ImageCache
+    from .recurrence import CronRule, RRule, RecurrenceIndex
+    from .scheduler import PeriodicScheduler
@@ -0,0 +1,129 @@
+import base64
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Union
+
+
+# Android passes notifications to the system server through Binder, whose
+# transaction buffer is about 1 MB for the whole process; keep well under it.
+MAX_BITMAP_BYTES = 512 * 1024
+
+BitmapData = Union[bytes, bytearray, memoryview]
+
+
+class BitmapRegistry:
+    """Process-wide LRU of in-memory images, keyed by content digest.
+
+    Notifications reference images by digest; the bytes are looked up here
+    when a call is sent, so the same image attached to many notifications
+    is stored once and crosses the bridge once per session.
+
+    Args:
+        max_bytes: Total size kept before least recently used images are
+            forgotten.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._total = 0
+
+    def register(self, data: BitmapData) -> str:
+        """Store data and return its digest.
+
+        Raises:
+            ValueError: If data is empty or larger than MAX_BITMAP_BYTES.
+        """
+        size = memoryview(data).nbytes
+        if size == 0:
+            raise ValueError("bitmap data is empty")
+        if size > MAX_BITMAP_BYTES:
+            raise ValueError(
+                f"bitmap data is {size} bytes, limit is {MAX_BITMAP_BYTES}; "
+                f"downscale it first (see ImageCache)"
+            )
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if digest in self._data:
+            self._data.move_to_end(digest)
+            return digest
+        self._data[digest] = bytes(data)
+        self._total += size
+        while self._total > self.max_bytes and len(self._data) > 1:
+            _, old = self._data.popitem(last=False)
+            self._total -= len(old)
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        data = self._data.get(digest)
+        if data is not None:
+            self._data.move_to_end(digest)
+        return data
+
+
+registry = BitmapRegistry()
+
+
+def register_bitmap(data: BitmapData) -> str:
+    """Register in-memory image bytes and return the digest to reference them by."""
+    return registry.register(data)
+
+
+def is_bitmap_data(value) -> bool:
+    return isinstance(value, (bytes, bytearray, memoryview))
+
+
+def bitmap_refs(method_name: str, arguments: Optional[dict]) -> list[str]:
+    """Return the digests of every in-memory image a call references."""
+    if not arguments:
+        return []
+    if method_name == "batch":
+        refs = []
+        for c in arguments["calls"]:
+            refs.extend(bitmap_refs(c["method"], c["args"]))
+        return refs
+    refs = []
+    if arguments.get("large_icon_type") == "bytes":
+        refs.append(arguments["large_icon"])
+    style = arguments.get("style")
+    if style:
+        if style.get("bitmap_type") == "bytes":
+            refs.append(style["bitmap_value"])
+        if style.get("large_icon_type") == "bytes":
+            refs.append(style["large_icon_value"])
+    return refs
+
+
+def embed_bitmaps(method_name: str, arguments: Optional[dict]) -> Optional[dict]:
+    """Return arguments with the bytes of every referenced image inlined.
+
+    For calls persisted outside this process (outbox, schedule store,
+    traces): the registry is in memory, so the digests alone can't be
+    resolved after a restart. Images are added under "bitmap_data" as
+    base64 text; restore_bitmaps() registers them again.
+    """
+    refs = bitmap_refs(method_name, arguments)
+    if not refs:
+        return arguments
+    inlined = {}
+    for digest in refs:
+        data = registry.get(digest)
+        if data is not None:
+            inlined[digest] = base64.b64encode(data).decode("ascii")
+    arguments = {k: v for k, v in arguments.items() if k != "bitmaps"}
+    if inlined:
+        arguments["bitmap_data"] = inlined
+    return arguments
+
+
+def restore_bitmaps(arguments: Optional[dict]) -> Optional[dict]:
+    """Register images inlined by embed_bitmaps() and return the plain arguments."""
+    if not arguments or "bitmap_data" not in arguments:
+        return arguments
+    for data in arguments["bitmap_data"].values():
+        registry.register(base64.b64decode(data))
+    return {k: v for k, v in arguments.items() if k != "bitmap_data"}
+
+
+def missing_bitmaps(method_name: str, arguments: Optional[dict]) -> list[str]:
+    """Return the digests a call references that the registry doesn't hold."""
+    return [d for d in bitmap_refs(method_name, arguments) if registry.get(d) is None]
@@ -0,0 +1,103 @@
+from collections import deque
+from typing import TYPE_CHECKING, Optional, Union
+
+from .styles import Message, MessagingStyle
+
+if TYPE_CHECKING:
+    from .flet_android_notifications import FletAndroidNotifications
+
+
+class Conversation:
+    """A MessagingStyle chat notification that grows one message at a time.
+
+    The first append() posts the notification with a full MessagingStyle.
+    Later appends ship only the new message; the native side keeps the
+    conversation and re-posts it with the most recent history_size
+    messages. If the native side has lost the conversation (the user
+    dismissed it, the app restarted), the next append re-posts it in full
+    from the history kept here.
+
+    Args:
+        notifications: The service to post through.
+        notification_id: Notification id for this conversation.
+        title: Notification title.
+        person_name: Display name of the device user; messages without a
+            sender are shown as theirs.
+        conversation_title: Title shown for group conversations.
+        group_conversation: Whether this is a group conversation.
+        history_size: How many recent messages the notification keeps.
+        **options: Extra show_notification keyword arguments (channel_id,
+            icon, large_icon, ...).
+
+    Usage:
+        chat = Conversation(notifications, 42, "Ana")
+        await chat.append(Message("Lunch?", sender="Ana"))
+        await chat.append("Sure")  # from the device user
+    """
+
+    def __init__(
+        self,
+        notifications: "FletAndroidNotifications",
+        notification_id: int,
+        title: str,
+        *,
+        person_name: str = "Me",
+        conversation_title: Optional[str] = None,
+        group_conversation: bool = False,
+        history_size: int = 25,
+        **options,
+    ):
+        if history_size < 1:
+            raise ValueError(f"history_size must be >= 1, got: {history_size}")
+        if "style" in options:
+            raise ValueError("style is managed by Conversation")
+        self.notifications = notifications
+        self.notification_id = notification_id
+        self.title = title
+        self.person_name = person_name
+        self.conversation_title = conversation_title
+        self.group_conversation = group_conversation
+        self.history_size = history_size
+        self.options = options
+        self._history: deque = deque(maxlen=history_size)
+        self._shown = False
+
+    @property
+    def messages(self) -> list[Message]:
+        return list(self._history)
+
+    async def append(self, message: Union[Message, str]):
+        """Add a message, sending only that message when possible.
+
+        A plain string is taken as a message from the device user.
+        """
+        if isinstance(message, str):
+            message = Message(message)
+        self._history.append(message)
+        if self._shown and await self.notifications.append_message(
+            self.notification_id, message, history_size=self.history_size
+        ):
+            return
+        await self._show()
+
+    async def _show(self):
+        style = MessagingStyle(
+            self.person_name,
+            list(self._history),
+            conversation_title=self.conversation_title,
+            group_conversation=self.group_conversation,
+        )
+        await self.notifications.show_notification(
+            self.notification_id,
+            self.title,
+            self._history[-1].text,
+            style=style,
+            **self.options,
+        )
+        self._shown = True
+
+    async def cancel(self):
+        """Cancel the notification and forget the history."""
+        await self.notifications.cancel(self.notification_id)
+        self._history.clear()
+        self._shown = False
@@ -0,0 +1,10 @@
+class NotificationError(Exception):
+    """Raised when a notification operation fails on the native side."""
+
+    pass
+
+
+class CallTimeoutError(NotificationError, TimeoutError):
+    """Raised when a native call gets no response within the call policy's timeout."""
+
+    pass
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import random
+from collections import Counter
+from typing import Optional
+
+from .bitmaps import bitmap_refs
+from .outbox import QUEUEABLE_METHODS
+from .store import schedule_checksum
+
+
+_POSTING_METHODS = {"show_notification", "start_foreground_service"}
+_SCHEDULE_METHODS = {"schedule_notification", "periodically_show", "periodically_show_with_duration"}
+# Calls that change notification state and can have failures injected.
+_FALLIBLE_METHODS = QUEUEABLE_METHODS | {"append_message", "update_foreground_service"}
+
+
+class FakeBackend:
+    """In-process stand-in for the Dart side of FletAndroidNotifications.
+
+    Answers every native method with the same result strings as the real
+    client and keeps active, pending, conversation and foreground state in
+    memory, so code and load patterns can be exercised without a device or
+    a Flet session. Install it with set_backend().
+
+    Args:
+        latency: Seconds each call takes, simulating the bridge round trip.
+        jitter: Extra random delay of up to this many seconds per call.
+        error_rate: Fraction of state-changing calls that fail with
+            "error:injected failure".
+        seed: Seed for jitter and injected failures.
+
+    Usage:
+        backend = FakeBackend(latency=0.004)
+        notifications.set_backend(backend)
+        await notifications.show_notification(1, "Hi", "there")
+        backend.active[1]["title"]  # "Hi"
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        if latency < 0 or jitter < 0:
+            raise ValueError("latency and jitter must be >= 0")
+        if not 0 <= error_rate <= 1:
+            raise ValueError(f"error_rate must be between 0 and 1, got: {error_rate}")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls: Counter = Counter()
+        self.active: dict[int, dict] = {}
+        self.pending: dict[int, dict] = {}
+        self.conversations: set[int] = set()
+        self.foreground: Optional[dict] = None
+        self.bitmaps: set[str] = set()
+        self._random = random.Random(seed)
+
+    async def __call__(self, method_name: str, arguments: Optional[dict] = None):
+        delay = self.latency + (self._random.random() * self.jitter if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._dispatch(method_name, arguments or {})
+
+    def reset(self) -> None:
+        """Forget all notification state, as after an app reinstall."""
+        self.active.clear()
+        self.pending.clear()
+        self.conversations.clear()
+        self.foreground = None
+        self.bitmaps.clear()
+
+    def _dispatch(self, method_name: str, a: dict):
+        self.calls[method_name] += 1
+        if "bitmaps" in a:
+            self.bitmaps.update(a["bitmaps"])
+            a = {k: v for k, v in a.items() if k != "bitmaps"}
+        missing = [d for d in bitmap_refs(method_name, a) if d not in self.bitmaps]
+        if missing:
+            return f"error:bitmap_missing:{missing[0]}"
+        if method_name == "batch":
+            return json.dumps([self._dispatch(c["method"], c["args"]) for c in a["calls"]])
+        if (
+            self.error_rate
+            and method_name in _FALLIBLE_METHODS
+            and self._random.random() < self.error_rate
+        ):
+            return "error:injected failure"
+
+        if method_name in _POSTING_METHODS:
+            self.active[a["id"]] = a
+            style = a.get("style") or {}
+            if method_name == "show_notification" and style.get("type") == "messaging":
+                self.conversations.add(a["id"])
+            else:
+                self.conversations.discard(a["id"])
+            if method_name == "start_foreground_service":
+                self.foreground = dict(a)
+            return "ok"
+        if method_name in _SCHEDULE_METHODS:
+            self.pending[a["id"]] = a
+            return "ok"
+        if method_name == "append_message":
+            if a["id"] not in self.conversations:
+                return "conversation_missing"
+            self.active[a["id"]] = {**self.active[a["id"]], "body": a["message"]["text"]}
+            return "ok"
+        if method_name == "update_foreground_service":
+            if self.foreground is None:
+                return "error:no foreground service is running"
+            self.foreground.update(a)
+            self.active[self.foreground["id"]] = dict(self.foreground)
+            return "ok"
+        if method_name == "stop_foreground_service":
+            if self.foreground is not None:
+                self.active.pop(self.foreground["id"], None)
+                self.foreground = None
+            return "ok"
+        if method_name == "cancel":
+            self.active.pop(a["id"], None)
+            self.pending.pop(a["id"], None)
+            self.conversations.discard(a["id"])
+            return "ok"
+        if method_name == "cancel_all":
+            self.active.clear()
+            self.pending.clear()
+            self.conversations.clear()
+            return "ok"
+        if method_name == "get_active_notifications":
+            return json.dumps([
+                {
+                    "id": n["id"],
+                    "title": n.get("title", ""),
+                    "body": n.get("body", ""),
+                    "channel_id": n.get("channel_id", ""),
+                    "payload": n.get("payload", ""),
+                }
+                for n in self.active.values()
+            ])
+        if method_name == "get_pending_notifications":
+            return json.dumps([
+                {
+                    "id": n["id"],
+                    "title": n.get("title", ""),
+                    "body": n.get("body", ""),
+                    "payload": n.get("payload", ""),
+                    "content_hash": n.get("content_hash"),
+                }
+                for n in self.pending.values()
+            ])
+        if method_name == "get_pending_checksum":
+            return schedule_checksum((i, n.get("content_hash")) for i, n in self.pending.items())
+        if method_name in ("request_permissions", "request_exact_alarm_permission"):
+            return "true"
+        if method_name == "get_native_metrics":
+            return json.dumps({"methods": {}})
+        if method_name == "set_native_profiling":
+            return "ok"
+        if method_name == "get_native_profile":
+            return json.dumps({"enabled": False, "methods": {}})
+        return None
@@ -1,116 +1,88 @@
+import asyncio
+import contextlib
+import hashlib
+from contextvars import ContextVar
 from datetime import datetime
 import json
+import time
 import flet as ft
-from typing import Optional, Union
-
-
-class NotificationError(Exception):
-    """Raised when a notification operation fails on the native side."""
-
-    pass
-
-
-class BigTextStyle:
-    """Expandable big text notification style.
-
-    When the notification is expanded, shows the full big_text content
-    instead of the truncated body.
-    """
-
-    def __init__(
-        self,
-        big_text: str,
-        *,
-        content_title: Optional[str] = None,
-        summary_text: Optional[str] = None,
-    ):
-        self.big_text = big_text
-        self.content_title = content_title
-        self.summary_text = summary_text
-
-    def to_dict(self) -> dict:
-        return {
-            "type": "big_text",
-            "big_text": self.big_text,
-            "content_title": self.content_title,
-            "summary_text": self.summary_text,
-        }
+from collections import Counter
+from typing import TYPE_CHECKING, Awaitable, Callable, Container, Optional, Union
+
+from .bitmaps import (
+    BitmapData,
+    bitmap_refs,
+    embed_bitmaps,
+    is_bitmap_data,
+    missing_bitmaps,
+    register_bitmap,
+    restore_bitmaps,
+)
+from .bitmaps import registry as bitmap_registry
+from .errors import CallTimeoutError, NotificationError
+from .metrics import CallMetrics, estimate_size, native_profile, native_snapshot
+from .outbox import QUEUEABLE_METHODS, NotificationOutbox
+from .policy import CallPolicy
+from .ratelimit import LANES, RateLimiter, lane_for_importance, validate_lane
+from .styles import (
+    BigPictureStyle,
+    BigTextStyle,
+    InboxStyle,
+    MediaStyle,
+    Message,
+    MessagingStyle,
+    NotificationStyle,
+)
+
+if TYPE_CHECKING:
+    from .replay import CallRecorder
+    from .store import ScheduleStore
+    from .tracing import Span, Tracer
+
+
+class _SessionUnavailableError(RuntimeError):
+    """The control isn't attached to a page, so the call could not be sent."""
+
+
+# Raised by _attempt when the call never reached (or never came back
+# from) the client: no page attached, session dropped, response timed out.
+_TRANSPORT_ERRORS = (_SessionUnavailableError, ConnectionError, TimeoutError, asyncio.TimeoutError)
+
+# Failures worth retrying: the client may answer on a later attempt.
+_TRANSIENT_ERRORS = (ConnectionError, TimeoutError, asyncio.TimeoutError)
+
+# Calls that post a notification right away and count against Android's
+# per-app post rate.
+_RATE_LIMITED_METHODS = {
+    "show_notification", "start_foreground_service", "append_message", "update_foreground_service",
+}
 
+# Calls that leave a pending request behind; they carry a content hash so
+# reconcile_schedule() can tell which pending entries are still current.
+_SCHEDULE_METHODS = {"schedule_notification", "periodically_show", "periodically_show_with_duration"}
 
-class BigPictureStyle:
-    """Notification style that shows a large image when expanded.
+# Calls whose notification can be traced from the Python call to the tap.
+_TRACED_METHODS = _RATE_LIMITED_METHODS | _SCHEDULE_METHODS
 
-    Provide exactly one of file_path or drawable_resource for the main image.
-    Optionally provide a large icon via large_icon_file_path or large_icon_drawable_resource.
-    """
+# (service, captured calls) while inside FletAndroidNotifications.batch().
+_current_batch: ContextVar[Optional[tuple]] = ContextVar(
+    "flet_android_notifications_batch", default=None
+)
 
-    def __init__(
-        self,
-        *,
-        file_path: Optional[str] = None,
-        drawable_resource: Optional[str] = None,
-        content_title: Optional[str] = None,
-        summary_text: Optional[str] = None,
-        large_icon_file_path: Optional[str] = None,
-        large_icon_drawable_resource: Optional[str] = None,
-        hide_expanded_large_icon: bool = False,
-    ):
-        if file_path and drawable_resource:
-            raise ValueError("provide exactly one of file_path or drawable_resource, not both")
-        if not file_path and not drawable_resource:
-            raise ValueError("provide exactly one of file_path or drawable_resource")
-        self.file_path = file_path
-        self.drawable_resource = drawable_resource
-        self.content_title = content_title
-        self.summary_text = summary_text
-        self.large_icon_file_path = large_icon_file_path
-        self.large_icon_drawable_resource = large_icon_drawable_resource
-        self.hide_expanded_large_icon = hide_expanded_large_icon
-
-    def to_dict(self) -> dict:
-        bitmap_type = "file_path" if self.file_path else "drawable_resource"
-        bitmap_value = self.file_path or self.drawable_resource
-        d = {
-            "type": "big_picture",
-            "bitmap_type": bitmap_type,
-            "bitmap_value": bitmap_value,
-            "content_title": self.content_title,
-            "summary_text": self.summary_text,
-            "hide_expanded_large_icon": self.hide_expanded_large_icon,
-        }
-        if self.large_icon_file_path:
-            d["large_icon_type"] = "file_path"
-            d["large_icon_value"] = self.large_icon_file_path
-        elif self.large_icon_drawable_resource:
-            d["large_icon_type"] = "drawable_resource"
-            d["large_icon_value"] = self.large_icon_drawable_resource
-        return d
-
-
-class InboxStyle:
-    """Notification style that shows a list of text lines when expanded."""
-
-    def __init__(
-        self,
-        lines: list[str],
-        *,
-        content_title: Optional[str] = None,
-        summary_text: Optional[str] = None,
-    ):
-        self.lines = lines
-        self.content_title = content_title
-        self.summary_text = summary_text
 
-    def to_dict(self) -> dict:
-        return {
-            "type": "inbox",
-            "lines": self.lines,
-            "content_title": self.content_title,
-            "summary_text": self.summary_text,
-        }
+def _content_hash(method_name: str, arguments: dict) -> str:
+    """Stable digest of a schedule call, stored natively with the pending request."""
+    canonical = json.dumps([method_name, arguments], sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode(), digest_size=8).hexdigest()
 
 
-NotificationStyle = Union[BigTextStyle, BigPictureStyle, InboxStyle]
+def _posted(method_name: str, arguments: Optional[dict]) -> list[dict]:
+    """Return the arguments of every notification a call posts right away."""
+    if method_name == "batch":
+        return [c["args"] for c in arguments["calls"] if c["method"] in _RATE_LIMITED_METHODS]
+    if method_name in _RATE_LIMITED_METHODS:
+        return [arguments]
+    return []
 
 
 _VALID_VISIBILITIES = {"public", "private", "secret"}
@@ -147,16 +119,551 @@ def _validate_color_hex(color: str) -> None:
         raise ValueError(f"color contains invalid hex characters: {color!r}")
 
 
+def _validate_chronometer(
+    uses_chronometer: bool, chronometer_count_down: bool, when: Optional[datetime]
+) -> None:
+    """Validate that a countdown chronometer has a target time."""
+    if chronometer_count_down and not uses_chronometer:
+        raise ValueError("chronometer_count_down requires uses_chronometer=True")
+    if chronometer_count_down and when is None:
+        raise ValueError("chronometer_count_down requires when (the time to count down to)")
+
+
+def _resolve_large_icon(
+    large_icon: Optional[Union[str, BitmapData]], large_icon_type: str
+) -> tuple[Optional[str], str]:
+    """Swap in-memory large icon bytes for their registry digest."""
+    if large_icon is not None and is_bitmap_data(large_icon):
+        return register_bitmap(large_icon), "bytes"
+    return large_icon, large_icon_type
+
+
 @ft.control("flet_android_notifications")
 class FletAndroidNotifications(ft.Service):
     on_notification_tap: Optional[ft.ControlEventHandler["FletAndroidNotifications"]] = None
 
+    def init(self):
+        super().init()
+        # Python-only state; kept out of the declared fields so it is never
+        # serialized to the Dart side.
+        self._outbox: Optional[NotificationOutbox] = None
+        self._outbox_lock: Optional[asyncio.Lock] = None
+        self._policy = CallPolicy()
+        self._timeouts: Counter = Counter()
+        self._retries: Counter = Counter()
+        # queued calls the client rejected on replay, per method
+        self._dropped: Counter = Counter()
+        self._in_flight = 0
+        self._metrics = CallMetrics()
+        self._rate_limiter: Optional[RateLimiter] = None
+        self._sent_bitmaps: set[str] = set()
+        self._schedule_store: Optional["ScheduleStore"] = None
+        # fields of the foreground update waiting behind the one in flight
+        self._foreground_update: Optional[dict] = None
+        self._foreground_lock = asyncio.Lock()
+        self._tracer: Optional["Tracer"] = None
+        self._backend: Optional[Callable[[str, Optional[dict]], Awaitable]] = None
+        self._recorder: Optional["CallRecorder"] = None
+
+    def before_event(self, e: ft.ControlEvent):
+        if self._tracer is not None and e.name == "notification_tap":
+            self._trace_tap(e.data)
+        return super().before_event(e)
+
     def _check_error(self, result):
         """Check if Dart returned an error and raise if so."""
         if isinstance(result, str) and result.startswith("error:"):
             raise NotificationError(result[6:])
         return result
 
+    def set_call_policy(self, policy: CallPolicy) -> None:
+        """Set timeouts and retry behavior for all native calls.
+
+        The default policy times out each attempt after 30 seconds (120 for
+        permission prompts) and retries timeouts and dropped connections up
+        to 3 attempts with jittered exponential backoff.
+        """
+        self._policy = policy
+
+    def get_call_stats(self) -> dict:
+        """Return timeout, retry and dropped outbox call counts per method and the in-flight call count."""
+        return {
+            "timeouts": dict(self._timeouts),
+            "retries": dict(self._retries),
+            "dropped": dict(self._dropped),
+            "in_flight": self._in_flight,
+        }
+
+    def get_metrics(self) -> dict:
+        """Return per-method call metrics measured around each native call.
+
+        Returns:
+            dict: {"methods": {name: {"calls", "errors", "bytes_sent",
+                "latency": {"count", "sum_ms", "mean_ms", "p50_ms", "p90_ms",
+                "p99_ms", "max_ms"}}}, "in_flight", "timeouts", "retries"}.
+                Latency covers retries and is bucketed with about 3%
+                relative error. Pass the dict to metrics.to_prometheus()
+                for the Prometheus text format.
+        """
+        return {
+            "methods": self._metrics.snapshot(),
+            **self.get_call_stats(),
+        }
+
+    async def get_native_metrics(self) -> dict:
+        """Return per-method metrics measured natively around _onMethod.
+
+        Same shape as get_metrics()["methods"], minus bytes_sent. Add it to
+        a get_metrics() dict under "native" to export both sides together.
+
+        Raises:
+            NotificationError: If the native side reports an error.
+        """
+        return native_snapshot(json.loads(await self._call("get_native_metrics")))
+
+    async def set_native_profiling(self, enabled: bool) -> None:
+        """Turn per-phase timing of native method dispatch on or off.
+
+        While on, the Dart side splits each call into phases: bitmaps
+        (storing attached images), copy (argument map copies), init (plugin
+        initialization), parse (casts and parsing helpers), details
+        (building NotificationDetails), plugin (the platform channel call)
+        and other. This costs a zone and a few stopwatch reads per call.
+        Turning it off discards the collected timings.
+
+        Raises:
+            NotificationError: If the native side reports an error.
+        """
+        await self._call("set_native_profiling", {"enabled": enabled})
+
+    async def get_native_profile(self, *, reset: bool = False) -> dict:
+        """Return aggregated per-phase timings collected by set_native_profiling.
+
+        Args:
+            reset: Clear the collected timings after reading them.
+
+        Returns:
+            dict: {method: {"calls", "total_ms", "phases": {phase: {"share",
+                "count", "sum_ms", "mean_ms", "p50_ms", "p90_ms", "p99_ms",
+                "max_ms"}}}}, phases sorted by total time, largest first.
+                Calls that nest others (batch, append_message,
+                update_foreground_service) count the nested dispatch as
+                "other"; the nested calls are profiled under their own names.
+
+        Raises:
+            NotificationError: If the native side reports an error.
+        """
+        raw = json.loads(await self._call("get_native_profile", {"reset": reset}))
+        return native_profile(raw)
+
+    def set_backend(self, backend: Optional[Callable[[str, Optional[dict]], Awaitable]]) -> None:
+        """Send native calls to backend instead of the Flet client.
+
+        backend is an async callable taking (method_name, arguments) and
+        returning what the Dart side would, e.g. a FakeBackend. Everything
+        before the bridge (batching, rate limiting, retries, metrics) still
+        runs. Pass None to talk to the client again.
+        """
+        self._backend = backend
+
+    def set_recorder(self, recorder: Optional["CallRecorder"]) -> None:
+        """Log every native call to recorder, for replay_trace() later. Pass None to stop."""
+        self._recorder = recorder
+
+    def set_tracer(self, tracer: Optional["Tracer"]) -> None:
+        """Trace notifications from the Python call to the user's tap.
+
+        With a tracer set, every show/schedule/append call gets a span
+        ("notification.<method>") that ends when the native side answers.
+        Its trace and span ids travel inside the notification, and a tap on
+        it ends a "notification.tap" child span covering the time from post
+        to tap. Tap events then also carry id, trace_id, span_id,
+        posted_at_ms and latency_ms. Pass None to stop tracing.
+        """
+        self._tracer = tracer
+
+    def _start_span(self, method_name: str, arguments: dict, spans: list, index: int = 0) -> dict:
+        span = self._tracer.start_span(
+            f"notification.{method_name}",
+            attributes={
+                "notification.id": arguments.get("id"),
+                "notification.channel_id": arguments.get("channel_id"),
+            },
+        )
+        spans.append((index, span))
+        return {**arguments, "trace": {"trace_id": span.trace_id, "span_id": span.span_id}}
+
+    async def _traced(self, method_name: str, arguments: Optional[dict], lane: Optional[str]):
+        """Submit a call with a span around every notification it posts."""
+        spans: list[tuple[int, "Span"]] = []
+        if method_name == "batch":
+            arguments = {
+                **arguments,
+                "calls": [
+                    {**c, "args": self._start_span(c["method"], c["args"], spans, i)}
+                    if c["method"] in _TRACED_METHODS
+                    else c
+                    for i, c in enumerate(arguments["calls"])
+                ],
+            }
+        elif method_name in _TRACED_METHODS:
+            arguments = self._start_span(method_name, arguments, spans)
+        if not spans:
+            return await self._submit(method_name, arguments, lane)
+        try:
+            result = await self._submit(method_name, arguments, lane)
+        except Exception as e:
+            for _, span in spans:
+                span.set_status("error", str(e))
+                span.end()
+            raise
+        results = None
+        if method_name == "batch" and isinstance(result, str) and result.startswith("["):
+            results = json.loads(result)
+        for index, span in spans:
+            outcome = results[index] if results is not None else result
+            if isinstance(outcome, str) and outcome.startswith("error:"):
+                span.set_status("error", outcome[6:])
+            else:
+                span.set_status("ok")
+                if outcome in ("queued", "coalesced", "conversation_missing"):
+                    span.set_attribute("notification.result", outcome)
+            span.end()
+        return result
+
+    def _trace_tap(self, data) -> None:
+        try:
+            event = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if not event.get("trace_id"):
+            return
+        end = time.time_ns()
+        latency_ms = event.get("latency_ms")
+        span = self._tracer.start_span(
+            "notification.tap",
+            trace_id=event["trace_id"],
+            parent_id=event.get("span_id"),
+            attributes={
+                "notification.id": event.get("id"),
+                "notification.action_id": event.get("action_id", ""),
+                "notification.latency_ms": latency_ms,
+            },
+            # the native side measured post-to-tap on its own clock
+            start_time=end - int(latency_ms * 1_000_000) if latency_ms is not None else end,
+        )
+        span.set_status("ok")
+        span.end(end)
+
+    def set_rate_limiter(self, limiter: Optional[RateLimiter]) -> None:
+        """Pace notification posts through limiter. Pass None to disable.
+
+        Applies to show_notification and start_foreground_service; scheduled
+        and periodic notifications are posted later by the OS.
+        """
+        self._rate_limiter = limiter
+
+    def set_outbox(self, outbox: Optional[NotificationOutbox]) -> None:
+        """Queue state-changing calls in outbox while the session is disconnected.
+
+        With an outbox set, show/schedule/cancel calls that fail to reach
+        the client are persisted and return "queued" instead of raising.
+        They are replayed in order before the next call goes through, or
+        explicitly via flush_outbox() (e.g. from page.on_connect).
+        Pass None to disable.
+        """
+        self._outbox = outbox
+
+    def set_schedule_store(self, store: Optional["ScheduleStore"]) -> None:
+        """Keep a local copy of the schedule in store for restore_schedule().
+
+        Every schedule/periodic call is recorded once it goes through (or
+        is queued in the outbox), and cancel and cancel_all remove entries.
+        Pass None to stop recording.
+        """
+        self._schedule_store = store
+
+    async def restore_schedule(self) -> dict:
+        """Re-schedule entries from the schedule store that are missing natively.
+
+        Call on app start. A checksum of the native pending requests is
+        compared with the store's first; only when they differ is the full
+        pending list fetched, and only missing or outdated entries are
+        re-sent, in one batched native call. Pending requests the store
+        doesn't know about are left alone.
+
+        Returns:
+            dict: {"restored": [ids], "skipped": [ids], "in_sync": bool}
+                where in_sync means the checksums matched and nothing had
+                to be compared. skipped entries reference an image whose
+                bytes are no longer available.
+
+        Raises:
+            ValueError: If no schedule store is set.
+            NotificationError: If a restored entry fails natively.
+        """
+        store = self._schedule_store
+        if store is None:
+            raise ValueError("no schedule store set; call set_schedule_store() first")
+        store.prune()
+        if await self._call("get_pending_checksum") == store.checksum():
+            return {"restored": [], "skipped": [], "in_sync": True}
+        pending = {p["id"]: p.get("content_hash") for p in await self.get_pending_notifications()}
+        missing, skipped = [], []
+        for method_name, arguments in store.entries():
+            if pending.get(arguments["id"]) == arguments["content_hash"]:
+                continue
+            arguments = restore_bitmaps(arguments)
+            if missing_bitmaps(method_name, arguments):
+                skipped.append(arguments["id"])
+            else:
+                missing.append((method_name, arguments))
+        if missing:
+            async with self.batch():
+                for method_name, arguments in missing:
+                    await self._call(method_name, arguments)
+        return {"restored": [a["id"] for _, a in missing], "skipped": skipped, "in_sync": False}
+
+    async def flush_outbox(self) -> int:
+        """Replay queued calls now. Returns how many were delivered.
+
+        Raises:
+            RuntimeError: If the session is still disconnected.
+        """
+        if self._outbox is None or not len(self._outbox):
+            return 0
+        if self._outbox_lock is None:
+            self._outbox_lock = asyncio.Lock()
+        async with self._outbox_lock:
+            # native "error:" results still count as delivered — the call
+            # reached the device and replaying it again would not help
+            return await self._outbox.drain(self._replay_queued)
+
+    async def _replay_queued(self, method_name: str, arguments: Optional[dict]):
+        try:
+            return await self._send(method_name, restore_bitmaps(arguments))
+        except CallTimeoutError:
+            raise
+        except NotificationError as e:
+            # rejected for good; left queued it would block every call behind it
+            self._dropped[method_name] += 1
+            return f"error:{e}"
+
+    async def _call(
+        self,
+        method_name: str,
+        arguments: Optional[dict] = None,
+        *,
+        lane: Optional[str] = None,
+    ):
+        """Invoke a native method and raise on a Dart-side error.
+
+        Single dispatch point for every public method. lane only matters for
+        rate-limited calls and defaults from the notification's importance.
+        """
+        if method_name in _SCHEDULE_METHODS and "content_hash" not in arguments:
+            arguments = {**arguments, "content_hash": _content_hash(method_name, arguments)}
+        batch = _current_batch.get()
+        if batch is not None and batch[0] is self and method_name in QUEUEABLE_METHODS:
+            batch[1].append((method_name, arguments, lane))
+            return "batched"
+        if self._recorder is not None:
+            self._recorder.record(method_name, arguments, lane)
+        if self._tracer is not None:
+            result = await self._traced(method_name, arguments, lane)
+        else:
+            result = await self._submit(method_name, arguments, lane)
+        if self._schedule_store is not None:
+            self._record_schedule(method_name, arguments, result)
+        return result
+
+    def _record_schedule(self, method_name: str, arguments: Optional[dict], result) -> None:
+        """Apply a delivered (or queued) call to the schedule store.
+
+        Only runs once the call went through, so a schedule the device
+        rejected isn't restored later; calls that failed inside a batch
+        are skipped too.
+        """
+        if method_name != "batch":
+            self._schedule_store.record(method_name, arguments)
+            return
+        calls = arguments["calls"]
+        results = json.loads(result) if isinstance(result, str) and result.startswith("[") else []
+        for i, c in enumerate(calls):
+            r = results[i] if i < len(results) else None
+            if not (isinstance(r, str) and r.startswith("error:")):
+                self._schedule_store.record(c["method"], c["args"])
+
+    async def _submit(self, method_name: str, arguments: Optional[dict], lane: Optional[str]):
+        """Pace posting calls through the rate limiter, then deliver."""
+        limiter = self._rate_limiter
+        posts = _posted(method_name, arguments) if limiter is not None else []
+        if posts:
+            channels = {a.get("channel_id") for a in posts}
+            return await limiter.submit(
+                # appends must never coalesce: each one carries a distinct message
+                arguments.get("id") if method_name != "append_message" else None,
+                channels.pop() if len(channels) == 1 else None,
+                lambda: self._deliver(method_name, arguments),
+                cost=len(posts),
+                lane=lane or min(
+                    (lane_for_importance(a.get("importance")) for a in posts), key=LANES.index
+                ),
+            )
+        return await self._deliver(method_name, arguments)
+
+    async def _deliver(self, method_name: str, arguments: Optional[dict] = None):
+        """Send a call, diverting it to the outbox if the session is gone."""
+        outbox = self._outbox
+        if outbox is None or (method_name not in QUEUEABLE_METHODS and method_name != "batch"):
+            return self._check_error(await self._send(method_name, arguments))
+        try:
+            await self.flush_outbox()
+            result = await self._send(method_name, arguments)
+        except _TRANSPORT_ERRORS:
+            # the outbox outlives the process, the bitmap registry doesn't
+            if method_name == "batch":
+                for c in arguments["calls"]:
+                    outbox.append(c["method"], embed_bitmaps(c["method"], c["args"]))
+            else:
+                outbox.append(method_name, embed_bitmaps(method_name, arguments))
+            return "queued"
+        return self._check_error(result)
+
+    @contextlib.asynccontextmanager
+    async def batch(self):
+        """Collect state-changing calls and send them as one native call.
+
+        Inside the block, show/schedule/cancel calls made on this instance
+        from the same task return "batched" right away; on exit they are
+        delivered together in order, saving one bridge round trip per call.
+        Queries still run immediately. Nothing is sent if the block raises.
+
+        Usage:
+            async with notifications.batch():
+                await notifications.show_notification(1, "a", "b")
+                await notifications.show_notification(2, "c", "d")
+
+        Raises:
+            NotificationError: If any call in the batch failed natively. The
+                other calls are still applied.
+        """
+        current = _current_batch.get()
+        if current is not None and current[0] is self:
+            # nested: fold into the outer batch
+            yield
+            return
+        calls: list = []
+        token = _current_batch.set((self, calls))
+        try:
+            yield
+        finally:
+            _current_batch.reset(token)
+        if not calls:
+            return
+        lanes = [lane for _, _, lane in calls if lane is not None]
+        result = await self._call(
+            "batch",
+            {"calls": [{"method": m, "args": a} for m, a, _ in calls]},
+            lane=min(lanes, key=LANES.index) if lanes else None,
+        )
+        if isinstance(result, str) and result.startswith("["):
+            errors = [
+                f"{m}: {r[6:]}"
+                for (m, _, _), r in zip(calls, json.loads(result))
+                if isinstance(r, str) and r.startswith("error:")
+            ]
+            if errors:
+                raise NotificationError("; ".join(errors))
+
+    async def _send(self, method_name: str, arguments: Optional[dict] = None):
+        """Invoke a native method under the call policy and return the raw result.
+
+        In-memory images referenced by digest are attached the first time
+        they are sent; afterwards the client serves them from its cache.
+
+        Raises:
+            CallTimeoutError: If every attempt timed out.
+        """
+        refs = bitmap_refs(method_name, arguments)
+        if not refs:
+            return await self._attempt(method_name, arguments)
+        unsent = [d for d in refs if d not in self._sent_bitmaps]
+        if unsent:
+            arguments = {**arguments, "bitmaps": self._bitmap_payload(unsent)}
+        result = await self._attempt(method_name, arguments)
+        if isinstance(result, str) and "bitmap_missing:" in result:
+            # the client restarted or evicted its copy; resend them all once
+            self._sent_bitmaps.clear()
+            arguments = {**arguments, "bitmaps": self._bitmap_payload(refs)}
+            result = await self._attempt(method_name, arguments)
+        if len(self._sent_bitmaps) > 1024:
+            self._sent_bitmaps.clear()
+        self._sent_bitmaps.update(refs)
+        return result
+
+    def _bitmap_payload(self, digests: list[str]) -> dict:
+        payload = {}
+        for digest in digests:
+            data = bitmap_registry.get(digest)
+            if data is None:
+                raise NotificationError(
+                    f"bitmap {digest} was evicted from the registry; pass the bytes again"
+                )
+            payload[digest] = data
+        return payload
+
+    async def _attempt(self, method_name: str, arguments: Optional[dict] = None):
+        """Run the call policy's timeout and retry loop around _invoke_method."""
+        policy = self._policy
+        timeout = policy.timeout_for(method_name)
+        attempts = policy.max_attempts_for(method_name, arguments)
+        nbytes = estimate_size(arguments) if arguments else 0
+        sent = 0
+        failed = True
+        started = time.perf_counter()
+        self._in_flight += 1
+        try:
+            for attempt in range(1, attempts + 1):
+                try:
+                    sent += nbytes
+                    try:
+                        if self._backend is not None:
+                            result = await asyncio.wait_for(
+                                self._backend(method_name, arguments), timeout
+                            )
+                        else:
+                            # flet drops its pending-call entry when its own
+                            # timeout fires; cancelling from outside would leak it
+                            result = await self._invoke_method(
+                                method_name, arguments, timeout=timeout
+                            )
+                    except RuntimeError as e:
+                        # flet raises RuntimeError both for a control without a
+                        # page and for an error the client reports back
+                        if "added to the page" in str(e):
+                            raise _SessionUnavailableError(str(e)) from e
+                        raise NotificationError(f"{method_name} failed on the client: {e}") from e
+                    failed = isinstance(result, str) and result.startswith("error:")
+                    return result
+                except _TRANSIENT_ERRORS as e:
+                    timed_out = isinstance(e, (TimeoutError, asyncio.TimeoutError))
+                    if timed_out:
+                        self._timeouts[method_name] += 1
+                    if attempt == attempts:
+                        if timed_out:
+                            raise CallTimeoutError(
+                                f"{method_name} got no response after {attempts} attempt(s)"
+                            ) from e
+                        raise
+                    self._retries[method_name] += 1
+                    await asyncio.sleep(policy.retry.delay(attempt))
+        finally:
+            self._in_flight -= 1
+            self._metrics.record(
+                method_name, time.perf_counter() - started, error=failed, nbytes=sent
+            )
+
     async def show_notification(
         self,
         notification_id: int,
@@ -180,7 +687,7 @@ class FletAndroidNotifications(ft.Service):
         set_as_group_summary: bool = False,
         group_alert_behavior: str = "all",
         icon: Optional[str] = None,
-        large_icon: Optional[str] = None,
+        large_icon: Optional[Union[str, BitmapData]] = None,
         large_icon_type: str = "drawable_resource",
         color: Optional[str] = None,
         colorized: bool = False,
@@ -194,6 +701,10 @@ class FletAndroidNotifications(ft.Service):
         channel_bypass_dnd: bool = False,
         vibration_pattern: Optional[list[int]] = None,
         timeout_after: Optional[int] = None,
+        uses_chronometer: bool = False,
+        chronometer_count_down: bool = False,
+        when: Optional[datetime] = None,
+        lane: Optional[str] = None,
     ):
         """Show an Android notification.
 
@@ -213,7 +724,8 @@ class FletAndroidNotifications(ft.Service):
             importance: One of "none", "min", "low", "default", "high", "max".
             play_sound: Whether to play the default notification sound.
             enable_vibration: Whether to vibrate on notification.
-            style: Notification style (BigTextStyle, BigPictureStyle, or InboxStyle).
+            style: Notification style (BigTextStyle, BigPictureStyle, InboxStyle,
+                MessagingStyle or MediaStyle).
             show_progress: Whether to show a progress bar.
             max_progress: Maximum progress value (0 = indeterminate when show_progress is True).
             progress: Current progress value.
@@ -227,7 +739,9 @@ class FletAndroidNotifications(ft.Service):
                 be a compiled Android drawable, not a file path. Android
                 renders small icons as single-color silhouettes.
             large_icon: Large icon shown on the notification's right side.
-                Interpreted according to large_icon_type.
+                Interpreted according to large_icon_type. In-memory image
+                bytes (bytes, bytearray or memoryview) are sent as a byte
+                array bitmap regardless of large_icon_type.
             large_icon_type: "drawable_resource" (default) or "file_path".
             color: Hex color string (e.g. "#FF5722" or "#80FF5722"). Sets
                 the accent color, which also tints the small icon.
@@ -253,6 +767,16 @@ class FletAndroidNotifications(ft.Service):
                 millisecond durations, e.g. [0, 500, 200, 500].
             timeout_after: Auto-dismiss the notification after this many
                 milliseconds. None means no timeout.
+            uses_chronometer: Show a timer that Android ticks by itself in
+                place of the timestamp, counting from when. Use it for
+                stopwatches and countdowns instead of re-posting every second.
+            chronometer_count_down: Count down to when instead of up from it.
+                Requires when (Android 7.0+).
+            when: Timestamp the notification shows, and the chronometer's
+                reference point. None means the time it is posted.
+            lane: Dispatch lane used when a rate limiter is set: "urgent",
+                "normal" or "bulk". None derives it from importance ("max"
+                is urgent; "low", "min" and "none" are bulk).
 
         Raises:
             NotificationError: If the native side reports an error.
@@ -261,8 +785,12 @@ class FletAndroidNotifications(ft.Service):
             _validate_color_hex(color)
         if visibility is not None:
             _validate_visibility(visibility)
-        result = await self._invoke_method(
-            method_name="show_notification",
+        if lane is not None:
+            validate_lane(lane)
+        _validate_chronometer(uses_chronometer, chronometer_count_down, when)
+        large_icon, large_icon_type = _resolve_large_icon(large_icon, large_icon_type)
+        return await self._call(
+            "show_notification",
             arguments={
                 "id": notification_id,
                 "title": title,
@@ -298,9 +826,12 @@ class FletAndroidNotifications(ft.Service):
                 "channel_bypass_dnd": channel_bypass_dnd,
                 "vibration_pattern": vibration_pattern,
                 "timeout_after": timeout_after,
+                "uses_chronometer": uses_chronometer,
+                "chronometer_count_down": chronometer_count_down,
+                "when": int(when.timestamp() * 1000) if when else None,
             },
+            lane=lane,
         )
-        return self._check_error(result)
 
     async def schedule_notification(
         self,
@@ -328,7 +859,7 @@ class FletAndroidNotifications(ft.Service):
         set_as_group_summary: bool = False,
         group_alert_behavior: str = "all",
         icon: Optional[str] = None,
-        large_icon: Optional[str] = None,
+        large_icon: Optional[Union[str, BitmapData]] = None,
         large_icon_type: str = "drawable_resource",
         color: Optional[str] = None,
         colorized: bool = False,
@@ -371,7 +902,8 @@ class FletAndroidNotifications(ft.Service):
                 "time" (daily), "day_of_week_and_time" (weekly),
                 "day_of_month_and_time" (monthly), "date_and_time" (yearly),
                 or None (one-shot, default).
-            style: Notification style (BigTextStyle, BigPictureStyle, or InboxStyle).
+            style: Notification style (BigTextStyle, BigPictureStyle, InboxStyle,
+                MessagingStyle or MediaStyle).
             show_progress: Whether to show a progress bar.
             max_progress: Maximum progress value (0 = indeterminate when show_progress is True).
             progress: Current progress value.
@@ -385,7 +917,9 @@ class FletAndroidNotifications(ft.Service):
                 be a compiled Android drawable, not a file path. Android
                 renders small icons as single-color silhouettes.
             large_icon: Large icon shown on the notification's right side.
-                Interpreted according to large_icon_type.
+                Interpreted according to large_icon_type. In-memory image
+                bytes (bytes, bytearray or memoryview) are sent as a byte
+                array bitmap regardless of large_icon_type.
             large_icon_type: "drawable_resource" (default) or "file_path".
             color: Hex color string (e.g. "#FF5722" or "#80FF5722"). Sets
                 the accent color, which also tints the small icon.
@@ -420,8 +954,9 @@ class FletAndroidNotifications(ft.Service):
         if visibility is not None:
             _validate_visibility(visibility)
         epoch_ms = int(scheduled_time.timestamp() * 1000)
-        result = await self._invoke_method(
-            method_name="schedule_notification",
+        large_icon, large_icon_type = _resolve_large_icon(large_icon, large_icon_type)
+        return await self._call(
+            "schedule_notification",
             arguments={
                 "id": notification_id,
                 "title": title,
@@ -462,7 +997,6 @@ class FletAndroidNotifications(ft.Service):
                 "timeout_after": timeout_after,
             },
         )
-        return self._check_error(result)
 
     async def periodically_show(
         self,
@@ -488,7 +1022,7 @@ class FletAndroidNotifications(ft.Service):
         set_as_group_summary: bool = False,
         group_alert_behavior: str = "all",
         icon: Optional[str] = None,
-        large_icon: Optional[str] = None,
+        large_icon: Optional[Union[str, BitmapData]] = None,
         large_icon_type: str = "drawable_resource",
         color: Optional[str] = None,
         colorized: bool = False,
@@ -521,8 +1055,9 @@ class FletAndroidNotifications(ft.Service):
             _validate_color_hex(color)
         if visibility is not None:
             _validate_visibility(visibility)
-        result = await self._invoke_method(
-            method_name="periodically_show",
+        large_icon, large_icon_type = _resolve_large_icon(large_icon, large_icon_type)
+        return await self._call(
+            "periodically_show",
             arguments={
                 "id": notification_id,
                 "title": title,
@@ -561,7 +1096,6 @@ class FletAndroidNotifications(ft.Service):
                 "timeout_after": timeout_after,
             },
         )
-        return self._check_error(result)
 
     async def periodically_show_with_duration(
         self,
@@ -587,7 +1121,7 @@ class FletAndroidNotifications(ft.Service):
         set_as_group_summary: bool = False,
         group_alert_behavior: str = "all",
         icon: Optional[str] = None,
-        large_icon: Optional[str] = None,
+        large_icon: Optional[Union[str, BitmapData]] = None,
         large_icon_type: str = "drawable_resource",
         color: Optional[str] = None,
         colorized: bool = False,
@@ -620,8 +1154,9 @@ class FletAndroidNotifications(ft.Service):
             _validate_color_hex(color)
         if visibility is not None:
             _validate_visibility(visibility)
-        result = await self._invoke_method(
-            method_name="periodically_show_with_duration",
+        large_icon, large_icon_type = _resolve_large_icon(large_icon, large_icon_type)
+        return await self._call(
+            "periodically_show_with_duration",
             arguments={
                 "id": notification_id,
                 "title": title,
@@ -660,7 +1195,6 @@ class FletAndroidNotifications(ft.Service):
                 "timeout_after": timeout_after,
             },
         )
-        return self._check_error(result)
 
     async def start_foreground_service(
         self,
@@ -687,7 +1221,7 @@ class FletAndroidNotifications(ft.Service):
         set_as_group_summary: bool = False,
         group_alert_behavior: str = "all",
         icon: Optional[str] = None,
-        large_icon: Optional[str] = None,
+        large_icon: Optional[Union[str, BitmapData]] = None,
         large_icon_type: str = "drawable_resource",
         color: Optional[str] = None,
         colorized: bool = False,
@@ -701,6 +1235,10 @@ class FletAndroidNotifications(ft.Service):
         channel_bypass_dnd: bool = False,
         vibration_pattern: Optional[list[int]] = None,
         timeout_after: Optional[int] = None,
+        uses_chronometer: bool = False,
+        chronometer_count_down: bool = False,
+        when: Optional[datetime] = None,
+        lane: Optional[str] = None,
     ):
         """Start an Android foreground service with a persistent notification.
 
@@ -721,6 +1259,8 @@ class FletAndroidNotifications(ft.Service):
                 location, connected_device, media_projection, camera, microphone,
                 health, remote_messaging, system_exempted, short_service,
                 special_use.
+            lane: Dispatch lane used when a rate limiter is set (see
+                show_notification).
             (All other params are the same as show_notification.)
 
         Raises:
@@ -744,8 +1284,12 @@ class FletAndroidNotifications(ft.Service):
             _validate_color_hex(color)
         if visibility is not None:
             _validate_visibility(visibility)
-        result = await self._invoke_method(
-            method_name="start_foreground_service",
+        if lane is not None:
+            validate_lane(lane)
+        _validate_chronometer(uses_chronometer, chronometer_count_down, when)
+        large_icon, large_icon_type = _resolve_large_icon(large_icon, large_icon_type)
+        return await self._call(
+            "start_foreground_service",
             arguments={
                 "id": notification_id,
                 "title": title,
@@ -783,9 +1327,80 @@ class FletAndroidNotifications(ft.Service):
                 "channel_bypass_dnd": channel_bypass_dnd,
                 "vibration_pattern": vibration_pattern,
                 "timeout_after": timeout_after,
+                "uses_chronometer": uses_chronometer,
+                "chronometer_count_down": chronometer_count_down,
+                "when": int(when.timestamp() * 1000) if when else None,
             },
+            lane=lane,
         )
-        return self._check_error(result)
+
+    async def update_foreground_service(
+        self,
+        *,
+        title: Optional[str] = None,
+        body: Optional[str] = None,
+        progress: Optional[int] = None,
+        max_progress: Optional[int] = None,
+        show_progress: Optional[bool] = None,
+        indeterminate: Optional[bool] = None,
+        sub_text: Optional[str] = None,
+        style: Optional[NotificationStyle] = None,
+        large_icon: Optional[Union[str, BitmapData]] = None,
+        large_icon_type: str = "drawable_resource",
+        lane: Optional[str] = None,
+    ):
+        """Change the content of the running foreground service notification.
+
+        Only the given fields are sent; the native side merges them into
+        the configuration from start_foreground_service() and re-posts the
+        notification in place without alerting again. Updates coalesce:
+        while one is in flight, later calls merge into a single pending
+        update (newest values win) and return "coalesced" right away, so
+        reporting progress in a tight loop never builds a backlog.
+
+        Args:
+            title: New title.
+            body: New body text.
+            progress: Current progress value.
+            max_progress: Maximum progress value.
+            show_progress: Show or hide the progress bar.
+            indeterminate: Whether the progress bar is indeterminate.
+            sub_text: Small text shown below the content.
+            style: New notification style.
+            large_icon: New large icon (see show_notification).
+            large_icon_type: "drawable_resource" (default) or "file_path".
+            lane: Dispatch lane used when a rate limiter is set.
+
+        Raises:
+            NotificationError: If no foreground service is running or the
+                native side reports an error.
+        """
+        if lane is not None:
+            validate_lane(lane)
+        fields = {
+            "title": title,
+            "body": body,
+            "progress": progress,
+            "max_progress": max_progress,
+            "show_progress": show_progress,
+            "indeterminate": indeterminate,
+            "sub_text": sub_text,
+            "style": style.to_dict() if style else None,
+        }
+        if large_icon is not None:
+            fields["large_icon"], fields["large_icon_type"] = _resolve_large_icon(
+                large_icon, large_icon_type
+            )
+        fields = {k: v for k, v in fields.items() if v is not None}
+        if not fields:
+            return "ok"
+        if self._foreground_update is not None:
+            self._foreground_update.update(fields)
+            return "coalesced"
+        self._foreground_update = fields
+        async with self._foreground_lock:
+            fields, self._foreground_update = self._foreground_update, None
+            return await self._call("update_foreground_service", arguments=fields, lane=lane)
 
     async def stop_foreground_service(self):
         """Stop the Android foreground service and remove its notification.
@@ -793,10 +1408,7 @@ class FletAndroidNotifications(ft.Service):
         Raises:
             NotificationError: If the native side reports an error.
         """
-        result = await self._invoke_method(
-            method_name="stop_foreground_service",
-        )
-        return self._check_error(result)
+        return await self._call("stop_foreground_service")
 
     async def get_active_notifications(self) -> list[dict]:
         """Get all currently active (shown) notifications.
@@ -807,38 +1419,157 @@ class FletAndroidNotifications(ft.Service):
         Raises:
             NotificationError: If the native side reports an error.
         """
-        result = await self._invoke_method(
-            method_name="get_active_notifications",
-        )
-        self._check_error(result)
+        result = await self._call("get_active_notifications")
         return json.loads(result)
 
     async def get_pending_notifications(self) -> list[dict]:
         """Get all pending (scheduled) notification requests.
 
         Returns:
-            List of dicts with keys: id, title, body, payload.
+            List of dicts with keys: id, title, body, payload, content_hash
+            (None for requests not scheduled by this version of the package).
 
         Raises:
             NotificationError: If the native side reports an error.
         """
-        result = await self._invoke_method(
-            method_name="get_pending_notifications",
-        )
-        self._check_error(result)
+        result = await self._call("get_pending_notifications")
         return json.loads(result)
 
+    async def reconcile_schedule(
+        self,
+        desired: list[dict],
+        *,
+        managed_ids: Optional[Container[int]] = None,
+    ) -> dict:
+        """Bring pending notifications in line with a desired schedule.
+
+        Compares desired against get_pending_notifications() by id and
+        content hash and sends only the difference - new or changed entries
+        are (re)scheduled, entries no longer desired are cancelled - in a
+        single batched native call. Running it on every startup is cheap
+        when nothing changed.
+
+        Args:
+            desired: One dict per notification holding the keyword arguments
+                of schedule_notification (notification_id, title, body,
+                scheduled_time, ...). Dicts with repeat_interval go through
+                periodically_show and dicts with duration_seconds through
+                periodically_show_with_duration.
+            managed_ids: Ids this schedule owns. Pending ids outside it are
+                left alone. None means every pending notification is managed.
+
+        Returns:
+            dict: {"added": [...], "updated": [...], "removed": [...],
+                "unchanged": [...]} lists of notification ids.
+
+        Raises:
+            ValueError: If desired contains an id twice.
+            NotificationError: If any change failed natively.
+        """
+        calls: list = []
+        token = _current_batch.set((self, calls))
+        try:
+            for item in desired:
+                item = dict(item)
+                if "repeat_interval" in item:
+                    await self.periodically_show(**item)
+                elif "duration_seconds" in item:
+                    await self.periodically_show_with_duration(**item)
+                else:
+                    await self.schedule_notification(**item)
+        finally:
+            _current_batch.reset(token)
+
+        wanted: dict[int, tuple] = {}
+        for call in calls:
+            notification_id = call[1]["id"]
+            if notification_id in wanted:
+                raise ValueError(f"desired schedule contains id {notification_id} twice")
+            wanted[notification_id] = call
+        pending = {p["id"]: p.get("content_hash") for p in await self.get_pending_notifications()}
+
+        summary = {"added": [], "updated": [], "removed": [], "unchanged": []}
+        changes = []
+        for notification_id, call in wanted.items():
+            if notification_id not in pending:
+                summary["added"].append(notification_id)
+            elif pending[notification_id] != call[1]["content_hash"]:
+                summary["updated"].append(notification_id)
+            else:
+                summary["unchanged"].append(notification_id)
+                continue
+            changes.append(call)
+        for notification_id in pending:
+            if notification_id not in wanted and (
+                managed_ids is None or notification_id in managed_ids
+            ):
+                summary["removed"].append(notification_id)
+
+        if changes or summary["removed"]:
+            async with self.batch():
+                for notification_id in summary["removed"]:
+                    await self.cancel(notification_id)
+                for method_name, arguments, lane in changes:
+                    await self._call(method_name, arguments, lane=lane)
+        return summary
+
     async def cancel(self, notification_id: int):
         """Cancel a specific notification by ID.
 
         Raises:
             NotificationError: If the native side reports an error.
         """
-        result = await self._invoke_method(
-            method_name="cancel",
+        return await self._call(
+            "cancel",
             arguments={"id": notification_id},
         )
-        return self._check_error(result)
+
+    async def append_message(
+        self,
+        notification_id: int,
+        message: Message,
+        *,
+        history_size: int = 25,
+        lane: Optional[str] = None,
+    ) -> bool:
+        """Add a message to a MessagingStyle notification already shown.
+
+        Only the new message crosses the bridge: the native side keeps the
+        conversation's messages from the last show_notification with a
+        MessagingStyle for this id, appends the message, trims the list to
+        history_size and re-posts the notification with the message text
+        as its body.
+
+        Args:
+            notification_id: ID of a notification shown with a MessagingStyle.
+            message: The message to append.
+            history_size: How many of the most recent messages to keep.
+                Android itself displays at most 25.
+            lane: Rate-limiter lane ("urgent", "normal" or "bulk").
+
+        Returns:
+            bool: False if the native side no longer knows the conversation
+                (cancelled, or the app restarted); re-post it with
+                show_notification and a full MessagingStyle. Conversation
+                does this automatically.
+
+        Raises:
+            NotificationError: If the native side reports an error.
+        """
+        if history_size < 1:
+            raise ValueError(f"history_size must be >= 1, got: {history_size}")
+        if lane is not None:
+            validate_lane(lane)
+        result = await self._call(
+            "append_message",
+            arguments={
+                "id": notification_id,
+                "message": message.to_dict(),
+                "history_size": history_size,
+            },
+            lane=lane,
+        )
+        return result != "conversation_missing"
 
     async def cancel_all(self):
         """Cancel all active notifications.
@@ -846,10 +1577,7 @@ class FletAndroidNotifications(ft.Service):
         Raises:
             NotificationError: If the native side reports an error.
         """
-        result = await self._invoke_method(
-            method_name="cancel_all",
-        )
-        return self._check_error(result)
+        return await self._call("cancel_all")
 
     async def request_permissions(self):
         """Request notification permissions (required on Android 13+).
@@ -860,10 +1588,8 @@ class FletAndroidNotifications(ft.Service):
         Raises:
             NotificationError: If the native side reports an error.
         """
-        result = await self._invoke_method(
-            method_name="request_permissions",
-        )
-        return self._check_error(result) == "true"
+        result = await self._call("request_permissions")
+        return result == "true"
 
     async def request_exact_alarm_permission(self):
         """Request the SCHEDULE_EXACT_ALARM permission (Android 14+).
@@ -877,7 +1603,5 @@ class FletAndroidNotifications(ft.Service):
         Raises:
             NotificationError: If the native side reports an error.
         """
-        result = await self._invoke_method(
-            method_name="request_exact_alarm_permission",
-        )
-        return self._check_error(result) == "true"
+        result = await self._call("request_exact_alarm_permission")
+        return result == "true"
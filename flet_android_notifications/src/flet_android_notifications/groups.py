@@ -0,0 +1,178 @@
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Optional
+
+from .styles import InboxStyle
+
+if TYPE_CHECKING:
+    from .flet_android_notifications import FletAndroidNotifications
+
+
+class NotificationGroup:
+    """Keeps a group of notifications and its InboxStyle summary in sync.
+
+    Tracks the children posted under group_key and maintains the summary
+    from a bounded window of the most recent lines, so adding a child never
+    rebuilds the summary from the full child list. Each add() posts the
+    child and the updated summary in a single native call, and the summary
+    is only re-sent when its rendered content actually changed. The tracked
+    state only changes once that native call went through, so a failed or
+    timed-out post is sent again by the next update.
+
+    Args:
+        notifications: The service to post through.
+        group_key: Android group key shared by the children and summary.
+        summary_id: Notification id reserved for the group summary.
+        title: Summary title. "{count}" is replaced with the number of children.
+        max_lines: How many recent child lines the summary shows.
+        summary_text: Optional InboxStyle summary text ("{count}" supported).
+        **options: Extra show_notification keyword arguments applied to
+            every child and the summary (channel_id, icon, color, ...).
+
+    Usage:
+        group = NotificationGroup(notifications, "chat", summary_id=1000,
+                                  title="{count} new messages")
+        await group.add(1001, "Ana", "See you at 5")
+    """
+
+    def __init__(
+        self,
+        notifications: "FletAndroidNotifications",
+        group_key: str,
+        summary_id: int,
+        *,
+        title: str = "{count} new",
+        max_lines: int = 5,
+        summary_text: Optional[str] = None,
+        **options,
+    ):
+        if max_lines < 1:
+            raise ValueError(f"max_lines must be >= 1, got: {max_lines}")
+        for reserved in ("group_key", "set_as_group_summary", "style"):
+            if reserved in options:
+                raise ValueError(f"{reserved} is managed by NotificationGroup")
+        self.notifications = notifications
+        self.group_key = group_key
+        self.summary_id = summary_id
+        self.title = title
+        self.max_lines = max_lines
+        self.summary_text = summary_text
+        self.options = options
+        self._children: "OrderedDict[int, str]" = OrderedDict()
+        self._window: deque = deque(maxlen=max_lines)
+        self._last_summary: Optional[tuple] = None
+
+    def __len__(self) -> int:
+        return len(self._children)
+
+    @property
+    def child_ids(self) -> list[int]:
+        return list(self._children)
+
+    def _summary_state(self, children: "OrderedDict[int, str]", window: deque) -> tuple:
+        count = len(children)
+        return (
+            self.title.format(count=count),
+            tuple(line for _, line in window),
+            self.summary_text.format(count=count) if self.summary_text else None,
+        )
+
+    async def _post_summary(self, state: tuple) -> None:
+        if state == self._last_summary:
+            return
+        title, lines, summary_text = state
+        await self.notifications.show_notification(
+            self.summary_id,
+            title,
+            lines[-1] if lines else "",
+            group_key=self.group_key,
+            set_as_group_summary=True,
+            style=InboxStyle(list(lines), content_title=title, summary_text=summary_text),
+            **self.options,
+        )
+
+    async def add(
+        self,
+        notification_id: int,
+        title: str,
+        body: str,
+        *,
+        line: Optional[str] = None,
+        **options,
+    ):
+        """Post a child and update the summary in one native call.
+
+        Args:
+            notification_id: Child notification id.
+            title: Child title.
+            body: Child body.
+            line: Summary line for this child. Defaults to "title: body".
+            **options: Extra show_notification arguments for this child only.
+        """
+        await self.add_many([dict(notification_id=notification_id, title=title,
+                                  body=body, line=line, **options)])
+
+    async def add_many(self, children: list[dict]):
+        """Post several children and a single summary update in one native call.
+
+        Each dict holds add() arguments (notification_id, title, body, and
+        optionally line plus show_notification options).
+        """
+        # work on copies; the batch raises if it fails and they are discarded
+        tracked = OrderedDict(self._children)
+        window = deque(self._window, maxlen=self.max_lines)
+        async with self.notifications.batch():
+            for child in children:
+                child = dict(child)
+                notification_id = child.pop("notification_id")
+                title = child.pop("title")
+                body = child.pop("body")
+                line = child.pop("line", None) or f"{title}: {body}"
+                await self.notifications.show_notification(
+                    notification_id,
+                    title,
+                    body,
+                    group_key=self.group_key,
+                    **{**self.options, **child},
+                )
+                # re-adding an id refreshes its line and moves it to the front
+                tracked.pop(notification_id, None)
+                tracked[notification_id] = line
+                window = deque(
+                    ((i, l) for i, l in window if i != notification_id),
+                    maxlen=self.max_lines,
+                )
+                window.append((notification_id, line))
+            summary = self._summary_state(tracked, window)
+            await self._post_summary(summary)
+        self._children, self._window, self._last_summary = tracked, window, summary
+
+    async def remove(self, notification_id: int):
+        """Cancel a child and update (or cancel) the summary in one native call."""
+        if notification_id not in self._children:
+            return
+        tracked = OrderedDict(self._children)
+        del tracked[notification_id]
+        window = self._window
+        if any(i == notification_id for i, _ in window):
+            # refill the window from the most recent remaining children
+            recent = list(tracked.items())[-self.max_lines:]
+            window = deque(recent, maxlen=self.max_lines)
+        async with self.notifications.batch():
+            await self.notifications.cancel(notification_id)
+            if tracked:
+                summary = self._summary_state(tracked, window)
+                await self._post_summary(summary)
+            else:
+                await self.notifications.cancel(self.summary_id)
+                summary = None
+        self._children, self._window, self._last_summary = tracked, window, summary
+
+    async def clear(self):
+        """Cancel every child and the summary in one native call."""
+        async with self.notifications.batch():
+            for notification_id in self._children:
+                await self.notifications.cancel(notification_id)
+            await self.notifications.cancel(self.summary_id)
+        self._children.clear()
+        self._window.clear()
+        self._last_summary = None
@@ -0,0 +1,185 @@
+import hashlib
+import io
+import os
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+
+# Pixel bounds for what Android actually renders: BigPictureStyle is shown
+# roughly 2:1 at full notification width, large icons at 64dp.
+BIG_PICTURE_SIZE = (1024, 512)
+LARGE_ICON_SIZE = (256, 256)
+
+_FORMAT_SUFFIXES = {"WEBP": ".webp", "PNG": ".png", "JPEG": ".jpg"}
+
+
+class ImageCache:
+    """Downscales notification images once and caches them on disk.
+
+    Android decodes whatever file a FilePathAndroidBitmap points to at full
+    resolution, for every notification. ImageCache resizes images to the
+    size Android displays, re-encodes them in a compact format and stores
+    the result under a content hash, so a repeated avatar or thumbnail is
+    processed once. Least recently used files are evicted past max_bytes.
+
+    Eviction doesn't know which files pending notifications still point
+    to. Pin those (pin(), or pin_referenced() with the schedule store's
+    and outbox's entries) so a scheduled notification doesn't fire with
+    its image gone; pinned files may push the cache past max_bytes.
+
+    Requires Pillow (pip install flet-android-notifications[images]).
+
+    Args:
+        cache_dir: Directory for processed images. Created if missing.
+        max_bytes: Total cache size before LRU eviction kicks in.
+        image_format: "WEBP" (default), "PNG" or "JPEG".
+        quality: Encoder quality for lossy formats, 1-100.
+
+    Usage:
+        cache = ImageCache(os.path.join(os.getenv("FLET_APP_STORAGE_DATA"), "img"))
+        style = BigPictureStyle(file_path=cache.big_picture("/sdcard/DCIM/photo.jpg"))
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, os.PathLike],
+        *,
+        max_bytes: int = 20 * 1024 * 1024,
+        image_format: str = "WEBP",
+        quality: int = 85,
+    ):
+        if image_format not in _FORMAT_SUFFIXES:
+            raise ValueError(
+                f"image_format must be one of {sorted(_FORMAT_SUFFIXES)}, got: {image_format!r}"
+            )
+        if not 1 <= quality <= 100:
+            raise ValueError(f"quality must be between 1 and 100, got: {quality}")
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be >= 1, got: {max_bytes}")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.image_format = image_format
+        self.quality = quality
+        self.hits = 0
+        self.misses = 0
+        # (path, mtime_ns, size, max_size) -> cached file, so unchanged
+        # sources aren't even re-hashed
+        self._by_stat: dict[tuple, Path] = {}
+        self._pinned: set[Path] = set()
+        self._total = sum(f.stat().st_size for f in self._files())
+
+    def _files(self) -> list[Path]:
+        suffix = _FORMAT_SUFFIXES[self.image_format]
+        return [f for f in self.cache_dir.iterdir() if f.is_file() and f.suffix == suffix]
+
+    def big_picture(self, source: Union[str, os.PathLike]) -> str:
+        """Prepare an image for BigPictureStyle(file_path=...)."""
+        return self.prepare(source, BIG_PICTURE_SIZE)
+
+    def large_icon(self, source: Union[str, os.PathLike]) -> str:
+        """Prepare an image for large_icon with large_icon_type="file_path"."""
+        return self.prepare(source, LARGE_ICON_SIZE)
+
+    def prepare(self, source: Union[str, os.PathLike], max_size: tuple[int, int]) -> str:
+        """Return the path of source downscaled to fit within max_size.
+
+        Images already smaller than max_size are only re-encoded, never
+        upscaled. The returned path stays valid until evicted; pin() it
+        when a scheduled notification uses it.
+        """
+        source = Path(source)
+        st = source.stat()
+        stat_key = (str(source), st.st_mtime_ns, st.st_size, max_size)
+        cached = self._by_stat.get(stat_key)
+        if cached is not None and cached.exists():
+            return self._hit(cached)
+
+        data = source.read_bytes()
+        digest = hashlib.sha256(data)
+        digest.update(f"|{max_size[0]}x{max_size[1]}|{self.image_format}|{self.quality}".encode())
+        cached = self.cache_dir / (digest.hexdigest()[:32] + _FORMAT_SUFFIXES[self.image_format])
+        if len(self._by_stat) >= 4096:
+            self._by_stat.clear()
+        self._by_stat[stat_key] = cached
+        if cached.exists():
+            return self._hit(cached)
+
+        self.misses += 1
+        self._encode(data, max_size, cached)
+        self._total += cached.stat().st_size
+        self._evict(keep=cached)
+        return str(cached)
+
+    def pin(self, *paths: Union[str, os.PathLike]) -> None:
+        """Exempt paths returned by prepare() from eviction until unpin()."""
+        self._pinned.update(Path(p) for p in paths)
+
+    def unpin(self, *paths: Union[str, os.PathLike]) -> None:
+        self._pinned.difference_update(Path(p) for p in paths)
+
+    def pin_referenced(self, calls: Iterable[tuple[str, Optional[dict]]]) -> int:
+        """Pin exactly the cached files that calls reference, replacing earlier pins.
+
+        calls are (method_name, arguments) pairs such as ScheduleStore.entries()
+        and NotificationOutbox.entries(); call again after the schedule
+        changes. Returns the number of pinned files.
+
+        Usage:
+            cache.pin_referenced([*store.entries(), *outbox.entries()])
+        """
+        pinned: set[Path] = set()
+
+        def scan(value: Any) -> None:
+            if isinstance(value, str):
+                path = Path(value)
+                if path.parent == self.cache_dir:
+                    pinned.add(path)
+            elif isinstance(value, dict):
+                for v in value.values():
+                    scan(v)
+            elif isinstance(value, (list, tuple)):
+                for v in value:
+                    scan(v)
+
+        for _, arguments in calls:
+            scan(arguments)
+        self._pinned = pinned
+        return len(pinned)
+
+    def _hit(self, cached: Path) -> str:
+        self.hits += 1
+        # mtime doubles as the LRU clock
+        os.utime(cached)
+        return str(cached)
+
+    def _encode(self, data: bytes, max_size: tuple[int, int], dest: Path) -> None:
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            raise ImportError(
+                "ImageCache requires Pillow: pip install flet-android-notifications[images]"
+            ) from None
+
+        with Image.open(io.BytesIO(data)) as img:
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail(max_size, Image.LANCZOS)
+            if self.image_format == "JPEG":
+                img = img.convert("RGB")
+            elif img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            tmp = dest.with_suffix(dest.suffix + ".tmp")
+            img.save(tmp, self.image_format, quality=self.quality, optimize=True)
+        os.replace(tmp, dest)
+
+    def _evict(self, keep: Path) -> None:
+        if self._total <= self.max_bytes:
+            return
+        for f in sorted(self._files(), key=lambda f: f.stat().st_mtime):
+            if self._total <= self.max_bytes:
+                break
+            if f == keep or f in self._pinned:
+                continue
+            size = f.stat().st_size
+            f.unlink()
+            self._total -= size
@@ -0,0 +1,316 @@
+"""Load generator for FletAndroidNotifications.
+
+Drives a weighted mix of show/schedule/cancel/query calls from N concurrent
+producers at a target rate, prints a live summary to stderr every second
+and a JSON report to stdout when done.
+
+Usage:
+    python -m flet_android_notifications.loadgen --rate 200 --producers 8 --duration 30
+    python -m flet_android_notifications.loadgen --mix show=80,cancel=20 --latency 0.004
+    python -m flet_android_notifications.loadgen --target flet --port 8550 --rate 20
+
+--target fake (the default) runs against an in-process FakeBackend.
+--target flet serves a Flet app on --port and starts once a client with
+this extension connects; that client's device receives real notifications.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .fake import FakeBackend
+from .flet_android_notifications import FletAndroidNotifications, NotificationError
+from .metrics import LatencyHistogram
+
+
+OPERATIONS = ("show", "schedule", "cancel", "query")
+
+_DEFAULT_MIX = "show=60,schedule=15,cancel=20,query=5"
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parse "show=60,cancel=40" into operation weights.
+
+    Raises:
+        ValueError: On unknown operations or non-positive totals.
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r}; expected one of {list(OPERATIONS)}")
+        mix[name] = float(weight) if weight else 1.0
+        if mix[name] < 0:
+            raise ValueError(f"weight of {name} must be >= 0, got: {mix[name]}")
+    if not sum(mix.values()):
+        raise ValueError("mix weights must not all be zero")
+    return mix
+
+
+class LoadStats:
+    """Per-operation call counts, errors and latency of a load run."""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.latency: dict[str, LatencyHistogram] = {op: LatencyHistogram() for op in OPERATIONS}
+        self.overall = LatencyHistogram()
+        self.in_flight = 0
+        # overall histogram for the current live-summary interval
+        self.window = LatencyHistogram()
+
+    def record(self, op: str, seconds: float, error: bool) -> None:
+        micros = seconds * 1_000_000
+        self.calls[op] += 1
+        if error:
+            self.errors[op] += 1
+        self.latency[op].record(micros)
+        self.overall.record(micros)
+        self.window.record(micros)
+
+    def report(self, duration: float) -> dict:
+        calls = sum(self.calls.values())
+        return {
+            "duration_s": round(duration, 3),
+            "calls": calls,
+            "errors": sum(self.errors.values()),
+            "throughput": round(calls / duration, 1) if duration else 0.0,
+            "latency": self.overall.summary(),
+            "operations": {
+                op: {
+                    "calls": self.calls[op],
+                    "errors": self.errors[op],
+                    "latency": self.latency[op].summary(),
+                }
+                for op in OPERATIONS
+                if self.calls[op]
+            },
+        }
+
+
+async def _operation(
+    notifications: FletAndroidNotifications, op: str, notification_id: int, seq: int
+) -> None:
+    if op == "show":
+        await notifications.show_notification(
+            notification_id,
+            "Load test",
+            f"Call #{seq}",
+            channel_id="loadgen",
+            channel_name="Load generator",
+            importance="low",
+            play_sound=False,
+            enable_vibration=False,
+        )
+    elif op == "schedule":
+        await notifications.schedule_notification(
+            notification_id,
+            "Load test",
+            f"Scheduled #{seq}",
+            datetime.now() + timedelta(hours=1),
+            channel_id="loadgen",
+            channel_name="Load generator",
+            importance="low",
+            schedule_mode="inexact_allow_while_idle",
+        )
+    elif op == "cancel":
+        await notifications.cancel(notification_id)
+    elif seq % 2:
+        await notifications.get_pending_notifications()
+    else:
+        await notifications.get_active_notifications()
+
+
+async def run_load(
+    notifications: FletAndroidNotifications,
+    *,
+    duration: float,
+    rate: float,
+    producers: int,
+    mix: dict[str, float],
+    id_base: int = 700000,
+    id_count: int = 1000,
+    interval: float = 1.0,
+    seed: Optional[int] = None,
+    out=sys.stderr,
+) -> dict:
+    """Run the load and return the report (see LoadStats.report).
+
+    rate is the total target in calls per second, split evenly across
+    producers; 0 means as fast as each producer can go. Producers are
+    open-loop: a slow call delays that producer's next call but it then
+    catches up, so latency spikes show up as throughput below rate.
+    """
+    stats = LoadStats()
+    ops, weights = zip(*mix.items())
+    rng = random.Random(seed)
+    seq = 0
+    start = time.perf_counter()
+    stop = start + duration
+
+    async def producer(index: int) -> None:
+        nonlocal seq
+        period = producers / rate if rate else 0.0
+        due = start + index * period / producers
+        while True:
+            now = time.perf_counter()
+            if due > now:
+                await asyncio.sleep(due - now)
+            if time.perf_counter() >= stop:
+                return
+            due += period
+            op = rng.choices(ops, weights)[0]
+            seq += 1
+            stats.in_flight += 1
+            t0 = time.perf_counter()
+            error = False
+            try:
+                await _operation(notifications, op, id_base + rng.randrange(id_count), seq)
+            except Exception:
+                error = True
+            finally:
+                stats.in_flight -= 1
+                stats.record(op, time.perf_counter() - t0, error)
+            if not period:
+                await asyncio.sleep(0)
+
+    async def live() -> None:
+        last_calls, last_t = 0, start
+        while True:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            calls = sum(stats.calls.values())
+            window = stats.window.summary()
+            stats.window = LatencyHistogram()
+            print(
+                f"[{now - start:6.1f}s] calls={calls} "
+                f"rate={(calls - last_calls) / (now - last_t):.1f}/s "
+                f"errors={sum(stats.errors.values())} in_flight={stats.in_flight} "
+                f"p50={window['p50_ms']}ms p99={window['p99_ms']}ms",
+                file=out,
+                flush=True,
+            )
+            last_calls, last_t = calls, now
+
+    reporter = asyncio.ensure_future(live()) if interval > 0 else None
+    try:
+        await asyncio.gather(*(producer(i) for i in range(producers)))
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+    return stats.report(time.perf_counter() - start)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m flet_android_notifications.loadgen",
+        description="Stress-test notification throughput with a mix of calls.",
+    )
+    parser.add_argument("--target", choices=("fake", "flet"), default="fake",
+                        help="in-process fake backend, or a connected Flet session")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run (default 10)")
+    parser.add_argument("--rate", type=float, default=100.0,
+                        help="total target calls per second, 0 for unlimited (default 100)")
+    parser.add_argument("--producers", type=int, default=4, help="concurrent producers (default 4)")
+    parser.add_argument("--mix", default=_DEFAULT_MIX,
+                        help=f"operation weights (default {_DEFAULT_MIX})")
+    parser.add_argument("--id-base", type=int, default=700000,
+                        help="first notification id used (default 700000)")
+    parser.add_argument("--ids", type=int, default=1000,
+                        help="how many notification ids to spread calls over (default 1000)")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="seconds between live summaries, 0 to disable (default 1)")
+    parser.add_argument("--seed", type=int, help="random seed for a repeatable call sequence")
+    parser.add_argument("--report", help="also write the JSON report to this file")
+    parser.add_argument("--keep", action="store_true",
+                        help="leave the generated notifications in place")
+    fake = parser.add_argument_group("fake backend")
+    fake.add_argument("--latency", type=float, default=0.0, help="seconds per call")
+    fake.add_argument("--jitter", type=float, default=0.0, help="extra random seconds per call")
+    fake.add_argument("--error-rate", type=float, default=0.0,
+                      help="fraction of state-changing calls that fail")
+    flet = parser.add_argument_group("flet session")
+    flet.add_argument("--port", type=int, default=8550, help="port to serve on (default 8550)")
+    return parser
+
+
+async def _run(notifications: FletAndroidNotifications, args: argparse.Namespace) -> dict:
+    report = await run_load(
+        notifications,
+        duration=args.duration,
+        rate=args.rate,
+        producers=args.producers,
+        mix=args.mix,
+        id_base=args.id_base,
+        id_count=args.ids,
+        interval=args.interval,
+        seed=args.seed,
+    )
+    if not args.keep:
+        try:
+            async with notifications.batch():
+                for i in range(args.ids):
+                    await notifications.cancel(args.id_base + i)
+        except NotificationError as e:
+            print(f"cleanup failed: {e}", file=sys.stderr)
+    report = {
+        "target": args.target,
+        "config": {
+            "rate": args.rate,
+            "producers": args.producers,
+            "mix": args.mix,
+            "ids": args.ids,
+        },
+        **report,
+        "service": notifications.get_call_stats(),
+    }
+    text = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text, flush=True)
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+    try:
+        args.mix = parse_mix(args.mix)
+        if args.producers < 1 or args.ids < 1 or args.duration <= 0 or args.rate < 0:
+            raise ValueError("producers and ids must be >= 1, duration > 0 and rate >= 0")
+        backend = FakeBackend(
+            latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.target == "fake":
+        notifications = FletAndroidNotifications()
+        notifications.set_backend(backend)
+        asyncio.run(_run(notifications, args))
+        return 0
+
+    import flet as ft
+
+    async def app(page: ft.Page):
+        print(f"client connected: {page.platform}", file=sys.stderr, flush=True)
+        await _run(FletAndroidNotifications(), args)
+        # ft.run() serves until killed; the report is out, so end the process
+        os._exit(0)
+
+    print(f"waiting for a client on port {args.port} ...", file=sys.stderr, flush=True)
+    ft.run(app, port=args.port, view=None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+from collections import Counter
+
+
+# Log-linear buckets: values below 2**_SUB_BITS get a bucket each, larger
+# ones share 2**(_SUB_BITS - 1) linear sub-buckets per power of two, which
+# bounds the relative error to about 3%. The Dart side uses the same
+# indexing so native histograms can be read with from_buckets().
+_SUB_BITS = 5
+_HALF = 1 << (_SUB_BITS - 1)
+
+_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def bucket_index(value: int) -> int:
+    if value < (1 << _SUB_BITS):
+        return value
+    shift = value.bit_length() - _SUB_BITS
+    return shift * _HALF + (value >> shift)
+
+
+def bucket_bounds(index: int) -> tuple[int, int]:
+    """Return the inclusive (low, high) values of a bucket."""
+    if index < (1 << _SUB_BITS):
+        return index, index
+    q, r = divmod(index, _HALF)
+    shift, sub = q - 1, r + _HALF
+    return sub << shift, ((sub + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """HDR-style latency histogram over integer microseconds.
+
+    Memory grows with the number of distinct buckets hit (a few dozen in
+    practice), not with the number of samples.
+    """
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @classmethod
+    def from_buckets(cls, buckets: dict, *, total: int = 0, max_value: int = 0) -> "LatencyHistogram":
+        hist = cls()
+        for index, n in buckets.items():
+            hist.counts[int(index)] += n
+            hist.count += n
+        hist.total = total
+        hist.max = max_value
+        return hist
+
+    def record(self, micros: int) -> None:
+        micros = max(0, int(micros))
+        self.counts[bucket_index(micros)] += 1
+        self.count += 1
+        self.total += micros
+        if micros > self.max:
+            self.max = micros
+
+    def percentile(self, q: float) -> int:
+        """Return the q-quantile (0-1) in microseconds, to bucket precision."""
+        if not self.count:
+            return 0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return min((low + high) // 2, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Return count, sum, mean, p50/p90/p99 and max in milliseconds."""
+        summary = {"count": self.count, "sum_ms": round(self.total / 1000, 3)}
+        summary["mean_ms"] = round(self.total / self.count / 1000, 3) if self.count else 0.0
+        for q in _QUANTILES:
+            summary[f"p{round(q * 100)}_ms"] = round(self.percentile(q) / 1000, 3)
+        summary["max_ms"] = round(self.max / 1000, 3)
+        return summary
+
+
+def estimate_size(value) -> int:
+    """Rough wire size of call arguments in bytes, without serializing them."""
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return memoryview(value).nbytes
+    if isinstance(value, dict):
+        return 2 + sum(len(str(k)) + 3 + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 2 + sum(estimate_size(v) + 1 for v in value)
+    if value is None or isinstance(value, bool):
+        return 4
+    return 8
+
+
+class CallMetrics:
+    """Per-method call counts, errors, bytes sent and latency."""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.bytes_sent: Counter = Counter()
+        self.latency: dict[str, LatencyHistogram] = {}
+
+    def record(self, method_name: str, seconds: float, *, error: bool, nbytes: int) -> None:
+        self.calls[method_name] += 1
+        if error:
+            self.errors[method_name] += 1
+        self.bytes_sent[method_name] += nbytes
+        hist = self.latency.get(method_name)
+        if hist is None:
+            hist = self.latency[method_name] = LatencyHistogram()
+        hist.record(seconds * 1_000_000)
+
+    def snapshot(self) -> dict:
+        return {
+            name: {
+                "calls": self.calls[name],
+                "errors": self.errors[name],
+                "bytes_sent": self.bytes_sent[name],
+                "latency": self.latency[name].summary(),
+            }
+            for name in sorted(self.calls)
+        }
+
+
+def native_snapshot(raw: dict) -> dict:
+    """Convert the Dart side's get_native_metrics payload to snapshot() form."""
+    methods = {}
+    for name, m in sorted(raw.get("methods", {}).items()):
+        hist = LatencyHistogram.from_buckets(
+            m["buckets"], total=m["total_us"], max_value=m["max_us"]
+        )
+        methods[name] = {"calls": m["count"], "errors": m["errors"], "latency": hist.summary()}
+    return methods
+
+
+def native_profile(raw: dict) -> dict:
+    """Convert the Dart side's get_native_profile payload to per-phase summaries.
+
+    Every profiled call ends with an "other" phase (time not covered by a
+    marked phase), so its count is the number of calls. share is the
+    phase's fraction of the method's total profiled time.
+    """
+    methods = {}
+    for name, phases in sorted(raw.get("methods", {}).items()):
+        total_us = sum(p["total_us"] for p in phases.values())
+        breakdown = {}
+        for phase, p in sorted(phases.items(), key=lambda item: -item[1]["total_us"]):
+            hist = LatencyHistogram.from_buckets(
+                p["buckets"], total=p["total_us"], max_value=p["max_us"]
+            )
+            share = round(p["total_us"] / total_us, 4) if total_us else 0.0
+            breakdown[phase] = {"share": share, **hist.summary()}
+        methods[name] = {
+            "calls": phases.get("other", {}).get("count", 0),
+            "total_ms": round(total_us / 1000, 3),
+            "phases": breakdown,
+        }
+    return methods
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(metrics: dict, *, prefix: str = "flet_notifications") -> str:
+    """Render get_metrics() output in the Prometheus text exposition format.
+
+    Latency is exported as a summary (quantiles in seconds), counters with
+    a method label and, for native metrics, side="native".
+    """
+    lines = []
+
+    def family(name: str, kind: str, help_text: str) -> str:
+        full = f"{prefix}_{name}"
+        lines.append(f"# HELP {full} {help_text}")
+        lines.append(f"# TYPE {full} {kind}")
+        return full
+
+    sides = [("python", metrics.get("methods", {}))]
+    if metrics.get("native"):
+        sides.append(("native", metrics["native"]))
+
+    name = family("calls_total", "counter", "Native calls per method.")
+    for side, methods in sides:
+        for method, m in methods.items():
+            lines.append(f'{name}{{method="{_escape(method)}",side="{side}"}} {m["calls"]}')
+    name = family("errors_total", "counter", "Failed native calls per method.")
+    for side, methods in sides:
+        for method, m in methods.items():
+            lines.append(f'{name}{{method="{_escape(method)}",side="{side}"}} {m["errors"]}')
+    name = family("bytes_sent_total", "counter", "Estimated argument bytes sent per method.")
+    for method, m in metrics.get("methods", {}).items():
+        lines.append(f'{name}{{method="{_escape(method)}"}} {m["bytes_sent"]}')
+    name = family("latency_seconds", "summary", "Native call latency per method.")
+    for side, methods in sides:
+        for method, m in methods.items():
+            labels = f'method="{_escape(method)}",side="{side}"'
+            latency = m["latency"]
+            for q in _QUANTILES:
+                value = latency[f"p{round(q * 100)}_ms"] / 1000
+                lines.append(f'{name}{{{labels},quantile="{q}"}} {value:.6f}')
+            lines.append(f"{name}_sum{{{labels}}} {latency['sum_ms'] / 1000:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {latency['count']}")
+    name = family("in_flight", "gauge", "Native calls awaiting a response.")
+    lines.append(f"{name} {metrics.get('in_flight', 0)}")
+    for counter in ("timeouts", "retries"):
+        name = family(f"{counter}_total", "counter", f"Call {counter} per method.")
+        for method, n in metrics.get(counter, {}).items():
+            lines.append(f'{name}{{method="{_escape(method)}"}} {n}')
+    return "\n".join(lines) + "\n"
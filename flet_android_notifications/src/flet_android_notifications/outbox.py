@@ -0,0 +1,200 @@
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Union
+
+
+# Methods that only change notification state and are safe to replay later.
+# Queries and permission prompts need a live session and are never queued.
+QUEUEABLE_METHODS = {
+    "show_notification",
+    "schedule_notification",
+    "periodically_show",
+    "periodically_show_with_duration",
+    "start_foreground_service",
+    "stop_foreground_service",
+    "cancel",
+    "cancel_all",
+}
+
+
+_SCHEDULE_METHODS = {"schedule_notification", "periodically_show", "periodically_show_with_duration"}
+
+
+def outbox_key(method_name: str, arguments: Optional[dict]) -> str:
+    """Return the coalescing key for a call.
+
+    Shown and scheduled calls for an id have separate keys, since showing
+    an id doesn't affect its pending schedule and vice versa; a later call
+    of the same kind supersedes the queued one. The foreground service
+    notification has a single slot of its own.
+    """
+    if method_name in ("start_foreground_service", "stop_foreground_service"):
+        return "foreground"
+    if arguments and "id" in arguments:
+        if method_name == "cancel":
+            return f"cancel:{arguments['id']}"
+        kind = "scheduled" if method_name in _SCHEDULE_METHODS else "shown"
+        return f"{kind}:{arguments['id']}"
+    return method_name
+
+
+def _superseded_keys(method_name: str, arguments: Optional[dict]) -> tuple[str, ...]:
+    """Keys besides its own that a call makes obsolete.
+
+    cancel(id) removes both the shown notification and the pending schedule.
+    """
+    if method_name == "cancel" and arguments and "id" in arguments:
+        return (f"shown:{arguments['id']}", f"scheduled:{arguments['id']}")
+    return ()
+
+
+class NotificationOutbox:
+    """Durable queue of native calls made while the Flet session is disconnected.
+
+    Calls are appended to a JSONL log on disk and kept in memory keyed by
+    notification id, so a backlog of progress updates for one id collapses
+    to the last one. The log is append-only and gets rewritten (compacted)
+    once dead records outnumber live ones by compact_ratio.
+
+    Args:
+        path: Log file location. Created on first append.
+        max_entries: Upper bound on queued calls. When exceeded, the oldest
+            call is dropped.
+        compact_ratio: Compact when log records exceed live entries by
+            this factor.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        *,
+        max_entries: int = 500,
+        compact_ratio: float = 2.0,
+    ):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be >= 1, got: {max_entries}")
+        if compact_ratio < 1:
+            raise ValueError(f"compact_ratio must be >= 1, got: {compact_ratio}")
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.compact_ratio = compact_ratio
+        self.dropped = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[str, tuple[int, str, Optional[dict]]]" = OrderedDict()
+        self._seq = 0
+        self._records = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        """Rebuild the in-memory queue from the on-disk log.
+
+        A torn line (a crash mid-append) is skipped and the log rewritten
+        without it, so later appends don't land after a broken record.
+        """
+        if not self.path.exists():
+            return
+        torn = False
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    torn = True
+                    continue
+                self._records += 1
+                self._seq = max(self._seq, record["seq"])
+                key = record["key"]
+                if record["op"] == "put":
+                    for old_key in (key, *_superseded_keys(record["method"], record["args"])):
+                        self._entries.pop(old_key, None)
+                    self._entries[key] = (record["seq"], record["method"], record["args"])
+                elif record["op"] == "ack":
+                    entry = self._entries.get(key)
+                    if entry is not None and entry[0] <= record["seq"]:
+                        del self._entries[key]
+                elif record["op"] == "clear":
+                    self._entries.clear()
+        if torn:
+            self.compact()
+
+    def _write(self, record: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._records += 1
+
+    def append(self, method_name: str, arguments: Optional[dict] = None) -> None:
+        """Queue a call, superseding any queued call with the same key."""
+        self._seq += 1
+        key = outbox_key(method_name, arguments)
+        if method_name == "cancel_all":
+            # cancelAll() wipes shown and pending notifications alike, so
+            # nothing queued before it needs to reach the device
+            self.coalesced += len(self._entries)
+            self._entries.clear()
+            self._write({"op": "clear", "seq": self._seq, "key": key})
+        else:
+            for old_key in (key, *_superseded_keys(method_name, arguments)):
+                if old_key in self._entries:
+                    self.coalesced += 1
+                    del self._entries[old_key]
+        self._entries[key] = (self._seq, method_name, arguments)
+        self._write({
+            "op": "put",
+            "seq": self._seq,
+            "key": key,
+            "method": method_name,
+            "args": arguments,
+        })
+        while len(self._entries) > self.max_entries:
+            old_key, (old_seq, _, _) = self._entries.popitem(last=False)
+            self.dropped += 1
+            self._write({"op": "ack", "seq": old_seq, "key": old_key})
+        self._maybe_compact()
+
+    def entries(self) -> list[tuple[str, Optional[dict]]]:
+        """Return queued (method_name, arguments) pairs in replay order."""
+        return [(method, args) for _, method, args in self._entries.values()]
+
+    async def drain(self, send: Callable[[str, Optional[dict]], Awaitable[Any]]) -> int:
+        """Replay queued calls in order through send, acknowledging each.
+
+        Stops at the first call that raises, leaving it and everything after
+        it queued. Returns the number of calls delivered.
+        """
+        delivered = 0
+        while self._entries:
+            key, (seq, method, args) = next(iter(self._entries.items()))
+            await send(method, args)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == seq:
+                del self._entries[key]
+            self._write({"op": "ack", "seq": seq, "key": key})
+            delivered += 1
+        self._maybe_compact()
+        return delivered
+
+    def _maybe_compact(self) -> None:
+        if self._records > max(16, self.compact_ratio * len(self._entries)):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the log so it only holds the live entries."""
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            for key, (seq, method, args) in self._entries.items():
+                f.write(json.dumps({
+                    "op": "put",
+                    "seq": seq,
+                    "key": key,
+                    "method": method,
+                    "args": args,
+                }, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.path)
+        self._records = len(self._entries)
@@ -0,0 +1,95 @@
+import random
+from typing import Optional
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter for transient call failures.
+
+    Attempt n (1-based) waits base_delay * multiplier ** (n - 1), capped at
+    max_delay, then scaled by a random factor in [1 - jitter, 1] so that
+    many senders retrying at once don't hit the bridge in lockstep.
+
+    Args:
+        max_attempts: Total attempts including the first. 1 disables retries.
+        base_delay: Delay before the first retry, in seconds.
+        max_delay: Upper bound on any single delay, in seconds.
+        multiplier: Growth factor between consecutive delays.
+        jitter: Fraction of each delay that is randomized, 0..1.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 5.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.5,
+    ):
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be >= 1, got: {max_attempts}")
+        if base_delay < 0 or max_delay < 0:
+            raise ValueError("base_delay and max_delay must be >= 0")
+        if multiplier < 1:
+            raise ValueError(f"multiplier must be >= 1, got: {multiplier}")
+        if not 0 <= jitter <= 1:
+            raise ValueError(f"jitter must be between 0 and 1, got: {jitter}")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the given failed attempt (1-based)."""
+        d = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return d * (1 - self.jitter * random.random())
+
+
+# Permission prompts wait on the user, not the plugin.
+_DEFAULT_METHOD_TIMEOUTS = {
+    "request_permissions": 120.0,
+    "request_exact_alarm_permission": 120.0,
+}
+
+# Retrying these would prompt the user again, or, for a timed-out append
+# that did reach the device, show the message twice.
+_NON_RETRYABLE_METHODS = {"request_permissions", "request_exact_alarm_permission", "append_message"}
+
+
+class CallPolicy:
+    """Timeouts and retry behavior for native method calls.
+
+    Args:
+        timeout: Seconds to wait for any single attempt. None waits forever.
+        method_timeouts: Per-method overrides of timeout, keyed by native
+            method name (e.g. {"get_pending_notifications": 5.0}).
+        retry: Retry policy for transient errors (timeouts, dropped
+            connections). Native "error:" results are never retried, nor
+            are permission prompts, appends, or batches holding an append.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: Optional[float] = 30.0,
+        method_timeouts: Optional[dict[str, Optional[float]]] = None,
+        retry: Optional[RetryPolicy] = None,
+    ):
+        if timeout is not None and timeout <= 0:
+            raise ValueError(f"timeout must be > 0 or None, got: {timeout}")
+        self.timeout = timeout
+        self.method_timeouts = {**_DEFAULT_METHOD_TIMEOUTS, **(method_timeouts or {})}
+        self.retry = retry or RetryPolicy()
+
+    def timeout_for(self, method_name: str) -> Optional[float]:
+        return self.method_timeouts.get(method_name, self.timeout)
+
+    def max_attempts_for(self, method_name: str, arguments: Optional[dict] = None) -> int:
+        if method_name in _NON_RETRYABLE_METHODS:
+            return 1
+        if method_name == "batch" and arguments and any(
+            c["method"] in _NON_RETRYABLE_METHODS for c in arguments["calls"]
+        ):
+            return 1
+        return self.retry.max_attempts
@@ -0,0 +1,355 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+_OVERFLOW_POLICIES = {"queue", "drop_oldest", "coalesce"}
+
+# Dispatch lanes, highest priority first.
+LANES = ("urgent", "normal", "bulk")
+
+_IMPORTANCE_LANES = {
+    "max": "urgent",
+    "high": "normal",
+    "default": "normal",
+    "low": "bulk",
+    "min": "bulk",
+    "none": "bulk",
+}
+
+
+def lane_for_importance(importance: str) -> str:
+    """Map a notification importance to its default dispatch lane."""
+    return _IMPORTANCE_LANES.get(importance, "normal")
+
+
+def validate_lane(lane: str) -> None:
+    if lane not in LANES:
+        raise ValueError(f"lane must be one of {list(LANES)}, got: {lane!r}")
+
+
+class TokenBucket:
+    """Classic token bucket: holds up to burst tokens, refilled at rate per second.
+
+    A cost above burst (a batch) goes out once the bucket is full and
+    leaves the balance negative, so the posts after it wait off the debt.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0:
+            raise ValueError(f"rate must be > 0, got: {rate}")
+        if burst < 1:
+            raise ValueError(f"burst must be >= 1, got: {burst}")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp: Optional[float] = None
+
+    def _refill(self, now: float) -> None:
+        if self._stamp is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def delay(self, now: float, cost: int = 1) -> float:
+        """Seconds until cost tokens are available (0 if they are now)."""
+        self._refill(now)
+        # a batch can't wait for more than a full bucket; take() charges the rest
+        needed = min(cost, self.burst)
+        if self._tokens >= needed:
+            return 0.0
+        return (needed - self._tokens) / self.rate
+
+    def take(self, now: float, cost: int = 1) -> None:
+        self._refill(now)
+        self._tokens -= cost
+
+
+class _Pending:
+    __slots__ = ("key", "channel_id", "cost", "lane", "send", "future", "enqueued")
+
+    def __init__(self, key, channel_id, cost, lane, send, future, enqueued):
+        self.key = key
+        self.channel_id = channel_id
+        self.cost = cost
+        self.lane = lane
+        self.send = send
+        self.future = future
+        self.enqueued = enqueued
+
+
+class _LatencyWindow:
+    """Latency samples for one lane over the most recent posts."""
+
+    def __init__(self, size: int = 1024):
+        self.count = 0
+        self.over_target = 0
+        self.max = 0.0
+        self._samples: deque = deque(maxlen=size)
+
+    def add(self, seconds: float, target: Optional[float]) -> None:
+        self.count += 1
+        self.max = max(self.max, seconds)
+        if target is not None and seconds > target:
+            self.over_target += 1
+        self._samples.append(seconds)
+
+    def summary(self) -> dict:
+        ordered = sorted(self._samples)
+
+        def pct(q: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+        return {
+            "count": self.count,
+            "over_target": self.over_target,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": self.max * 1000,
+        }
+
+
+class RateLimiter:
+    """Token-bucket limiter for posting notifications, global and per channel.
+
+    Android silently drops posts when an app exceeds roughly 5-10 per second.
+    Posts beyond the limit wait in a bounded queue and go out as tokens
+    refill, so delivery stays smooth instead of losing updates natively.
+
+    Waiting posts are split into priority lanes ("urgent", "normal",
+    "bulk"). Whenever a token frees up, the oldest post of the highest
+    non-empty lane goes first, so an urgent alert overtakes a queued
+    backlog of progress updates or digest posts.
+
+    Args:
+        rate: Global posts per second.
+        burst: Global bucket size (posts allowed back to back).
+        channel_limits: Per-channel (rate, burst) limits keyed by channel_id,
+            applied on top of the global limit.
+        overflow: What to do when max_pending posts are already waiting.
+            "queue" makes the caller wait for space; "drop_oldest" discards
+            the oldest waiting post; "coalesce" additionally replaces a
+            waiting post for the same notification id with the new one.
+            Drops are taken from the lowest lane first and never from a
+            lane above the incoming post's (which is then dropped
+            itself), and urgent posts never wait for space.
+        max_pending: Maximum number of posts waiting for tokens.
+        lane_targets: Latency targets in seconds per lane, e.g.
+            {"urgent": 0.5}. Posts slower than their target are counted
+            as over_target in lane_stats().
+
+    Posts discarded by drop_oldest or coalesce resolve to "dropped" or
+    "coalesced" instead of the native result.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 5,
+        *,
+        channel_limits: Optional[dict[str, tuple[float, int]]] = None,
+        overflow: str = "queue",
+        max_pending: int = 100,
+        lane_targets: Optional[dict[str, float]] = None,
+    ):
+        if overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow must be one of {sorted(_OVERFLOW_POLICIES)}, got: {overflow!r}"
+            )
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be >= 1, got: {max_pending}")
+        for lane in lane_targets or {}:
+            validate_lane(lane)
+        self.overflow = overflow
+        self.max_pending = max_pending
+        self.lane_targets = dict(lane_targets or {})
+        self._global = TokenBucket(rate, burst)
+        self._channels = {
+            channel_id: TokenBucket(r, b) for channel_id, (r, b) in (channel_limits or {}).items()
+        }
+        self._lanes: dict[str, list[_Pending]] = {lane: [] for lane in LANES}
+        self._latency = {lane: _LatencyWindow() for lane in LANES}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._pump_task: Optional[asyncio.Task] = None
+        # posts being sent; the loop only keeps weak references to tasks
+        self._sending: set[asyncio.Task] = set()
+        self.stats = {"posted": 0, "delayed": 0, "dropped": 0, "coalesced": 0}
+
+    @property
+    def pending(self) -> int:
+        return sum(len(q) for q in self._lanes.values())
+
+    def lane_stats(self) -> dict:
+        """Per-lane submit-to-delivery latency and queue depth."""
+        return {
+            lane: {**self._latency[lane].summary(), "pending": len(self._lanes[lane])}
+            for lane in LANES
+        }
+
+    def _delay(self, channel_id: Optional[str], cost: int, now: float) -> float:
+        d = self._global.delay(now, cost)
+        bucket = self._channels.get(channel_id)
+        if bucket is not None:
+            d = max(d, bucket.delay(now, cost))
+        return d
+
+    def _take(self, channel_id: Optional[str], cost: int, now: float) -> None:
+        self._global.take(now, cost)
+        bucket = self._channels.get(channel_id)
+        if bucket is not None:
+            bucket.take(now, cost)
+
+    def _record(self, lane: str, enqueued: float) -> None:
+        elapsed = asyncio.get_running_loop().time() - enqueued
+        self._latency[lane].add(elapsed, self.lane_targets.get(lane))
+
+    def _drop_lowest(self, lane: str) -> bool:
+        """Drop the oldest post of the lowest lane not above lane.
+
+        Returns False when every waiting post outranks lane; the incoming
+        post is then the one to drop.
+        """
+        for candidate in reversed(LANES[LANES.index(lane):]):
+            if self._lanes[candidate]:
+                oldest = self._lanes[candidate].pop(0)
+                if not oldest.future.done():
+                    oldest.future.set_result("dropped")
+                self.stats["dropped"] += 1
+                return True
+        return False
+
+    async def submit(
+        self,
+        key: Optional[Hashable],
+        channel_id: Optional[str],
+        send: Callable[[], Awaitable[Any]],
+        *,
+        cost: int = 1,
+        lane: str = "normal",
+    ) -> Any:
+        """Run send once tokens allow, returning its result.
+
+        key identifies the notification for coalescing (usually its id).
+        """
+        validate_lane(lane)
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if not self.pending and self._delay(channel_id, cost, now) == 0:
+            self._take(channel_id, cost, now)
+            self.stats["posted"] += 1
+            try:
+                return await send()
+            finally:
+                self._record(lane, now)
+
+        if self.overflow == "coalesce" and key is not None:
+            for queue in self._lanes.values():
+                for i, p in enumerate(queue):
+                    if p.key == key and not p.future.done():
+                        superseded = p.future
+                        del queue[i]
+                        superseded.set_result("coalesced")
+                        self.stats["coalesced"] += 1
+                        # the replacement keeps the original enqueue time so
+                        # coalesced updates can't be starved by newer ones
+                        p.send = send
+                        p.cost = cost
+                        p.future = loop.create_future()
+                        # an urgent update promotes a queued bulk one
+                        p.lane = min(p.lane, lane, key=LANES.index)
+                        self._lanes[p.lane].insert(self._position(p), p)
+                        self._kick()
+                        return await p.future
+
+        while self.pending >= self.max_pending:
+            if self.overflow == "queue":
+                if lane == "urgent":
+                    break
+                if self._space is None:
+                    self._space = asyncio.Event()
+                self._space.clear()
+                await self._space.wait()
+            elif not self._drop_lowest(lane):
+                self.stats["dropped"] += 1
+                return "dropped"
+
+        p = _Pending(key, channel_id, cost, lane, send, loop.create_future(), now)
+        self._lanes[lane].append(p)
+        self.stats["delayed"] += 1
+        self._kick()
+        return await p.future
+
+    def _position(self, p: _Pending) -> int:
+        """Index that keeps p's lane ordered by enqueue time."""
+        queue = self._lanes[p.lane]
+        for i, other in enumerate(queue):
+            if other.enqueued > p.enqueued:
+                return i
+        return len(queue)
+
+    def _kick(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.ensure_future(self._pump())
+
+    def _release_next(self, now: float) -> tuple[bool, Optional[float]]:
+        """Release one post if any is ready; otherwise return the shortest wait.
+
+        Lanes are scanned highest first. Within a lane, a post blocked on its
+        channel bucket doesn't hold back posts on other channels; the global
+        bucket still applies to all of them.
+        """
+        wait: Optional[float] = None
+        for queue in self._lanes.values():
+            for i, p in enumerate(queue):
+                if p.future.done():
+                    # caller was cancelled while waiting
+                    del queue[i]
+                    return True, None
+                d = self._delay(p.channel_id, p.cost, now)
+                if d == 0:
+                    del queue[i]
+                    self._take(p.channel_id, p.cost, now)
+                    self.stats["posted"] += 1
+                    task = asyncio.ensure_future(self._run(p))
+                    self._sending.add(task)
+                    task.add_done_callback(self._sending.discard)
+                    return True, None
+                wait = d if wait is None else min(wait, d)
+        return False, wait
+
+    async def _pump(self) -> None:
+        """Release waiting posts, highest lane first, as buckets refill."""
+        loop = asyncio.get_running_loop()
+        while self.pending:
+            released, wait = self._release_next(loop.time())
+            if released:
+                if self._space is not None:
+                    self._space.set()
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, p: _Pending) -> None:
+        future = p.future
+        try:
+            result = await p.send()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            self._record(p.lane, p.enqueued)
@@ -0,0 +1,479 @@
+import abc
+import calendar
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, Optional, Union
+
+
+# How far ahead next_after() searches before deciding a rule never fires
+# again (e.g. "0 0 30 2 *").
+_SEARCH_YEARS = 8
+
+_MONTH_NAMES = {name.lower(): i for i, name in enumerate(calendar.month_abbr) if name}
+_CRON_DAY_NAMES = {"sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6}
+_CRON_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_RRULE_DAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+_RRULE_FREQS = ("MINUTELY", "HOURLY", "DAILY", "WEEKLY", "MONTHLY")
+
+
+class Rule(abc.ABC):
+    """A recurrence rule. Subclasses implement next_after().
+
+    Times are naive local datetimes with minute resolution, matching what
+    schedule_notification() expects.
+    """
+
+    @abc.abstractmethod
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        """Return the first occurrence strictly after after, or None if there is none."""
+
+    def occurrences(self, start: datetime, end: datetime) -> Iterator[datetime]:
+        """Yield occurrences in the half-open interval [start, end)."""
+        t = self.next_after(start - timedelta(minutes=1))
+        while t is not None and t < end:
+            yield t
+            t = self.next_after(t)
+
+
+def _minute_floor(dt: datetime) -> datetime:
+    return dt.replace(second=0, microsecond=0)
+
+
+def _cron_value(text: str, names: dict) -> int:
+    return names[text] if text in names else int(text)
+
+
+def _parse_cron_field(field: str, lo: int, hi: int, names: dict) -> frozenset:
+    values = set()
+    for part in field.lower().split(","):
+        base, has_step, step_text = part.partition("/")
+        step = int(step_text) if has_step else 1
+        if step < 1:
+            raise ValueError(f"cron step must be >= 1, got: {step}")
+        if base == "*":
+            start, stop = lo, hi
+        elif "-" in base:
+            a, b = base.split("-", 1)
+            start, stop = _cron_value(a, names), _cron_value(b, names)
+        else:
+            start = _cron_value(base, names)
+            # "5/15" means 5, 20, 35, ... up to the field maximum
+            stop = hi if has_step else start
+        if not lo <= start <= hi or not lo <= stop <= hi or start > stop:
+            raise ValueError(f"cron field {field!r} out of range {lo}-{hi}")
+        values.update(range(start, stop + 1, step))
+    return frozenset(values)
+
+
+class CronRule(Rule):
+    """Five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Supports "*", lists ("1,15"), ranges ("1-5"), steps ("*/10", "9-17/2"),
+    month and weekday names ("jan", "mon"), Sunday as 0 or 7, and the
+    @hourly/@daily/@weekly/@monthly/@yearly aliases. As in cron, when both
+    day-of-month and day-of-week are restricted a day matching either fires.
+
+    Usage:
+        CronRule("0 9 * * mon-fri")   # weekdays at 9:00
+        CronRule("*/20 8-18 * * *")   # every 20 minutes during the day
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        text = _CRON_ALIASES.get(expression.strip().lower(), expression)
+        fields = text.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields, got: {expression!r}")
+        minute, hour, dom, month, dow = fields
+        self.minutes = _parse_cron_field(minute, 0, 59, {})
+        self.hours = _parse_cron_field(hour, 0, 23, {})
+        self.days = _parse_cron_field(dom, 1, 31, {})
+        self.months = _parse_cron_field(month, 1, 12, _MONTH_NAMES)
+        self.weekdays = frozenset(d % 7 for d in _parse_cron_field(dow, 0, 7, _CRON_DAY_NAMES))
+        self._dom_any = dom == "*"
+        self._hour_list = sorted(self.hours)
+        self._minute_list = sorted(self.minutes)
+        self._dow_any = dow == "*"
+
+    def __repr__(self) -> str:
+        return f"CronRule({self.expression!r})"
+
+    def _day_matches(self, d: date) -> bool:
+        in_dom = d.day in self.days
+        in_dow = (d.weekday() + 1) % 7 in self.weekdays
+        if self._dom_any or self._dow_any:
+            return in_dom and in_dow
+        return in_dom or in_dow
+
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        t = _minute_floor(after) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * _SEARCH_YEARS)
+        while t < limit:
+            if t.month not in self.months:
+                # first day of the next month
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                i = bisect_left(self._hour_list, t.hour)
+                if i == len(self._hour_list):
+                    t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                else:
+                    t = t.replace(hour=self._hour_list[i], minute=0)
+            elif t.minute not in self.minutes:
+                i = bisect_left(self._minute_list, t.minute)
+                if i == len(self._minute_list):
+                    t = t.replace(minute=0) + timedelta(hours=1)
+                else:
+                    t = t.replace(minute=self._minute_list[i])
+            else:
+                return t
+        return None
+
+
+class RRule(Rule):
+    """A subset of RFC 5545 recurrence rules.
+
+    Supported: FREQ (MINUTELY, HOURLY, DAILY, WEEKLY, MONTHLY), INTERVAL,
+    BYDAY (weekday codes without ordinals), BYMONTHDAY, BYHOUR, BYMINUTE
+    and UNTIL. Times not given by BYHOUR/BYMINUTE default to those of start.
+
+    Args:
+        freq: One of MINUTELY, HOURLY, DAILY, WEEKLY, MONTHLY.
+        start: First possible occurrence (DTSTART). Defaults to now.
+        interval: Every Nth period.
+        by_day: Weekday codes, e.g. ["MO", "WE"].
+        by_month_day: Days of the month, 1-31.
+        by_hour: Hours, 0-23.
+        by_minute: Minutes, 0-59.
+        until: Last possible occurrence (inclusive).
+
+    Usage:
+        RRule("WEEKLY", by_day=["MO", "WE", "FR"], by_hour=[9], by_minute=[30])
+        RRule.parse("FREQ=DAILY;INTERVAL=2;BYHOUR=8,20;BYMINUTE=0")
+    """
+
+    def __init__(
+        self,
+        freq: str,
+        *,
+        start: Optional[datetime] = None,
+        interval: int = 1,
+        by_day: Optional[list[str]] = None,
+        by_month_day: Optional[list[int]] = None,
+        by_hour: Optional[list[int]] = None,
+        by_minute: Optional[list[int]] = None,
+        until: Optional[datetime] = None,
+    ):
+        freq = freq.upper()
+        if freq not in _RRULE_FREQS:
+            raise ValueError(f"freq must be one of {list(_RRULE_FREQS)}, got: {freq!r}")
+        if interval < 1:
+            raise ValueError(f"interval must be >= 1, got: {interval}")
+        for code in by_day or ():
+            if code.upper() not in _RRULE_DAYS:
+                raise ValueError(f"by_day values must be one of {list(_RRULE_DAYS)}, got: {code!r}")
+        for name, values, lo, hi in (
+            ("by_month_day", by_month_day, 1, 31),
+            ("by_hour", by_hour, 0, 23),
+            ("by_minute", by_minute, 0, 59),
+        ):
+            for v in values or ():
+                if not lo <= v <= hi:
+                    raise ValueError(f"{name} values must be between {lo} and {hi}, got: {v}")
+        self.freq = freq
+        self.start = _minute_floor(start or datetime.now())
+        self.interval = interval
+        self.by_day = sorted({_RRULE_DAYS[c.upper()] for c in by_day}) if by_day else None
+        self.by_month_day = sorted(set(by_month_day)) if by_month_day else None
+        self.by_hour = sorted(set(by_hour)) if by_hour else None
+        self.by_minute = sorted(set(by_minute)) if by_minute else None
+        self.until = until
+
+    @classmethod
+    def parse(cls, text: str, *, start: Optional[datetime] = None) -> "RRule":
+        """Parse an RRULE string such as "FREQ=WEEKLY;BYDAY=MO,TH;BYHOUR=9"."""
+        if text.upper().startswith("RRULE:"):
+            text = text[6:]
+        parts = {}
+        for item in text.split(";"):
+            if not item:
+                continue
+            key, _, value = item.partition("=")
+            parts[key.strip().upper()] = value.strip()
+        if "FREQ" not in parts:
+            raise ValueError(f"RRULE needs FREQ, got: {text!r}")
+        unknown = set(parts) - {"FREQ", "INTERVAL", "BYDAY", "BYMONTHDAY", "BYHOUR", "BYMINUTE", "UNTIL"}
+        if unknown:
+            raise ValueError(f"unsupported RRULE parts: {sorted(unknown)}")
+
+        def ints(key):
+            return [int(v) for v in parts[key].split(",")] if key in parts else None
+
+        until = None
+        if "UNTIL" in parts:
+            value = parts["UNTIL"].rstrip("Z")
+            until = datetime.strptime(value, "%Y%m%dT%H%M%S" if "T" in value else "%Y%m%d")
+        return cls(
+            parts["FREQ"],
+            start=start,
+            interval=int(parts.get("INTERVAL", 1)),
+            by_day=parts["BYDAY"].split(",") if "BYDAY" in parts else None,
+            by_month_day=ints("BYMONTHDAY"),
+            by_hour=ints("BYHOUR"),
+            by_minute=ints("BYMINUTE"),
+            until=until,
+        )
+
+    def __repr__(self) -> str:
+        return f"RRule({self.freq!r}, start={self.start!r}, interval={self.interval})"
+
+    def _period_index(self, t: datetime) -> int:
+        """Index of the FREQ period containing t, counted from start's period."""
+        s = self.start
+        if self.freq == "MONTHLY":
+            return (t.year - s.year) * 12 + t.month - s.month
+        if self.freq == "WEEKLY":
+            anchor = (s - timedelta(days=s.weekday())).date()
+            return (t.date() - anchor).days // 7
+        if self.freq == "DAILY":
+            return (t.date() - s.date()).days
+        if self.freq == "HOURLY":
+            return (t - s.replace(minute=0)) // timedelta(hours=1)
+        return (t - s) // timedelta(minutes=1)
+
+    def _period_start(self, index: int) -> datetime:
+        s = self.start
+        if self.freq == "MONTHLY":
+            months = s.month - 1 + index
+            return datetime(s.year + months // 12, months % 12 + 1, 1)
+        if self.freq == "WEEKLY":
+            anchor = datetime.combine((s - timedelta(days=s.weekday())).date(), datetime.min.time())
+            return anchor + timedelta(weeks=index)
+        if self.freq == "DAILY":
+            return datetime.combine(s.date(), datetime.min.time()) + timedelta(days=index)
+        if self.freq == "HOURLY":
+            return s.replace(minute=0) + timedelta(hours=index)
+        return s + timedelta(minutes=index)
+
+    def _days(self, period: datetime) -> list[date]:
+        if self.freq == "MONTHLY":
+            last = calendar.monthrange(period.year, period.month)[1]
+            if self.by_month_day:
+                days = [period.replace(day=d).date() for d in self.by_month_day if d <= last]
+            elif self.by_day is not None:
+                days = [period.replace(day=d).date() for d in range(1, last + 1)]
+            else:
+                days = [period.replace(day=self.start.day).date()] if self.start.day <= last else []
+            if self.by_day is not None:
+                days = [d for d in days if d.weekday() in self.by_day]
+            return days
+        if self.freq == "WEEKLY":
+            weekdays = self.by_day if self.by_day is not None else [self.start.weekday()]
+            days = [(period + timedelta(days=w)).date() for w in weekdays]
+        else:
+            days = [period.date()]
+        if self.by_day is not None:
+            days = [d for d in days if d.weekday() in self.by_day]
+        if self.by_month_day:
+            days = [d for d in days if d.day in self.by_month_day]
+        return days
+
+    def _expand(self, period: datetime) -> list[datetime]:
+        """Every candidate occurrence within one FREQ period, sorted."""
+        if self.freq == "MINUTELY":
+            ok = (
+                (self.by_hour is None or period.hour in self.by_hour)
+                and (self.by_minute is None or period.minute in self.by_minute)
+                and period.date() in self._days(period)
+            )
+            return [period] if ok else []
+        if self.freq == "HOURLY":
+            if self.by_hour is not None and period.hour not in self.by_hour:
+                return []
+            if period.date() not in self._days(period):
+                return []
+            return [period.replace(minute=m) for m in (self.by_minute or [self.start.minute])]
+        hours = self.by_hour or [self.start.hour]
+        minutes = self.by_minute or [self.start.minute]
+        return [
+            datetime(d.year, d.month, d.day, h, m)
+            for d in self._days(period)
+            for h in hours
+            for m in minutes
+        ]
+
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        after = max(after, self.start - timedelta(minutes=1))
+        index = self._period_index(after)
+        index -= index % self.interval
+        limit = after + timedelta(days=366 * _SEARCH_YEARS)
+        while True:
+            period = self._period_start(index)
+            if period > limit:
+                return None
+            for t in self._expand(period):
+                if t > after and t >= self.start:
+                    if self.until is not None and t > self.until:
+                        return None
+                    return t
+            index += self.interval
+
+
+def parse_rule(text: Union[str, Rule]) -> Rule:
+    """Build a Rule from a cron expression or an RRULE string (one containing "FREQ=")."""
+    if isinstance(text, Rule):
+        return text
+    if "FREQ=" in text.upper():
+        return RRule.parse(text)
+    return CronRule(text)
+
+
+# Windows are numbered from a fixed origin so their bounds don't depend on
+# when the index was created.
+_WINDOW_ORIGIN = datetime(2000, 1, 3)  # a Monday
+
+
+class RecurrenceIndex:
+    """Sorted index of upcoming occurrences across many rules.
+
+    Occurrences are expanded lazily, one time window at a time, the first
+    time a lookup reaches that window, and kept sorted and memoized, so
+    repeated next() calls cost a binary search rather than a pass over
+    every rule. Adding a rule merges its occurrences into the windows
+    already built; windows in the past are dropped as lookups move on.
+
+    Args:
+        window: Span of time expanded at once.
+        horizon: How far past the lookup time next() searches before
+            giving up on finding more occurrences.
+
+    Usage:
+        index = RecurrenceIndex()
+        index.add("standup", "0 9 * * mon-fri", exclude=[date(2026, 12, 25)])
+        index.add("pills", "FREQ=DAILY;BYHOUR=8,20;BYMINUTE=0")
+        index.next(5)   # [(datetime, key), ...] soonest first
+    """
+
+    def __init__(
+        self,
+        window: timedelta = timedelta(days=7),
+        *,
+        horizon: timedelta = timedelta(days=366),
+    ):
+        if window <= timedelta(0):
+            raise ValueError(f"window must be positive, got: {window}")
+        self.window = window
+        self.horizon = horizon
+        self._rules: dict[str, tuple[Rule, frozenset]] = {}
+        # window number -> (sorted fire times, keys in the same order)
+        self._windows: dict[int, tuple[list[datetime], list[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rules
+
+    def add(
+        self,
+        key: str,
+        rule: Union[str, Rule],
+        *,
+        exclude: Iterable[Union[date, datetime]] = (),
+    ) -> None:
+        """Add or replace a rule.
+
+        Args:
+            key: Identifies the rule in results and for remove().
+            rule: A Rule, a cron expression or an RRULE string.
+            exclude: Dates (skip the whole day, e.g. holidays) or exact
+                datetimes (skip one occurrence).
+        """
+        rule = parse_rule(rule)
+        self.remove(key)
+        exclusions = frozenset(exclude)
+        self._rules[key] = (rule, exclusions)
+        for number, (times, keys) in self._windows.items():
+            start, end = self._bounds(number)
+            for t in self._expand(rule, exclusions, start, end):
+                i = bisect_right(times, t)
+                times.insert(i, t)
+                keys.insert(i, key)
+
+    def remove(self, key: str) -> None:
+        if self._rules.pop(key, None) is None:
+            return
+        for number, (times, keys) in self._windows.items():
+            if key in keys:
+                kept = [(t, k) for t, k in zip(times, keys) if k != key]
+                self._windows[number] = ([t for t, _ in kept], [k for _, k in kept])
+
+    def next(self, n: int = 1, after: Optional[datetime] = None) -> list[tuple[datetime, str]]:
+        """Return up to n (fire time, key) pairs strictly after after (default now)."""
+        after = after or datetime.now()
+        number = self._number(after)
+        self._prune(number)
+        last = self._number(after + self.horizon)
+        found: list[tuple[datetime, str]] = []
+        while len(found) < n and number <= last:
+            times, keys = self._window(number)
+            i = bisect_right(times, after)
+            j = min(len(times), i + n - len(found))
+            found.extend(zip(times[i:j], keys[i:j]))
+            number += 1
+        return found
+
+    def between(self, start: datetime, end: datetime) -> list[tuple[datetime, str]]:
+        """Return every (fire time, key) pair in [start, end)."""
+        found: list[tuple[datetime, str]] = []
+        for number in range(self._number(start), self._number(end) + 1):
+            times, keys = self._window(number)
+            i, j = bisect_left(times, start), bisect_left(times, end)
+            found.extend(zip(times[i:j], keys[i:j]))
+        return found
+
+    def keys_at(self, t: datetime) -> list[str]:
+        """Return the keys of every rule firing at exactly t."""
+        times, keys = self._window(self._number(t))
+        return keys[bisect_left(times, t):bisect_right(times, t)]
+
+    def _number(self, t: datetime) -> int:
+        return (t - _WINDOW_ORIGIN) // self.window
+
+    def _bounds(self, number: int) -> tuple[datetime, datetime]:
+        start = _WINDOW_ORIGIN + number * self.window
+        return start, start + self.window
+
+    @staticmethod
+    def _expand(rule: Rule, exclusions: frozenset, start: datetime, end: datetime) -> list[datetime]:
+        return [
+            t for t in rule.occurrences(start, end)
+            if t not in exclusions and t.date() not in exclusions
+        ]
+
+    def _window(self, number: int) -> tuple[list[datetime], list[str]]:
+        built = self._windows.get(number)
+        if built is None:
+            start, end = self._bounds(number)
+            entries = sorted(
+                (t, key)
+                for key, (rule, exclusions) in self._rules.items()
+                for t in self._expand(rule, exclusions, start, end)
+            )
+            built = ([t for t, _ in entries], [k for _, k in entries])
+            self._windows[number] = built
+        return built
+
+    def _prune(self, current: int) -> None:
+        for number in [n for n in self._windows if n < current]:
+            del self._windows[number]
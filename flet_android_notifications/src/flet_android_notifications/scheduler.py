@@ -0,0 +1,203 @@
+import asyncio
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+
+from .recurrence import RecurrenceIndex, Rule
+from .styles import InboxStyle
+
+if TYPE_CHECKING:
+    from .flet_android_notifications import FletAndroidNotifications
+
+
+class _Reminder:
+    __slots__ = ("title", "body", "options")
+
+    def __init__(self, title: str, body: str, options: dict):
+        self.title = title
+        self.body = body
+        self.options = options
+
+
+class PeriodicScheduler:
+    """Runs many recurring reminders on a single native alarm.
+
+    Fire times come from a RecurrenceIndex over all rules; only the soonest
+    occurrence is handed to schedule_notification(), so
+    the app holds one pending alarm however many rules exist. After that
+    alarm fires, rearm() arms the next one. run() does this in a loop
+    while the app is alive; also call rearm() on app start and from
+    on_notification_tap, since Android only fires what is armed.
+
+    notification_id and notification_id + 1 are used alternately, so the
+    reminder that just fired stays visible while the next one is pending.
+    The first rearm() after a restart looks up which of the two is pending
+    natively, and cancels a stray alarm in the other one.
+    Rules that fire at the same minute are merged into one notification.
+
+    Args:
+        notifications: The service to schedule through.
+        notification_id: First of the two notification ids reserved for
+            the scheduler.
+        schedule_mode: Passed to schedule_notification. Exact modes need
+            the SCHEDULE_EXACT_ALARM permission.
+        index: Empty RecurrenceIndex to use, e.g. one with a different window.
+        **options: Default schedule_notification keyword arguments for
+            every reminder (channel_id, icon, ...).
+
+    Raises:
+        ValueError: If index already holds rules; add them through the
+            scheduler so each has a reminder.
+
+    Usage:
+        scheduler = PeriodicScheduler(notifications, 9000)
+        scheduler.add("standup", "0 9 * * mon-fri", "Standup", "In 5 minutes")
+        scheduler.add("water", "FREQ=HOURLY;INTERVAL=2;BYMINUTE=0", "Water", "Drink up")
+        page.run_task(scheduler.run)
+    """
+
+    def __init__(
+        self,
+        notifications: "FletAndroidNotifications",
+        notification_id: int,
+        *,
+        schedule_mode: str = "exact_allow_while_idle",
+        index: Optional[RecurrenceIndex] = None,
+        **options,
+    ):
+        if "match_date_time_components" in options:
+            raise ValueError("match_date_time_components is managed by PeriodicScheduler")
+        if index is not None and len(index):
+            raise ValueError("index must be empty; add rules with PeriodicScheduler.add()")
+        self.notifications = notifications
+        self.notification_id = notification_id
+        self.schedule_mode = schedule_mode
+        self.options = options
+        self._reminders: dict[str, _Reminder] = {}
+        self._index = index or RecurrenceIndex()
+        self._slot = 0
+        # the slot isn't persisted, so the first rearm() reads it off the device
+        self._synced = False
+        # (fire time, keys) of the pending alarm, if any
+        self._armed: Optional[tuple[datetime, tuple[str, ...]]] = None
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._reminders)
+
+    def add(
+        self,
+        key: str,
+        rule: Union[str, Rule],
+        title: str,
+        body: str,
+        *,
+        exclude: Iterable[Union[date, datetime]] = (),
+        **options,
+    ) -> None:
+        """Add or replace a recurring reminder.
+
+        Args:
+            key: Identifies the reminder for remove(); also the default payload.
+            rule: A Rule, a cron expression or an RRULE string.
+            title: Notification title.
+            body: Notification body.
+            exclude: Dates or datetimes to skip, e.g. holidays.
+            **options: schedule_notification arguments for this reminder only.
+        """
+        self._index.add(key, rule, exclude=exclude)
+        self._reminders[key] = _Reminder(title, body, options)
+        self._changed.set()
+
+    def remove(self, key: str) -> None:
+        if self._reminders.pop(key, None) is not None:
+            self._index.remove(key)
+            self._changed.set()
+
+    def upcoming(self, n: int = 10) -> list[tuple[datetime, str]]:
+        """Return the next n (fire time, key) pairs across all reminders."""
+        return self._index.next(n)
+
+    def next_occurrence(
+        self, after: Optional[datetime] = None
+    ) -> Optional[tuple[datetime, list[str]]]:
+        """Return the soonest fire time after after (default now) and the keys firing then."""
+        found = self._index.next(1, after)
+        if not found:
+            return None
+        soonest = found[0][0]
+        return soonest, self._index.keys_at(soonest)
+
+    async def rearm(self) -> Optional[datetime]:
+        """Arm the native alarm for the soonest occurrence and return its time.
+
+        Cheap to call often: nothing is sent when the armed alarm is already
+        the right one.
+        """
+        stale: list[int] = []
+        if not self._synced:
+            pending = {p["id"] for p in await self.notifications.get_pending_notifications()}
+            stale = [slot for slot in (0, 1) if self.notification_id + slot in pending]
+            if stale:
+                self._slot = stale[0]
+            self._synced = True
+        now = datetime.now()
+        if self._armed is not None and self._armed[0] <= now:
+            # the armed alarm fired; leave it on screen and use the other id
+            self._armed = None
+            self._slot ^= 1
+        notification_id = self.notification_id + self._slot
+        upcoming = self.next_occurrence(now)
+        if upcoming is None:
+            if self._armed is not None or stale:
+                for slot in stale or [self._slot]:
+                    await self.notifications.cancel(self.notification_id + slot)
+                self._armed = None
+            return None
+        for slot in stale:
+            if slot != self._slot:
+                # armed by an earlier run; left alone it would fire as well
+                await self.notifications.cancel(self.notification_id + slot)
+
+        fire, keys = upcoming
+        if self._armed == (fire, tuple(keys)):
+            return fire
+        reminders = [self._reminders[k] for k in keys]
+        if len(reminders) == 1:
+            title, body = reminders[0].title, reminders[0].body
+            options = {"payload": keys[0], **self.options, **reminders[0].options}
+        else:
+            title = f"{len(reminders)} reminders"
+            body = ", ".join(r.title for r in reminders)
+            options = {
+                "payload": ",".join(keys),
+                **self.options,
+                "style": InboxStyle([f"{r.title}: {r.body}" for r in reminders], content_title=title),
+            }
+        await self.notifications.schedule_notification(
+            notification_id,
+            title,
+            body,
+            fire,
+            schedule_mode=self.schedule_mode,
+            **options,
+        )
+        self._armed = (fire, tuple(keys))
+        return fire
+
+    async def run(self, max_sleep: float = 3600.0):
+        """Keep the alarm armed until cancelled.
+
+        Re-arms right after each occurrence, whenever rules are added or
+        removed, and at least every max_sleep seconds to follow clock and
+        time zone changes.
+        """
+        while True:
+            self._changed.clear()
+            fire = await self.rearm()
+            delay = max_sleep
+            if fire is not None:
+                delay = min(max_sleep, max(1.0, (fire - datetime.now()).total_seconds() + 1))
+            try:
+                await asyncio.wait_for(self._changed.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
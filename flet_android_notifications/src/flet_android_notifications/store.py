@@ -0,0 +1,148 @@
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Iterable, Optional, Union
+
+from .bitmaps import embed_bitmaps
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedule (
+    id INTEGER PRIMARY KEY,
+    method TEXT NOT NULL,
+    args TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    fire_at_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS schedule_fire_at ON schedule (fire_at_ms);
+"""
+
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _fnv1a64(text: str) -> int:
+    h = _FNV_OFFSET
+    for b in text.encode():
+        h = ((h ^ b) * _FNV_PRIME) & _MASK64
+    return h
+
+
+def schedule_checksum(entries: Iterable[tuple[int, Optional[str]]]) -> str:
+    """Order-independent checksum of (id, content_hash) pairs.
+
+    XOR of FNV-1a 64 hashes of "id:hash", prefixed with the count. The Dart
+    side computes the same over its pending requests (get_pending_checksum),
+    so an in-sync schedule is confirmed without listing either side.
+    """
+    count, x = 0, 0
+    for notification_id, content_hash in entries:
+        x ^= _fnv1a64(f"{notification_id}:{content_hash or ''}")
+        count += 1
+    return f"{count}:{x:x}"
+
+
+def _one_shot_fire_at(method_name: str, arguments: dict) -> Optional[int]:
+    # recurring schedules keep firing, so they never expire from the store
+    if method_name != "schedule_notification" or arguments.get("match_date_time_components"):
+        return None
+    return arguments.get("scheduled_epoch_ms")
+
+
+class ScheduleStore:
+    """Local sqlite copy of every scheduled notification.
+
+    Once attached with set_schedule_store(), schedule_notification and the
+    periodic methods record their calls here, and cancel/cancel_all remove
+    them. restore_schedule() then re-creates whatever the native side lost
+    (reboot without boot receiver, cleared plugin storage) without
+    rescheduling the rest. One-shot entries are indexed by fire time, so
+    expired ones are pruned with a single range delete.
+
+    Args:
+        path: Database file, e.g. under FLET_APP_STORAGE_DATA.
+
+    Usage:
+        store = ScheduleStore(os.path.join(os.getenv("FLET_APP_STORAGE_DATA"), "schedule.db"))
+        notifications.set_schedule_store(store)
+        await notifications.restore_schedule()
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = os.fspath(path)
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(_SCHEMA)
+        # entries written before recurring schedules were excluded from pruning
+        with self._db:
+            self._db.execute(
+                "UPDATE schedule SET fire_at_ms = NULL WHERE fire_at_ms IS NOT NULL AND "
+                "(method != 'schedule_notification' "
+                "OR json_extract(args, '$.match_date_time_components') IS NOT NULL)"
+            )
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM schedule").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+    def record(self, method_name: str, arguments: Optional[dict]) -> None:
+        """Apply a native call's effect on the schedule."""
+        if method_name == "cancel":
+            self.delete(arguments["id"])
+        elif method_name == "cancel_all":
+            self.clear()
+        elif arguments and "content_hash" in arguments:
+            self.put(method_name, arguments)
+
+    def put(self, method_name: str, arguments: dict) -> None:
+        # images are stored inline: the in-memory registry is gone after a restart
+        arguments = embed_bitmaps(method_name, arguments)
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO schedule (id, method, args, content_hash, fire_at_ms) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    arguments["id"],
+                    method_name,
+                    json.dumps(arguments, separators=(",", ":")),
+                    arguments["content_hash"],
+                    _one_shot_fire_at(method_name, arguments),
+                ),
+            )
+
+    def delete(self, notification_id: int) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM schedule WHERE id = ?", (notification_id,))
+
+    def clear(self) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM schedule")
+
+    def entries(self) -> list[tuple[str, dict]]:
+        """Return (method, arguments) for every stored entry, by id."""
+        rows = self._db.execute("SELECT method, args FROM schedule ORDER BY id")
+        return [(method, json.loads(args)) for method, args in rows]
+
+    def upcoming(self, limit: int = 10) -> list[tuple[datetime, int]]:
+        """Return the next one-shot (fire time, id) pairs, soonest first."""
+        rows = self._db.execute(
+            "SELECT fire_at_ms, id FROM schedule WHERE fire_at_ms >= ? "
+            "ORDER BY fire_at_ms LIMIT ?",
+            (int(time.time() * 1000), limit),
+        )
+        return [(datetime.fromtimestamp(ms / 1000), i) for ms, i in rows]
+
+    def prune(self, now_ms: Optional[int] = None) -> int:
+        """Drop one-shot entries that already fired. Returns how many."""
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        with self._db:
+            cur = self._db.execute("DELETE FROM schedule WHERE fire_at_ms < ?", (now_ms,))
+        return cur.rowcount
+
+    def checksum(self) -> str:
+        return schedule_checksum(self._db.execute("SELECT id, content_hash FROM schedule"))
@@ -0,0 +1,260 @@
+import abc
+from datetime import datetime
+from typing import Optional, Union
+
+from .bitmaps import BitmapData, register_bitmap
+from .bitmaps import registry as bitmap_registry
+
+
+class _Style(abc.ABC):
+    """Base for notification styles: immutable, with a memoized to_dict().
+
+    Styles are typically built once and reused across many notifications,
+    so the serialized form is computed on first use and shared. Treat the
+    returned dict as read-only.
+    """
+
+    __slots__ = ("_dict",)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _init(self, **fields) -> None:
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    @abc.abstractmethod
+    def _build(self) -> dict:
+        """Return the serialized form; called once by to_dict()."""
+
+    def to_dict(self) -> dict:
+        try:
+            return self._dict
+        except AttributeError:
+            d = self._build()
+            object.__setattr__(self, "_dict", d)
+            return d
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self.__slots__ if not name.startswith("_")
+        )
+        return f"{type(self).__name__}({fields})"
+
+
+class BigTextStyle(_Style):
+    """Expandable big text notification style.
+
+    When the notification is expanded, shows the full big_text content
+    instead of the truncated body.
+    """
+
+    __slots__ = ("big_text", "content_title", "summary_text")
+
+    def __init__(
+        self,
+        big_text: str,
+        *,
+        content_title: Optional[str] = None,
+        summary_text: Optional[str] = None,
+    ):
+        self._init(big_text=big_text, content_title=content_title, summary_text=summary_text)
+
+    def _build(self) -> dict:
+        return {
+            "type": "big_text",
+            "big_text": self.big_text,
+            "content_title": self.content_title,
+            "summary_text": self.summary_text,
+        }
+
+
+class BigPictureStyle(_Style):
+    """Notification style that shows a large image when expanded.
+
+    Provide exactly one of file_path, drawable_resource or data (in-memory
+    image bytes) for the main image. Optionally provide a large icon via
+    large_icon_file_path, large_icon_drawable_resource or large_icon_data.
+    """
+
+    __slots__ = (
+        "file_path", "drawable_resource", "data_digest", "content_title", "summary_text",
+        "large_icon_file_path", "large_icon_drawable_resource", "large_icon_digest",
+        "hide_expanded_large_icon", "_data", "_large_icon_data",
+    )
+
+    def __init__(
+        self,
+        *,
+        file_path: Optional[str] = None,
+        drawable_resource: Optional[str] = None,
+        data: Optional[BitmapData] = None,
+        content_title: Optional[str] = None,
+        summary_text: Optional[str] = None,
+        large_icon_file_path: Optional[str] = None,
+        large_icon_drawable_resource: Optional[str] = None,
+        large_icon_data: Optional[BitmapData] = None,
+        hide_expanded_large_icon: bool = False,
+    ):
+        sources = sum(1 for v in (file_path, drawable_resource, data) if v)
+        if sources > 1:
+            raise ValueError("provide exactly one of file_path, drawable_resource or data, not several")
+        if sources == 0:
+            raise ValueError("provide exactly one of file_path, drawable_resource or data")
+        self._init(
+            file_path=file_path,
+            drawable_resource=drawable_resource,
+            data_digest=register_bitmap(data) if data else None,
+            content_title=content_title,
+            summary_text=summary_text,
+            large_icon_file_path=large_icon_file_path,
+            large_icon_drawable_resource=large_icon_drawable_resource,
+            large_icon_digest=register_bitmap(large_icon_data) if large_icon_data else None,
+            hide_expanded_large_icon=hide_expanded_large_icon,
+            # kept so the images can be registered again after LRU eviction
+            _data=bytes(data) if data else None,
+            _large_icon_data=bytes(large_icon_data) if large_icon_data else None,
+        )
+
+    def to_dict(self) -> dict:
+        for digest, data in ((self.data_digest, self._data), (self.large_icon_digest, self._large_icon_data)):
+            if digest and bitmap_registry.get(digest) is None:
+                register_bitmap(data)
+        return super().to_dict()
+
+    def _build(self) -> dict:
+        if self.data_digest:
+            bitmap_type, bitmap_value = "bytes", self.data_digest
+        elif self.file_path:
+            bitmap_type, bitmap_value = "file_path", self.file_path
+        else:
+            bitmap_type, bitmap_value = "drawable_resource", self.drawable_resource
+        d = {
+            "type": "big_picture",
+            "bitmap_type": bitmap_type,
+            "bitmap_value": bitmap_value,
+            "content_title": self.content_title,
+            "summary_text": self.summary_text,
+            "hide_expanded_large_icon": self.hide_expanded_large_icon,
+        }
+        if self.large_icon_digest:
+            d["large_icon_type"] = "bytes"
+            d["large_icon_value"] = self.large_icon_digest
+        elif self.large_icon_file_path:
+            d["large_icon_type"] = "file_path"
+            d["large_icon_value"] = self.large_icon_file_path
+        elif self.large_icon_drawable_resource:
+            d["large_icon_type"] = "drawable_resource"
+            d["large_icon_value"] = self.large_icon_drawable_resource
+        return d
+
+
+class InboxStyle(_Style):
+    """Notification style that shows a list of text lines when expanded."""
+
+    __slots__ = ("lines", "content_title", "summary_text")
+
+    def __init__(
+        self,
+        lines: list[str],
+        *,
+        content_title: Optional[str] = None,
+        summary_text: Optional[str] = None,
+    ):
+        self._init(lines=tuple(lines), content_title=content_title, summary_text=summary_text)
+
+    def _build(self) -> dict:
+        return {
+            "type": "inbox",
+            "lines": list(self.lines),
+            "content_title": self.content_title,
+            "summary_text": self.summary_text,
+        }
+
+
+class Message(_Style):
+    """A single chat message for MessagingStyle.
+
+    Args:
+        text: Message text.
+        sender: Display name of the sender. None means the device user
+            (MessagingStyle's person_name).
+        timestamp: When the message was sent. Defaults to now.
+    """
+
+    __slots__ = ("text", "sender", "timestamp")
+
+    def __init__(
+        self,
+        text: str,
+        *,
+        sender: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ):
+        self._init(text=text, sender=sender, timestamp=timestamp or datetime.now())
+
+    def _build(self) -> dict:
+        return {
+            "text": self.text,
+            "sender": self.sender,
+            "timestamp_ms": int(self.timestamp.timestamp() * 1000),
+        }
+
+
+class MessagingStyle(_Style):
+    """Chat notification style showing a conversation's recent messages.
+
+    Args:
+        person_name: Display name of the device user; messages without a
+            sender are shown as theirs.
+        messages: The messages to show, oldest first.
+        conversation_title: Title for group conversations.
+        group_conversation: Whether this is a group conversation.
+    """
+
+    __slots__ = ("person_name", "messages", "conversation_title", "group_conversation")
+
+    def __init__(
+        self,
+        person_name: str,
+        messages: list[Message],
+        *,
+        conversation_title: Optional[str] = None,
+        group_conversation: bool = False,
+    ):
+        if not messages:
+            raise ValueError("MessagingStyle needs at least one message")
+        self._init(
+            person_name=person_name,
+            messages=tuple(messages),
+            conversation_title=conversation_title,
+            group_conversation=group_conversation,
+        )
+
+    def _build(self) -> dict:
+        return {
+            "type": "messaging",
+            "person_name": self.person_name,
+            "messages": [m.to_dict() for m in self.messages],
+            "conversation_title": self.conversation_title,
+            "group_conversation": self.group_conversation,
+        }
+
+
+class MediaStyle(_Style):
+    """Media playback notification style.
+
+    Android shows the notification's actions as compact transport controls.
+    Pair it with a large_icon for the album art.
+    """
+
+    __slots__ = ()
+
+    def _build(self) -> dict:
+        return {"type": "media"}
+
+
+NotificationStyle = Union[BigTextStyle, BigPictureStyle, InboxStyle, MessagingStyle, MediaStyle]
@@ -0,0 +1,200 @@
+import contextlib
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+# Span currently active in this task, parent of spans started without one.
+_current_span: ContextVar[Optional["Span"]] = ContextVar(
+    "flet_android_notifications_span", default=None
+)
+
+
+def _trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+class Span:
+    """A timed operation, shaped like an OpenTelemetry span.
+
+    trace_id and span_id are W3C-style hex strings (32 and 16 characters),
+    times are nanoseconds since the epoch and status is "unset", "ok" or
+    "error", so processors can forward spans to an OpenTelemetry exporter
+    field by field.
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "attributes",
+        "start_time", "end_time", "status", "status_description", "_tracer",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        attributes: dict,
+        start_time: int,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _span_id()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = start_time
+        self.end_time: Optional[int] = None
+        self.status = "unset"
+        self.status_description: Optional[str] = None
+        self._tracer = tracer
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, trace_id={self.trace_id!r}, span_id={self.span_id!r})"
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time is None:
+            return None
+        return (self.end_time - self.start_time) / 1_000_000
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str, description: Optional[str] = None) -> None:
+        self.status = status
+        self.status_description = description
+
+    def end(self, end_time: Optional[int] = None) -> None:
+        """Finish the span and hand it to the processors. Later calls are ignored."""
+        if self.end_time is not None:
+            return
+        self.end_time = end_time if end_time is not None else time.time_ns()
+        for processor in self._tracer.processors:
+            processor.on_end(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "status": self.status,
+            "status_description": self.status_description,
+            "attributes": dict(self.attributes),
+        }
+
+
+class SpanProcessor:
+    """Receives spans as they start and end.
+
+    Same method names as OpenTelemetry's SpanProcessor; subclass and
+    override what you need. Callbacks run inline, so keep them cheap.
+    """
+
+    def on_start(self, span: Span) -> None:
+        pass
+
+    def on_end(self, span: Span) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+class SpanRecorder(SpanProcessor):
+    """Keeps the most recent finished spans in memory.
+
+    Args:
+        maxlen: How many spans to keep; the oldest are dropped first.
+    """
+
+    def __init__(self, maxlen: int = 1000):
+        self.spans: deque = deque(maxlen=maxlen)
+
+    def on_end(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class Tracer:
+    """Creates spans and feeds them to span processors.
+
+    Attach one with FletAndroidNotifications.set_tracer() to trace every
+    notification from the Python call through the native post to the
+    user's tap. Spans started while another span is current (see
+    start_as_current_span) join its trace.
+
+    Args:
+        *processors: SpanProcessor instances, called in order.
+
+    Usage:
+        recorder = SpanRecorder()
+        notifications.set_tracer(Tracer(recorder))
+    """
+
+    def __init__(self, *processors: SpanProcessor):
+        self.processors: list[SpanProcessor] = list(processors)
+
+    def add_span_processor(self, processor: SpanProcessor) -> None:
+        self.processors.append(processor)
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        attributes: Optional[dict] = None,
+        start_time: Optional[int] = None,
+    ) -> Span:
+        """Start a span. Without trace_id it continues the current span's trace."""
+        if trace_id is None:
+            current = _current_span.get()
+            if current is not None:
+                trace_id, parent_id = current.trace_id, current.span_id
+            else:
+                trace_id = _trace_id()
+        span = Span(
+            self,
+            name,
+            trace_id,
+            parent_id,
+            dict(attributes or {}),
+            start_time if start_time is not None else time.time_ns(),
+        )
+        for processor in self.processors:
+            processor.on_start(span)
+        return span
+
+    @contextlib.contextmanager
+    def start_as_current_span(
+        self, name: str, *, attributes: Optional[dict] = None
+    ) -> Iterator[Span]:
+        """Start a span, make it current for the block and end it on exit."""
+        span = self.start_span(name, attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_status("error", str(e))
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def shutdown(self) -> None:
+        for processor in self.processors:
+            processor.shutdown()
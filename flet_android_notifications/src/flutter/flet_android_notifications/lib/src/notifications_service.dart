@@ -1,6 +1,6 @@
 import 'dart:async';
 import 'dart:convert';
-import 'dart:typed_data' show Int64List;
+import 'dart:typed_data' show Int64List, Uint8List;
 import 'dart:ui' show Color;
 import 'package:flet/flet.dart';
 import 'package:flutter_local_notifications/flutter_local_notifications.dart';
@@ -15,6 +15,34 @@ class NotificationsService extends FletService {
   Completer<bool>? _initCompleter;
   DateTime? _lastShowTime;
 
+  // In-memory images sent from Python, keyed by content digest. Python only
+  // ships the bytes the first time it references a digest, so the cache is
+  // LRU-bounded and a miss is reported back as "bitmap_missing:<digest>".
+  static const int _maxBitmapCacheBytes = 16 * 1024 * 1024;
+  final Map<String, Uint8List> _bitmaps = <String, Uint8List>{};
+  int _bitmapCacheBytes = 0;
+
+  // Arguments of the last show_notification per MessagingStyle notification
+  // id, so append_message can re-post a conversation from a single new
+  // message. Insertion-ordered; the oldest conversation is forgotten first.
+  static const int _maxConversations = 64;
+  final Map<int, Map<String, dynamic>> _conversations =
+      <int, Map<String, dynamic>>{};
+
+  // Per-method call counts, errors and latency of _onMethod, bucketed the
+  // same way as metrics.py so Python can compute percentiles.
+  final Map<String, _MethodStats> _methodStats = <String, _MethodStats>{};
+
+  // Opt-in per-phase timings of _onMethod (set_native_profiling). Each call
+  // runs in a zone holding a _PhaseTimer; _lap() marks phase boundaries.
+  bool _profiling = false;
+  final Map<String, Map<String, _MethodStats>> _phaseStats =
+      <String, Map<String, _MethodStats>>{};
+
+  // Arguments of the running foreground service notification, so
+  // update_foreground_service only has to send the fields that changed.
+  Map<String, dynamic>? _foregroundArgs;
+
   @override
   void init() {
     super.init();
@@ -50,10 +78,23 @@ class NotificationsService extends FletService {
               DateTime.now().difference(_lastShowTime!).inSeconds < 3) {
             return;
           }
-          control.triggerEvent("notification_tap", jsonEncode({
-            "payload": response.payload ?? "",
+          final meta = _unwrapPayload(response.payload);
+          final event = <String, dynamic>{
+            "payload": meta["p"],
             "action_id": response.actionId ?? "",
-          }));
+          };
+          if (meta["t"] != null) {
+            event["id"] = response.id;
+            event["trace_id"] = meta["t"];
+            event["span_id"] = meta["s"];
+            final postedAt = meta["at"] as int?;
+            if (postedAt != null) {
+              event["posted_at_ms"] = postedAt;
+              event["latency_ms"] =
+                  DateTime.now().millisecondsSinceEpoch - postedAt;
+            }
+          }
+          control.triggerEvent("notification_tap", jsonEncode(event));
         },
       );
       _initCompleter!.complete(result ?? false);
@@ -152,12 +193,44 @@ class NotificationsService extends FletService {
     return Color(int.parse(hex, radix: 16));
   }
 
+  void _storeBitmaps(Map<dynamic, dynamic> raw) {
+    raw.forEach((digest, data) {
+      final bytes = data is Uint8List
+          ? data
+          : Uint8List.fromList((data as List<dynamic>).cast<int>());
+      final previous = _bitmaps.remove(digest as String);
+      if (previous != null) _bitmapCacheBytes -= previous.length;
+      _bitmaps[digest] = bytes;
+      _bitmapCacheBytes += bytes.length;
+    });
+    // LinkedHashMap iterates oldest first
+    while (_bitmapCacheBytes > _maxBitmapCacheBytes && _bitmaps.length > 1) {
+      final oldest = _bitmaps.keys.first;
+      _bitmapCacheBytes -= _bitmaps.remove(oldest)!.length;
+    }
+  }
+
+  AndroidBitmap<Object> _bitmapFromDigest(String digest) {
+    final bytes = _bitmaps.remove(digest);
+    if (bytes == null) throw Exception("bitmap_missing:$digest");
+    _bitmaps[digest] = bytes;
+    return ByteArrayAndroidBitmap(bytes);
+  }
+
+  AndroidBitmap<Object> _parseBitmap(String value, String type) {
+    switch (type) {
+      case "file_path":
+        return FilePathAndroidBitmap(value);
+      case "bytes":
+        return _bitmapFromDigest(value);
+      default:
+        return DrawableResourceAndroidBitmap(value);
+    }
+  }
+
   AndroidBitmap<Object>? _parseLargeIcon(String? value, String type) {
     if (value == null) return null;
-    if (type == "file_path") {
-      return FilePathAndroidBitmap(value);
-    }
-    return DrawableResourceAndroidBitmap(value);
+    return _parseBitmap(value, type);
   }
 
   NotificationVisibility? _parseVisibility(String? value) {
@@ -184,23 +257,12 @@ class NotificationsService extends FletService {
           summaryText: style["summary_text"] as String?,
         );
       case "big_picture":
-        final bitmapType = style["bitmap_type"] as String;
-        final bitmapValue = style["bitmap_value"] as String;
-        AndroidBitmap<Object> bitmap;
-        if (bitmapType == "file_path") {
-          bitmap = FilePathAndroidBitmap(bitmapValue);
-        } else {
-          bitmap = DrawableResourceAndroidBitmap(bitmapValue);
-        }
+        final bitmap = _parseBitmap(
+            style["bitmap_value"] as String, style["bitmap_type"] as String);
         AndroidBitmap<Object>? largeIcon;
         if (style["large_icon_type"] != null) {
-          final iconType = style["large_icon_type"] as String;
-          final iconValue = style["large_icon_value"] as String;
-          if (iconType == "file_path") {
-            largeIcon = FilePathAndroidBitmap(iconValue);
-          } else {
-            largeIcon = DrawableResourceAndroidBitmap(iconValue);
-          }
+          largeIcon = _parseBitmap(style["large_icon_value"] as String,
+              style["large_icon_type"] as String);
         }
         return BigPictureStyleInformation(
           bitmap,
@@ -216,11 +278,121 @@ class NotificationsService extends FletService {
           contentTitle: style["content_title"] as String?,
           summaryText: style["summary_text"] as String?,
         );
+      case "messaging":
+        return MessagingStyleInformation(
+          Person(name: style["person_name"] as String),
+          conversationTitle: style["conversation_title"] as String?,
+          groupConversation: style["group_conversation"] as bool? ?? false,
+          messages: (style["messages"] as List<dynamic>)
+              .map((m) => _parseMessage(Map<String, dynamic>.from(m as Map)))
+              .toList(),
+        );
+      case "media":
+        return const MediaStyleInformation();
       default:
         return null;
     }
   }
 
+  Message _parseMessage(Map<String, dynamic> m) {
+    final sender = m["sender"] as String?;
+    return Message(
+      m["text"] as String,
+      DateTime.fromMillisecondsSinceEpoch(m["timestamp_ms"] as int),
+      sender != null ? Person(name: sender) : null,
+    );
+  }
+
+  // Notifications can carry metadata (the content hash used by
+  // reconcile_schedule, the trace ids and post time used by tracing) packed
+  // into the payload string the plugin persists. It is stripped again
+  // before any payload reaches Python.
+  static const String _envelopeMark = "\u001e";
+
+  String _wrapPayload(Map<String, dynamic> a, {int? postedAtMs}) {
+    final payload = a["payload"] as String? ?? "";
+    final envelope = <String, dynamic>{};
+    final hash = a["content_hash"] as String?;
+    if (hash != null) envelope["h"] = hash;
+    final trace = a["trace"] as Map?;
+    if (trace != null) {
+      envelope["t"] = trace["trace_id"];
+      envelope["s"] = trace["span_id"];
+      // scheduled notifications are posted at their fire time
+      final at = postedAtMs ?? a["scheduled_epoch_ms"] as int?;
+      if (at != null) envelope["at"] = at;
+    }
+    if (envelope.isEmpty) return payload;
+    envelope["p"] = payload;
+    return _envelopeMark + jsonEncode(envelope);
+  }
+
+  Map<String, dynamic> _unwrapPayload(String? raw) {
+    if (raw == null || !raw.startsWith(_envelopeMark)) {
+      return {"p": raw ?? ""};
+    }
+    try {
+      return Map<String, dynamic>.from(jsonDecode(raw.substring(1)) as Map);
+    } catch (_) {
+      return {"p": raw};
+    }
+  }
+
+  // FNV-1a 64; int arithmetic wraps at 64 bits on the Dart VM. Must match
+  // schedule_checksum() in store.py.
+  int _fnv1a64(String text) {
+    var h = 0xcbf29ce484222325;
+    for (final b in utf8.encode(text)) {
+      h ^= b;
+      h *= 0x100000001b3;
+    }
+    return h;
+  }
+
+  void _rememberConversation(Map<String, dynamic> a) {
+    final id = a["id"] as int;
+    final style = Map<String, dynamic>.from(a["style"] as Map);
+    style["messages"] = List<dynamic>.from(style["messages"] as List);
+    _conversations.remove(id);
+    _conversations[id] = Map<String, dynamic>.from(a)
+      ..remove("bitmaps")
+      ..["style"] = style;
+    while (_conversations.length > _maxConversations) {
+      _conversations.remove(_conversations.keys.first);
+    }
+  }
+
+  Future<dynamic> _appendMessage(Map<String, dynamic> a) async {
+    _lap("copy");
+    final id = a["id"] as int;
+    final stored = _conversations[id];
+    if (stored == null) return "conversation_missing";
+    final message = Map<String, dynamic>.from(a["message"] as Map);
+    final messages = (stored["style"] as Map<String, dynamic>)["messages"]
+        as List<dynamic>;
+    messages.add(message);
+    final historySize = a["history_size"] as int;
+    if (messages.length > historySize) {
+      messages.removeRange(0, messages.length - historySize);
+    }
+    stored["body"] = message["text"];
+    // a traced append re-posts under its own trace
+    if (a["trace"] != null) {
+      stored["trace"] = a["trace"];
+    } else {
+      stored.remove("trace");
+    }
+    final result = await _onMethod("show_notification", stored);
+    if (result is String && result.startsWith("error:") &&
+        result.contains("bitmap_missing:")) {
+      // an image the stored conversation references was evicted; let
+      // Python re-post the conversation in full
+      _conversations.remove(id);
+      return "conversation_missing";
+    }
+    return result;
+  }
+
   RepeatInterval _parseRepeatInterval(String value) {
     switch (value) {
       case "every_minute":
@@ -306,7 +478,12 @@ class NotificationsService extends FletService {
     bool channelBypassDnd = false,
     Int64List? vibrationPattern,
     int? timeoutAfter,
+    bool usesChronometer = false,
+    bool chronometerCountDown = false,
+    int? when,
   }) {
+    // argument casts and parse helpers ran at the call site
+    _lap("parse");
     final androidDetails = AndroidNotificationDetails(
       channelId,
       channelName,
@@ -338,8 +515,13 @@ class NotificationsService extends FletService {
       channelBypassDnd: channelBypassDnd,
       vibrationPattern: vibrationPattern,
       timeoutAfter: timeoutAfter,
+      usesChronometer: usesChronometer,
+      chronometerCountDown: chronometerCountDown,
+      when: when,
     );
-    return NotificationDetails(android: androidDetails);
+    final details = NotificationDetails(android: androidDetails);
+    _lap("details");
+    return details;
   }
 
   List<AndroidNotificationAction> _parseActions(List<dynamic> raw) {
@@ -354,10 +536,39 @@ class NotificationsService extends FletService {
   }
 
   Future<dynamic> _onMethod(String name, dynamic args) async {
+    final stopwatch = Stopwatch()..start();
+    final timer = _profiling ? _PhaseTimer() : null;
+    final result = timer == null
+        ? await _dispatch(name, args)
+        : await runZoned(() => _dispatch(name, args),
+            zoneValues: {_PhaseTimer: timer});
+    (_methodStats[name] ??= _MethodStats()).record(stopwatch.elapsedMicroseconds,
+        result is String && result.startsWith("error:"));
+    if (timer != null) {
+      timer.lap("other");
+      final phases = _phaseStats[name] ??= <String, _MethodStats>{};
+      timer.phases.forEach(
+          (phase, micros) => (phases[phase] ??= _MethodStats()).record(micros, false));
+    }
+    return result;
+  }
+
+  // Ends the current profiling phase of the call running in this zone.
+  // A no-op unless profiling is on.
+  void _lap(String phase) {
+    (Zone.current[_PhaseTimer] as _PhaseTimer?)?.lap(phase);
+  }
+
+  Future<dynamic> _dispatch(String name, dynamic args) async {
     try {
+      if (args is Map && args["bitmaps"] != null) {
+        _storeBitmaps(args["bitmaps"] as Map);
+        _lap("bitmaps");
+      }
       switch (name) {
         case "show_notification":
           final a = Map<String, dynamic>.from(args as Map);
+          _lap("copy");
           final importance = _parseImportance(a["importance"] as String);
           final rawStyle = a["style"];
           final styleInfo = _parseStyleInformation(
@@ -366,7 +577,8 @@ class NotificationsService extends FletService {
             a["id"] as int,
             a["title"] as String,
             a["body"] as String,
-            payload: a["payload"] as String,
+            payload: _wrapPayload(a,
+                postedAtMs: DateTime.now().millisecondsSinceEpoch),
             channelId: a["channel_id"] as String,
             channelName: a["channel_name"] as String,
             channelDescription: a["channel_description"] as String,
@@ -403,10 +615,21 @@ class NotificationsService extends FletService {
                     (a["vibration_pattern"] as List<dynamic>).cast<int>())
                 : null,
             timeoutAfter: a["timeout_after"] as int?,
+            usesChronometer: a["uses_chronometer"] as bool? ?? false,
+            chronometerCountDown: a["chronometer_count_down"] as bool? ?? false,
+            when: a["when"] as int?,
           );
+          if (styleInfo is MessagingStyleInformation) {
+            _rememberConversation(a);
+          } else {
+            _conversations.remove(a["id"] as int);
+          }
           return "ok";
+        case "append_message":
+          return await _appendMessage(Map<String, dynamic>.from(args as Map));
         case "schedule_notification":
           final a = Map<String, dynamic>.from(args as Map);
+          _lap("copy");
           final importance = _parseImportance(a["importance"] as String);
           final rawStyle = a["style"];
           final styleInfo = _parseStyleInformation(
@@ -416,7 +639,7 @@ class NotificationsService extends FletService {
             a["title"] as String,
             a["body"] as String,
             scheduledEpochMs: a["scheduled_epoch_ms"] as int,
-            payload: a["payload"] as String,
+            payload: _wrapPayload(a),
             channelId: a["channel_id"] as String,
             channelName: a["channel_name"] as String,
             channelDescription: a["channel_description"] as String,
@@ -461,7 +684,9 @@ class NotificationsService extends FletService {
           return "ok";
         case "periodically_show":
           await _ensureInitialized();
+          _lap("init");
           final a = Map<String, dynamic>.from(args as Map);
+          _lap("copy");
           final importance = _parseImportance(a["importance"] as String);
           final rawStyle = a["style"];
           final styleInfo = _parseStyleInformation(
@@ -511,12 +736,15 @@ class NotificationsService extends FletService {
             notificationDetails: details,
             repeatInterval: _parseRepeatInterval(a["repeat_interval"] as String),
             androidScheduleMode: AndroidScheduleMode.inexactAllowWhileIdle,
-            payload: a["payload"] as String,
+            payload: _wrapPayload(a),
           );
+          _lap("plugin");
           return "ok";
         case "periodically_show_with_duration":
           await _ensureInitialized();
+          _lap("init");
           final a = Map<String, dynamic>.from(args as Map);
+          _lap("copy");
           final importance = _parseImportance(a["importance"] as String);
           final rawStyle = a["style"];
           final styleInfo = _parseStyleInformation(
@@ -566,12 +794,15 @@ class NotificationsService extends FletService {
             notificationDetails: details,
             repeatDurationInterval: Duration(milliseconds: a["duration_ms"] as int),
             androidScheduleMode: AndroidScheduleMode.inexactAllowWhileIdle,
-            payload: a["payload"] as String,
+            payload: _wrapPayload(a),
           );
+          _lap("plugin");
           return "ok";
         case "start_foreground_service":
           await _ensureInitialized();
+          _lap("init");
           final a = Map<String, dynamic>.from(args as Map);
+          _lap("copy");
           final importance = _parseImportance(a["importance"] as String);
           final rawStyle = a["style"];
           final styleInfo = _parseStyleInformation(
@@ -613,6 +844,9 @@ class NotificationsService extends FletService {
                     (a["vibration_pattern"] as List<dynamic>).cast<int>())
                 : null,
             timeoutAfter: a["timeout_after"] as int?,
+            usesChronometer: a["uses_chronometer"] as bool? ?? false,
+            chronometerCountDown: a["chronometer_count_down"] as bool? ?? false,
+            when: a["when"] as int?,
           );
           final android = _plugin.resolvePlatformSpecificImplementation<
               AndroidFlutterLocalNotificationsPlugin>();
@@ -621,45 +855,108 @@ class NotificationsService extends FletService {
             title: a["title"] as String,
             body: a["body"] as String,
             notificationDetails: details.android,
-            payload: a["payload"] as String,
+            payload: _wrapPayload(a,
+                postedAtMs: DateTime.now().millisecondsSinceEpoch),
             startType: _parseServiceStartType(a["start_type"] as String),
             foregroundServiceTypes: _parseForegroundServiceTypes(
                 a["foreground_service_types"] as List<dynamic>?),
           );
+          _lap("plugin");
+          _foregroundArgs = Map<String, dynamic>.from(a)..remove("bitmaps");
           return "ok";
+        case "update_foreground_service":
+          final stored = _foregroundArgs;
+          if (stored == null) return "error:no foreground service is running";
+          final a = Map<String, dynamic>.from(args as Map)..remove("bitmaps");
+          _lap("copy");
+          stored.addAll(a);
+          // Re-posting under the service's id updates its notification in
+          // place. Updates are not user-visible shows, so keep the phantom
+          // tap debounce anchored to the last real show.
+          final lastShow = _lastShowTime;
+          final result = await _onMethod(
+              "show_notification", {...stored, "only_alert_once": true});
+          _lastShowTime = lastShow;
+          return result;
         case "stop_foreground_service":
           await _ensureInitialized();
+          _lap("init");
           final android = _plugin.resolvePlatformSpecificImplementation<
               AndroidFlutterLocalNotificationsPlugin>();
           await android?.stopForegroundService();
+          _lap("plugin");
+          _foregroundArgs = null;
           return "ok";
         case "get_active_notifications":
           await _ensureInitialized();
+          _lap("init");
           final active = await _plugin.getActiveNotifications();
+          _lap("plugin");
           final list = active.map((n) => {
             "id": n.id,
             "title": n.title ?? "",
             "body": n.body ?? "",
             "channel_id": n.channelId ?? "",
-            "payload": n.payload ?? "",
+            "payload": _unwrapPayload(n.payload)["p"],
           }).toList();
           return jsonEncode(list);
         case "get_pending_notifications":
           await _ensureInitialized();
+          _lap("init");
           final pending = await _plugin.pendingNotificationRequests();
-          final list = pending.map((n) => {
-            "id": n.id,
-            "title": n.title ?? "",
-            "body": n.body ?? "",
-            "payload": n.payload ?? "",
+          _lap("plugin");
+          final list = pending.map((n) {
+            final meta = _unwrapPayload(n.payload);
+            return {
+              "id": n.id,
+              "title": n.title ?? "",
+              "body": n.body ?? "",
+              "payload": meta["p"],
+              "content_hash": meta["h"],
+            };
           }).toList();
           return jsonEncode(list);
+        case "get_native_metrics":
+          return jsonEncode({
+            "methods": _methodStats
+                .map((method, stats) => MapEntry(method, stats.toJson())),
+          });
+        case "set_native_profiling":
+          final a = Map<String, dynamic>.from(args as Map);
+          _profiling = a["enabled"] as bool;
+          if (!_profiling) _phaseStats.clear();
+          return "ok";
+        case "get_native_profile":
+          final a = Map<String, dynamic>.from(args as Map);
+          final profile = jsonEncode({
+            "enabled": _profiling,
+            "methods": _phaseStats.map((method, phases) => MapEntry(
+                method,
+                phases.map((phase, stats) => MapEntry(phase, stats.toJson())))),
+          });
+          if (a["reset"] as bool? ?? false) _phaseStats.clear();
+          return profile;
+        case "get_pending_checksum":
+          await _ensureInitialized();
+          _lap("init");
+          final pending = await _plugin.pendingNotificationRequests();
+          _lap("plugin");
+          var checksum = 0;
+          for (final n in pending) {
+            checksum ^= _fnv1a64("${n.id}:${_unwrapPayload(n.payload)["h"] ?? ""}");
+          }
+          return "${pending.length}:${checksum.toUnsigned(64).toRadixString(16)}";
         case "cancel":
           final a = Map<String, dynamic>.from(args as Map);
+          _lap("copy");
           await _plugin.cancel(id: a["id"] as int);
+          _lap("plugin");
+          _conversations.remove(a["id"] as int);
           return "ok";
         case "cancel_all":
           await _plugin.cancelAll();
+          _lap("plugin");
+          _conversations.clear();
           return "ok";
         case "request_permissions":
           final granted = await _requestPermissions();
@@ -667,6 +964,17 @@ class NotificationsService extends FletService {
         case "request_exact_alarm_permission":
           final granted = await _requestExactAlarmPermission();
           return granted.toString();
+        case "batch":
+          // calls run in order; each reports its own result or "error:..."
+          // so one failure doesn't abort the rest
+          final a = Map<String, dynamic>.from(args as Map);
+          _lap("copy");
+          final results = <dynamic>[];
+          for (final raw in a["calls"] as List<dynamic>) {
+            final call = Map<String, dynamic>.from(raw as Map);
+            results.add(await _onMethod(call["method"] as String, call["args"]));
+          }
+          return jsonEncode(results);
       }
       return null;
     } catch (e) {
@@ -709,11 +1017,15 @@ class NotificationsService extends FletService {
     bool channelBypassDnd = false,
     Int64List? vibrationPattern,
     int? timeoutAfter,
+    bool usesChronometer = false,
+    bool chronometerCountDown = false,
+    int? when,
   }) async {
     final initialized = await _ensureInitialized();
     if (!initialized) {
       throw Exception('Notification plugin failed to initialize');
     }
+    _lap("init");
     _lastShowTime = DateTime.now();
 
     final details = _buildNotificationDetails(
@@ -747,9 +1059,13 @@ class NotificationsService extends FletService {
       channelBypassDnd: channelBypassDnd,
       vibrationPattern: vibrationPattern,
       timeoutAfter: timeoutAfter,
+      usesChronometer: usesChronometer,
+      chronometerCountDown: chronometerCountDown,
+      when: when,
     );
 
     await _plugin.show(id: id, title: title, body: body, notificationDetails: details, payload: payload);
+    _lap("plugin");
   }
 
   Future<void> _scheduleNotification(
@@ -795,6 +1111,7 @@ class NotificationsService extends FletService {
     if (!initialized) {
       throw Exception('Notification plugin failed to initialize');
     }
+    _lap("init");
 
     final scheduledDate = tz.TZDateTime.from(
       DateTime.fromMillisecondsSinceEpoch(scheduledEpochMs, isUtc: true),
@@ -844,10 +1161,12 @@ class NotificationsService extends FletService {
       payload: payload,
       matchDateTimeComponents: matchDateTimeComponents,
     );
+    _lap("plugin");
   }
 
   Future<bool> _requestPermissions() async {
     await _ensureInitialized();
+    _lap("init");
 
     final android = _plugin.resolvePlatformSpecificImplementation<
         AndroidFlutterLocalNotificationsPlugin>();
@@ -859,6 +1178,7 @@ class NotificationsService extends FletService {
 
   Future<bool> _requestExactAlarmPermission() async {
     await _ensureInitialized();
+    _lap("init");
 
     final android = _plugin.resolvePlatformSpecificImplementation<
         AndroidFlutterLocalNotificationsPlugin>();
@@ -868,3 +1188,47 @@ class NotificationsService extends FletService {
     return granted ?? false;
   }
 }
+
+class _MethodStats {
+  int count = 0;
+  int errors = 0;
+  int totalUs = 0;
+  int maxUs = 0;
+  final Map<int, int> buckets = <int, int>{};
+
+  // Log-linear bucket index; must match bucket_index() in metrics.py.
+  static int bucketIndex(int value) {
+    if (value < 32) return value;
+    final shift = value.bitLength - 5;
+    return shift * 16 + (value >> shift);
+  }
+
+  void record(int micros, bool error) {
+    count++;
+    if (error) errors++;
+    totalUs += micros;
+    if (micros > maxUs) maxUs = micros;
+    final index = bucketIndex(micros);
+    buckets[index] = (buckets[index] ?? 0) + 1;
+  }
+
+  Map<String, dynamic> toJson() => {
+        "count": count,
+        "errors": errors,
+        "total_us": totalUs,
+        "max_us": maxUs,
+        "buckets": buckets.map((k, v) => MapEntry(k.toString(), v)),
+      };
+}
+
+class _PhaseTimer {
+  final Stopwatch _watch = Stopwatch()..start();
+  int _last = 0;
+  final Map<String, int> phases = <String, int>{};
+
+  void lap(String phase) {
+    final now = _watch.elapsedMicroseconds;
+    phases[phase] = (phases[phase] ?? 0) + now - _last;
+    _last = now;
+  }
+}